@@ -0,0 +1,83 @@
+"""
+Бенчмарк потоковой записи отчёта Allure на большом прогоне.
+
+Конвейер (EmailPipeline) прогоняется по синтетическому корпусу без отчёта и
+с AllureWriter; ссылки ведут на локальный сервер-заглушку. Сравниваются
+общее время, число записанных файлов и пик памяти (tracemalloc) — с отчётом
+он не должен расти на величину, пропорциональную числу элементов.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_allure_report --emails 200 --elements 50
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus_generator import EmailSpec, generate_corpus
+from utils.allure_report import AllureWriter
+from utils.link_checker import LinkChecker
+from utils.local_server import LocalServer
+from utils.pipeline import EmailPipeline
+
+
+def run_pipeline(emails_dir, expected_file, writer=None):
+    """
+    Возвращает (время, пик памяти в байтах, вердикты).
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    with LinkChecker() as checker:
+        _, results = EmailPipeline(emails_dir, expected_file, "stream", checker,
+                                   report=writer.write if writer else None).run()
+    if writer is not None:
+        writer.close()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк записи отчёта Allure")
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--elements", type=int, default=50, help="элементов в письме")
+    args = parser.parse_args()
+
+    links = max(args.elements // 5, 1)
+    images = max(args.elements // 10, 1)
+    work_dir = tempfile.mkdtemp(prefix="email_allure_")
+    try:
+        emails_dir = os.path.join(work_dir, "emails")
+        allure_dir = os.path.join(work_dir, "allure-results")
+        with LocalServer() as server:
+            spec = EmailSpec(links=links, images=images, texts=args.elements - links - images, size_kb=20,
+                             link_base=server.url("/l"))
+            expected_file = generate_corpus(emails_dir, args.emails, spec)
+
+            plain_time, plain_peak, _ = run_pipeline(emails_dir, expected_file)
+            writer = AllureWriter(allure_dir).start()
+            allure_time, allure_peak, results = run_pipeline(emails_dir, expected_file, writer)
+
+        result_files = [name for name in os.listdir(allure_dir) if name.endswith("-result.json")]
+        if len(result_files) != len(results) or writer.written != len(results):
+            raise AssertionError("❌ Записаны не все результаты Allure")
+        with open(os.path.join(allure_dir, result_files[0]), "r", encoding="utf-8") as f:
+            sample = json.load(f)
+        if not sample["steps"]:
+            raise AssertionError("❌ В результате Allure нет шагов")
+        files = len(os.listdir(allure_dir))
+    finally:
+        shutil.rmtree(work_dir)
+
+    print(f"Писем: {args.emails}, элементов: {args.emails * args.elements}")
+    print(f"{'mode':>12} {'time, s':>8} {'peak memory, MB':>16} {'files':>6}")
+    print(f"{'no report':>12} {plain_time:>8.2f} {plain_peak / 2 ** 20:>16.1f} {0:>6}")
+    print(f"{'allure':>12} {allure_time:>8.2f} {allure_peak / 2 ** 20:>16.1f} {files:>6}")
+
+
+if __name__ == "__main__":
+    main()
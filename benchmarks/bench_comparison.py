@@ -0,0 +1,65 @@
+"""
+Бенчмарк сравнения значений: прежний построчный difflib.ndiff против
+TextDiffStrategy на совпадающих значениях и на длинных юридических подвалах
+с правкой в середине.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_comparison --elements 2000 --footer-chars 3000
+"""
+import argparse
+import difflib
+import time
+
+from benchmarks.corpus_generator import TEXT_SAMPLE
+from utils.comparator import TextDiffStrategy
+
+
+def legacy_compare(actual, expected):
+    """
+    Прежняя проверка из JsonComparator: ndiff по каждому элементу и поиск префиксов.
+    """
+    diff = list(difflib.ndiff([actual], [expected]))
+    if any(line.startswith("- ") or line.startswith("+ ") for line in diff):
+        return "\n".join(diff)
+    return None
+
+
+def footer(chars, seed):
+    """
+    Длинный текст подвала заданной длины.
+    """
+    return (f"{seed}. {TEXT_SAMPLE} " * (chars // len(TEXT_SAMPLE) + 1))[:chars]
+
+
+def timed(compare, pairs):
+    started = time.perf_counter()
+    found = sum(compare(actual, expected) is not None for actual, expected in pairs)
+    return time.perf_counter() - started, found
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк сравнения значений")
+    parser.add_argument("--elements", type=int, default=2000)
+    parser.add_argument("--footer-chars", type=int, default=3000)
+    parser.add_argument("--mismatched", type=int, default=20, help="пар с правкой в середине подвала")
+    args = parser.parse_args()
+
+    equal_pairs = [(footer(args.footer_chars, index),) * 2 for index in range(args.elements)]
+    changed_pairs = []
+    for index in range(args.mismatched):
+        text = footer(args.footer_chars, index)
+        middle = len(text) // 2
+        changed_pairs.append((text, text[:middle] + "изменённое условие" + text[middle + 5:]))
+
+    strategy = TextDiffStrategy()
+    print(f"{'case':>22} {'legacy ndiff, s':>16} {'fast path, s':>13} {'diffs':>6}")
+    for case, pairs in (("all equal", equal_pairs), ("long footer mismatch", changed_pairs)):
+        legacy_time, legacy_found = timed(legacy_compare, pairs)
+        fast_time, fast_found = timed(strategy.compare, pairs)
+        if legacy_found != fast_found:
+            raise AssertionError(f"❌ {case}: различий {fast_found} вместо {legacy_found}")
+        print(f"{case:>22} {legacy_time:>16.4f} {fast_time:>13.4f} {fast_found:>6}")
+
+
+if __name__ == "__main__":
+    main()
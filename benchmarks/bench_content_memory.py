@@ -0,0 +1,88 @@
+"""
+Бенчмарк памяти модели content: словарь на каждый элемент (JSON-формат)
+против колоночного ContentStore с общей таблицей строк. Память считается
+tracemalloc на корпусе из синтетических писем; дополнительно проверяется,
+что преобразование в JSON-формат и обратно не теряет данных, и замеряется
+сравнение фактического и ожидаемого корпусов.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_content_memory --emails 2000
+"""
+import argparse
+import copy
+import gc
+import time
+import tracemalloc
+
+from benchmarks.corpus_generator import EmailSpec, generate_email
+from utils.comparator import ContentComparator
+from utils.content_store import ContentStore, StringTable
+
+
+def build_documents(emails, spec):
+    """
+    Документы корпуса в JSON-формате, как после json.load (строки не разделяются между письмами).
+    """
+    template_count = 20
+    contents = [generate_email(spec, template=f"template_{index}", seed=index)[1]
+                for index in range(template_count)]
+    data = {"emails": []}
+    for index in range(emails):
+        data["emails"].append({"id": str(index + 1), "name": f"template_{index % template_count}",
+                               "language": "ru", "document": f"/emails/template_{index}.html",
+                               "content": copy.deepcopy(contents[index % template_count])})
+    return data
+
+
+def measure_memory(factory):
+    """
+    Возвращает (объект, байт памяти, удерживаемой объектом).
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = factory()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк памяти модели content")
+    parser.add_argument("--emails", type=int, default=2000)
+    parser.add_argument("--links", type=int, default=8)
+    parser.add_argument("--images", type=int, default=3)
+    parser.add_argument("--texts", type=int, default=12)
+    args = parser.parse_args()
+
+    spec = EmailSpec(links=args.links, images=args.images, texts=args.texts, size_kb=1)
+    source = build_documents(args.emails, spec)
+    elements = sum(len(email["content"]) for email in source["emails"])
+
+    data, dict_bytes = measure_memory(lambda: copy.deepcopy(source))
+    store, store_bytes = measure_memory(lambda: ContentStore.from_json(source))
+    if store.to_json() != data:
+        raise AssertionError("❌ Преобразование ContentStore <-> JSON потеряло данные")
+
+    comparator = ContentComparator()
+    started = time.perf_counter()
+    dict_differences = comparator.compare(data, source)
+    dict_time = time.perf_counter() - started
+
+    strings = StringTable()
+    actual_store, expected_store = ContentStore.from_json(data, strings), ContentStore.from_json(source, strings)
+    started = time.perf_counter()
+    store_differences = comparator.compare(actual_store, expected_store)
+    store_time = time.perf_counter() - started
+    if dict_differences or store_differences:
+        raise AssertionError("❌ Одинаковые корпуса сравнились с различиями")
+
+    print(f"Писем: {args.emails}, элементов: {elements}")
+    print(f"{'model':>14} {'memory, MB':>11} {'bytes/element':>14} {'compare, s':>11}")
+    print(f"{'dict per item':>14} {dict_bytes / 2 ** 20:>11.2f} {dict_bytes / elements:>14.1f} {dict_time:>11.3f}")
+    print(f"{'ContentStore':>14} {store_bytes / 2 ** 20:>11.2f} {store_bytes / elements:>14.1f} {store_time:>11.3f}")
+    print(f"Экономия памяти: x{dict_bytes / store_bytes:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Бенчмарк пакетного режима: пропускная способность (писем/с) при разном числе процессов.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_corpus --emails 200 --workers 1 2 4
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from utils.corpus import CorpusProcessor
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_EMAIL = os.path.join(BASE_DIR, "Emails", "frozen_account_RU.html")
+LOCALES = ("ru", "en", "kz", "uz")
+
+
+def build_corpus(target_dir, emails):
+    """
+    Раскладывает копии исходного письма по папкам локалей.
+    """
+    for index in range(emails):
+        locale_dir = os.path.join(target_dir, LOCALES[index % len(LOCALES)])
+        os.makedirs(locale_dir, exist_ok=True)
+        shutil.copyfile(SOURCE_EMAIL, os.path.join(locale_dir, f"template_{index}.html"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк пакетной обработки корпуса писем")
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    parser.add_argument("--chunksize", type=int, default=4)
+    args = parser.parse_args()
+
+    workers_list = args.workers or sorted({1, 2, 4, os.cpu_count() or 1})
+    corpus_dir = tempfile.mkdtemp(prefix="emails_corpus_")
+    try:
+        build_corpus(corpus_dir, args.emails)
+        print(f"Ядер: {os.cpu_count()}, писем: {args.emails}")
+        print(f"{'workers':>8} {'time, s':>8} {'emails/s':>9} {'speedup':>8}")
+        baseline = None
+        for workers in workers_list:
+            processor = CorpusProcessor(emails_dir=corpus_dir, workers=workers, chunksize=args.chunksize)
+            started = time.perf_counter()
+            corpus_data, _ = processor.run()
+            elapsed = time.perf_counter() - started
+            if len(corpus_data["emails"]) != args.emails:
+                raise AssertionError("❌ Обработаны не все письма корпуса")
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>8.2f} {args.emails / elapsed:>9.1f} {baseline / elapsed:>7.2f}x")
+    finally:
+        shutil.rmtree(corpus_dir)
+
+
+if __name__ == "__main__":
+    main()
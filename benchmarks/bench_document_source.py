@@ -0,0 +1,95 @@
+"""
+Бенчмарк загрузки документов писем по URL с условными запросами.
+
+Шаблоны раздаются локальным сервером-заглушкой (ETag / Last-Modified).
+Три прохода DocumentSource: первый загружает всё, второй получает 304 на
+каждый шаблон (тела не передаются, файлы не перезаписываются), перед
+третьим часть шаблонов меняется на сервере. Затем CorpusProcessor с
+IncrementalState прогоняется по папке документов после каждого прохода:
+неизменённые шаблоны не парсятся заново. В конце сервер останавливается и
+проверяется работа без сети (кэшированные копии).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_document_source --emails 100 --changed 10
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.corpus_generator import EmailSpec, generate_email, LOCALES
+from utils.corpus import CorpusProcessor
+from utils.document_source import DocumentCache, DocumentSource
+from utils.incremental import IncrementalState
+from utils.local_server import LocalServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк условной загрузки документов")
+    parser.add_argument("--emails", type=int, default=100)
+    parser.add_argument("--changed", type=int, default=10, help="шаблонов, меняющихся перед третьим проходом")
+    parser.add_argument("--size-kb", type=int, default=100)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="email_documents_")
+    try:
+        documents_dir = os.path.join(work_dir, "documents")
+        state_file = os.path.join(work_dir, "state.json")
+        expected_file = os.path.join(work_dir, "expected.json")
+        spec = EmailSpec(size_kb=args.size_kb)
+        rows = []
+        with LocalServer() as server:
+            sources = []
+            expected = []
+            for index in range(args.emails):
+                name, language = f"template_{index}", LOCALES[index % len(LOCALES)]
+                html, content = generate_email(spec, template=name, seed=index)
+                server.put_file(f"/templates/{language}/{name}.html", "text/html; charset=utf-8",
+                                html.encode("utf-8"))
+                url = server.url(f"/templates/{language}/{name}.html")
+                sources.append({"name": name, "language": language, "url": url, "fallback": None})
+                expected.append({"name": name, "language": language, "url": url, "content": content})
+            with open(expected_file, "w", encoding="utf-8") as f:
+                json.dump({"emails": expected}, f, ensure_ascii=False)
+
+            for label in ("cold", "304", f"{args.changed} changed"):
+                if label.endswith("changed"):
+                    for index in range(args.changed):
+                        path = f"/templates/{LOCALES[index % len(LOCALES)]}/template_{index}.html"
+                        content_type, body = server.httpd.files[path]
+                        server.put_file(path, content_type, body.replace(b"</center>", b"<p>upd</p></center>"))
+                server.reset_stats()
+                started = time.perf_counter()
+                with DocumentSource(DocumentCache(documents_dir)) as source:
+                    documents = source.fetch_documents(sources)
+                fetch_time = time.perf_counter() - started
+                statuses = {}
+                for document in documents:
+                    statuses[document["status"]] = statuses.get(document["status"], 0) + 1
+
+                started = time.perf_counter()
+                processor = CorpusProcessor(documents_dir, expected_file, workers=1,
+                                            state=IncrementalState(state_file))
+                processor.run()
+                check_time = time.perf_counter() - started
+                rows.append((label, fetch_time, server.stats.body_bytes, statuses, check_time,
+                             args.emails - processor.reused))
+
+        with DocumentSource(DocumentCache(documents_dir), connect_timeout=0.5) as source:
+            offline = source.fetch_documents(sources)
+        if any(document["status"] != "cached" for document in offline):
+            raise AssertionError("❌ Без сети не все документы взяты из кэша")
+    finally:
+        shutil.rmtree(work_dir)
+
+    print(f"Шаблонов: {args.emails} по {args.size_kb} КБ")
+    print(f"{'pass':>12} {'fetch, s':>9} {'body bytes':>11} {'check, s':>9} {'parsed':>7}  statuses")
+    for label, fetch_time, body_bytes, statuses, check_time, parsed in rows:
+        print(f"{label:>12} {fetch_time:>9.2f} {body_bytes:>11} {check_time:>9.2f} {parsed:>7}  {statuses}")
+    print(f"Без сети: {len(offline)} документов из кэша")
+
+
+if __name__ == "__main__":
+    main()
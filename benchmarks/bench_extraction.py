@@ -0,0 +1,92 @@
+"""
+Бенчмарк извлечения данных: прежние три find_all против однопроходного движка.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_extraction --scales 1 5 10
+"""
+import argparse
+import os
+import re
+import time
+from bs4 import BeautifulSoup
+
+from utils.extractor import extract_content
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_EMAIL = os.path.join(BASE_DIR, "Emails", "frozen_account_RU.html")
+
+
+def legacy_extract(soup):
+    """
+    Прежняя реализация EmailPage.extract_email_data: три обхода дерева и get_text на каждом тексте.
+    """
+    content = []
+    link_pattern = re.compile(r'^(?:[hbf]-link-\d+|f-social-link-\d+)$')
+    img_pattern = re.compile(r'^[hbf]-img-\d+$')
+    text_pattern = re.compile(r'^[hbf]-text-\d+$')
+
+    for link in soup.find_all("a", id=link_pattern):
+        content.append({"selector": link.get("id", "link_no_id"), "type": "link", "expected": link.get("href")})
+
+    for img in soup.find_all("img", id=img_pattern):
+        content.append({"selector": img.get("id", "img_no_id"), "type": "image", "expected": img.get("src")})
+
+    for text_element in soup.find_all(id=text_pattern):
+        content.append({"selector": text_element.get("id", "text_no_id"), "type": "text",
+                        "expected": text_element.get_text(strip=True)})
+
+    return content
+
+
+def scale_email(html, factor):
+    """
+    Синтетически увеличивает письмо: тело повторяется factor раз,
+    каждая копия вложена в предыдущую (глубокая табличная вложенность).
+    """
+    head, rest = html.split("<body", 1)
+    body_open, rest = rest.split(">", 1)
+    body, tail = rest.rsplit("</body>", 1)
+    nested = body
+    for _ in range(factor - 1):
+        nested = f"<table><tr><td>{body}{nested}</td></tr></table>"
+    return f"{head}<body{body_open}>{nested}</body>{tail}"
+
+
+def best_time(func, soup, repeat):
+    """
+    Лучшее время из repeat запусков.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(soup)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк извлечения данных из письма")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(SOURCE_EMAIL, "r", encoding="utf-8") as f:
+        html = f.read()
+
+    print(f"{'scale':>6} {'size, KB':>9} {'elements':>9} {'legacy, ms':>11} {'single-pass, ms':>16} {'speedup':>8}")
+    for factor in args.scales:
+        soup = BeautifulSoup(scale_email(html, factor), "html.parser")
+        legacy_content = legacy_extract(soup)
+        content = extract_content(soup)
+        if content != legacy_content:
+            raise AssertionError(f"❌ Результаты извлечения различаются при scale={factor}")
+
+        legacy_time = best_time(legacy_extract, soup, args.repeat)
+        single_time = best_time(extract_content, soup, args.repeat)
+        size_kb = len(scale_email(html, factor).encode("utf-8")) / 1024
+        print(f"{factor:>6} {size_kb:>9.0f} {len(content):>9} {legacy_time * 1000:>11.1f} "
+              f"{single_time * 1000:>16.1f} {legacy_time / single_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Бюджет времени импорта подкоманд CLI по `python -X importtime`.
+
+Каждая подкоманда запускается в отдельном интерпретаторе; суммируется
+накопленное время импортов верхнего уровня, кроме модулей старта самого
+интерпретатора (site, encodings и т.п.), и отмечается, загружались ли
+requests и bs4. compare и --help не должны загружать ни то, ни другое.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_import_time --repeat 5
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Модули, которые импортирует сам интерпретатор до запуска команды
+STARTUP_MODULES = {"_frozen_importlib_external", "zipimport", "encodings", "encodings.utf_8", "_signal", "io",
+                   "site", "runpy"}
+HEAVY_MODULES = ("requests", "bs4")
+
+
+def parse_importtime(stderr):
+    """
+    Разбирает вывод -X importtime: (мкс импортов верхнего уровня, множество всех модулей).
+    """
+    total = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        modules.add(module)
+        # Верхний уровень — имя с одним пробелом отступа после разделителя
+        if not name.startswith("  ") and module not in STARTUP_MODULES:
+            total += int(cumulative)
+    return total, modules
+
+
+def command_lines(work_dir):
+    """
+    Подкоманды CLI на данных из data/ без обращения к сети.
+    """
+    actual = os.path.join(work_dir, "actual.json")
+    cassette = os.path.join(work_dir, "cassette.json")
+    return {
+        "help": ["--help"],
+        "extract": ["extract", "--output", actual],
+        "compare": ["compare", "--actual", actual],
+        "check-links": ["check-links", "--actual", actual, "--cassette-mode", "replay", "--cassette", cassette],
+    }
+
+
+def measure_import_time(repeat=3):
+    """
+    {подкоманда: (список времён импорта в секундах, загруженные тяжёлые модули)}.
+    """
+    work_dir = tempfile.mkdtemp(prefix="cli_importtime_")
+    results = {}
+    try:
+        for command, argv in command_lines(work_dir).items():
+            timings = []
+            heavy = []
+            for _ in range(repeat):
+                completed = subprocess.run([sys.executable, "-X", "importtime", "-m", "utils.cli"] + argv,
+                                           cwd=BASE_DIR, capture_output=True, text=True)
+                total, modules = parse_importtime(completed.stderr)
+                timings.append(total / 1_000_000)
+                heavy = [module for module in HEAVY_MODULES if module in modules]
+            results[command] = (timings, heavy)
+    finally:
+        shutil.rmtree(work_dir)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время импорта подкоманд CLI")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'command':>12} {'import, ms':>11} {'heavy modules':>15}")
+    for command, (timings, heavy) in measure_import_time(args.repeat).items():
+        print(f"{command:>12} {statistics.median(timings) * 1000:>11.1f} {', '.join(heavy) or '-':>15}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Бенчмарк инкрементальной проверки: полный прогон корпуса, затем изменение
+нескольких писем и повторный прогон, который перепроверяет только их.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_incremental --emails 500 --changed 10
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from benchmarks.bench_corpus import build_corpus
+from utils.corpus import CorpusProcessor, find_emails
+from utils.incremental import IncrementalState
+
+
+def timed_run(corpus_dir, state_file, workers):
+    """
+    Прогон корпуса с инкрементальным состоянием; возвращает (время, переиспользовано писем).
+    """
+    processor = CorpusProcessor(emails_dir=corpus_dir, workers=workers, chunksize=8,
+                                state=IncrementalState(state_file))
+    started = time.perf_counter()
+    processor.run()
+    return time.perf_counter() - started, processor.reused
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк инкрементальной проверки корпуса")
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--changed", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    corpus_dir = tempfile.mkdtemp(prefix="emails_corpus_")
+    state_file = os.path.join(corpus_dir, "state.json")
+    try:
+        build_corpus(corpus_dir, args.emails)
+        full_time, _ = timed_run(corpus_dir, state_file, args.workers)
+        unchanged_time, unchanged_reused = timed_run(corpus_dir, state_file, args.workers)
+
+        for path in find_emails(corpus_dir)[:args.changed]:
+            with open(os.path.join(corpus_dir, path), "a", encoding="utf-8") as f:
+                f.write("<!-- edited -->\n")
+        changed_time, changed_reused = timed_run(corpus_dir, state_file, args.workers)
+
+        print(f"Писем: {args.emails}, изменено: {args.changed}")
+        print(f"{'run':>16} {'time, s':>8} {'reused':>7}")
+        print(f"{'full':>16} {full_time:>8.2f} {0:>7}")
+        print(f"{'unchanged rerun':>16} {unchanged_time:>8.2f} {unchanged_reused:>7}")
+        print(f"{'after edits':>16} {changed_time:>8.2f} {changed_reused:>7}")
+    finally:
+        shutil.rmtree(corpus_dir)
+
+
+if __name__ == "__main__":
+    main()
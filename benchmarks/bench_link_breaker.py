@@ -0,0 +1,70 @@
+"""
+Бенчмарк предохранителя и общего срока проверки ссылок.
+
+Часть ссылок ведёт на «чёрную дыру» (BlackHoleServer: соединения не
+принимаются, как у заблокированного зеркала), часть — на рабочий сервер-заглушку.
+Сравниваются проверка без предохранителя (каждая ссылка ждёт таймаут
+подключения), с предохранителем и с предохранителем и общим сроком.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_link_breaker --dead 40 --alive 20 --connect-timeout 1
+"""
+import argparse
+import time
+
+from utils.circuit_breaker import HostCircuitBreaker
+from utils.link_checker import LinkChecker
+from utils.local_server import LocalServer, BlackHoleServer
+
+
+def run_checker(urls, **options):
+    """
+    Возвращает (время, проверено успешно, «хост недоступен», не проверено до срока, ошибки подключения).
+    """
+    started = time.perf_counter()
+    with LinkChecker(**options) as checker:
+        results = checker.fetch_urls(urls)
+    elapsed = time.perf_counter() - started
+    return (elapsed,
+            sum(1 for result in results if result["is_valid"]),
+            sum(1 for result in results if result.get("host_unreachable")),
+            sum(1 for result in results if result.get("deadline_expired")),
+            sum(1 for result in results if result.get("connect_error")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк предохранителя проверки ссылок")
+    parser.add_argument("--dead", type=int, default=40, help="ссылок на недоступный хост")
+    parser.add_argument("--alive", type=int, default=20, help="ссылок на рабочий хост")
+    parser.add_argument("--connect-timeout", type=float, default=1.0)
+    parser.add_argument("--deadline", type=float, default=1.5)
+    args = parser.parse_args()
+
+    with BlackHoleServer() as dead, LocalServer() as alive:
+        # Ссылки вперемешку, как в реальном письме
+        urls = []
+        for index in range(max(args.dead, args.alive)):
+            if index < args.dead:
+                urls.append(dead.url(f"/page/{index}"))
+            if index < args.alive:
+                urls.append(alive.url(f"/page/{index}"))
+
+        rows = [
+            ("no breaker", run_checker(urls, connect_timeout=args.connect_timeout,
+                                       breaker=HostCircuitBreaker(threshold=len(urls) + 1))),
+            ("breaker", run_checker(urls, connect_timeout=args.connect_timeout)),
+            ("breaker+deadline", run_checker(urls, connect_timeout=args.connect_timeout * 5,
+                                             deadline=args.deadline)),
+        ]
+
+    print(f"Ссылок: {args.dead} на недоступный хост, {args.alive} на рабочий; "
+          f"таймаут подключения {args.connect_timeout} с, срок {args.deadline} с")
+    print(f"{'mode':>18} {'time, s':>8} {'valid':>6} {'unreachable':>12} {'expired':>8} {'connect errors':>15}")
+    for name, (elapsed, valid, unreachable, expired, connect_errors) in rows:
+        print(f"{name:>18} {elapsed:>8.2f} {valid:>6} {unreachable:>12} {expired:>8} {connect_errors:>15}")
+    if rows[1][1][1] != args.alive:
+        raise AssertionError("❌ Предохранитель задел ссылки рабочего хоста")
+
+
+if __name__ == "__main__":
+    main()
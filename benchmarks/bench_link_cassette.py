@@ -0,0 +1,65 @@
+"""
+Бенчмарк кассеты проверок ссылок (полностью без внешней сети): запись
+проверок медленного локального сервера, затем воспроизведение после его
+остановки и дозапись только новых ссылок в режиме refresh.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_link_cassette --links 40 --delay-ms 300
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+from utils.cassette import LinkCassette
+from utils.link_checker import LinkChecker
+from utils.local_server import LocalServer
+
+
+def timed_check(urls, cassette):
+    """
+    Проверяет ссылки с кассетой; возвращает (результаты, время).
+    """
+    started = time.perf_counter()
+    with LinkChecker(cassette=cassette) as checker:
+        results = checker.fetch_urls(urls)
+    return results, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк записи и воспроизведения проверок ссылок")
+    parser.add_argument("--links", type=int, default=40)
+    parser.add_argument("--delay-ms", type=int, default=300, help="задержка ответа сервера")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="link_cassette_")
+    cassette_file = os.path.join(work_dir, "cassette.json")
+    try:
+        with LocalServer() as server:
+            statuses = (200, 200, 404, 301)
+            urls = [server.url(f"/redirect/1?page={index}&delay={args.delay_ms}") if statuses[index % 4] == 301
+                    else server.url(f"/status/{statuses[index % 4]}?page={index}&delay={args.delay_ms}")
+                    for index in range(args.links)]
+            recorded, record_time = timed_check(urls, LinkCassette(cassette_file, "record"))
+            new_url = server.url(f"/status/200?page=new&delay={args.delay_ms}")
+            _, refresh_time = timed_check(urls + [new_url], LinkCassette(cassette_file, "refresh"))
+            refresh_requests = server.stats.requests
+
+        # Сервер остановлен: воспроизведение не должно обращаться к сети
+        cassette = LinkCassette(cassette_file, "replay")
+        replayed, replay_time = timed_check(urls + [new_url], cassette)
+        if replayed[:len(urls)] != recorded or cassette.misses:
+            raise AssertionError("❌ Воспроизведённые результаты отличаются от записанных")
+
+        print(f"Ссылок: {args.links}, задержка сервера: {args.delay_ms} мс")
+        print(f"{'run':>8} {'time, s':>8}")
+        print(f"{'record':>8} {record_time:>8.3f}")
+        print(f"{'refresh':>8} {refresh_time:>8.3f}  (запросов к серверу всего: {refresh_requests})")
+        print(f"{'replay':>8} {replay_time:>8.3f}")
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
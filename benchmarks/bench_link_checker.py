@@ -0,0 +1,83 @@
+"""
+Бенчмарк проверки ссылок: последовательные requests.get без сессии против
+LinkChecker (общая сессия, пул соединений, лимиты на хост) на локальном сервере-заглушке,
+плюс повторный запуск с дисковым кэшем LinkCache.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_link_checker --links 30 --delay 50
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+import requests
+
+from utils.link_cache import LinkCache
+from utils.link_checker import LinkChecker
+from utils.local_server import LocalServer
+
+
+def legacy_check(url):
+    """
+    Прежняя проверка: отдельный requests.get на каждую ссылку, новое соединение каждый раз.
+    """
+    response = requests.get(url, timeout=10)
+    return not 399 < response.status_code < 600, response.status_code, response.url
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк проверки ссылок")
+    parser.add_argument("--links", type=int, default=30)
+    parser.add_argument("--delay", type=int, default=50, help="задержка ответа сервера, мс")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=4)
+    args = parser.parse_args()
+
+    with LocalServer() as server:
+        urls = [server.url(f"/page/{index}?delay={args.delay}") for index in range(args.links)]
+
+        started = time.perf_counter()
+        legacy_results = [legacy_check(url) for url in urls]
+        legacy_time = time.perf_counter() - started
+        legacy_connections = server.stats.connections
+
+        server.reset_stats()
+        started = time.perf_counter()
+        with LinkChecker(args.concurrency, args.per_host) as checker:
+            results = checker.check_urls(urls)
+        pooled_time = time.perf_counter() - started
+
+        if results != legacy_results:
+            raise AssertionError("❌ Результаты проверки различаются")
+        pooled_connections = server.stats.connections
+        pooled_in_flight = server.stats.max_in_flight
+
+        # Два запуска с кэшем: первый наполняет его, второй должен обойтись без сети
+        cache_dir = tempfile.mkdtemp(prefix="link_cache_")
+        try:
+            with LinkChecker(args.concurrency, args.per_host,
+                             cache=LinkCache(os.path.join(cache_dir, "cache.sqlite"))) as checker:
+                checker.check_urls(urls)
+            server.reset_stats()
+            started = time.perf_counter()
+            with LinkChecker(args.concurrency, args.per_host,
+                             cache=LinkCache(os.path.join(cache_dir, "cache.sqlite"))) as checker:
+                cached_results = checker.check_urls(urls)
+            cached_time = time.perf_counter() - started
+        finally:
+            shutil.rmtree(cache_dir)
+        if cached_results != legacy_results:
+            raise AssertionError("❌ Результаты из кэша различаются")
+
+        print(f"Ссылок: {args.links}, задержка сервера: {args.delay} мс")
+        print(f"{'mode':>12} {'time, s':>8} {'connections':>12} {'max in flight':>14} {'requests':>9}")
+        print(f"{'sequential':>12} {legacy_time:>8.2f} {legacy_connections:>12} {1:>14} {args.links:>9}")
+        print(f"{'pooled':>12} {pooled_time:>8.2f} {pooled_connections:>12} {pooled_in_flight:>14} {args.links:>9}")
+        print(f"{'cached rerun':>12} {cached_time:>8.3f} {server.stats.connections:>12} "
+              f"{server.stats.max_in_flight:>14} {server.stats.requests:>9}")
+        print(f"Ускорение: {legacy_time / pooled_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Бенчмарк проверки ссылок без скачивания тел: полный GET против probe (HEAD,
+при отказе — GET с закрытием после заголовков) на страницах с большими телами.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_link_probe --links 20 --body-kb 500
+"""
+import argparse
+import time
+
+from utils.link_checker import LinkChecker
+from utils.local_server import LocalServer
+
+
+def run(server, urls, mode):
+    """
+    Проверяет ссылки в заданном режиме; возвращает (результаты, время, байт тел передано).
+    """
+    server.reset_stats()
+    started = time.perf_counter()
+    with LinkChecker(mode=mode) as checker:
+        results = checker.fetch_urls(urls)
+    return results, time.perf_counter() - started, server.stats.body_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк проверки ссылок без скачивания тел")
+    parser.add_argument("--links", type=int, default=20)
+    parser.add_argument("--body-kb", type=int, default=500)
+    args = parser.parse_args()
+
+    with LocalServer() as server:
+        body = args.body_kb * 1024
+        # Половина ссылок идёт через редиректы, часть серверов не принимает HEAD
+        urls = []
+        for index in range(args.links):
+            if index % 2:
+                urls.append(server.url(f"/bytes/{body}?page={index}" + ("&nohead=1" if index % 4 == 1 else "")))
+            else:
+                urls.append(server.url(f"/redirect/2?page={index}"))
+
+        get_results, get_time, get_bytes = run(server, urls, "get")
+        probe_results, probe_time, probe_bytes = run(server, urls, "probe")
+
+        for get_result, probe_result in zip(get_results, probe_results):
+            if (get_result["status_code"], get_result["final_url"]) != \
+                    (probe_result["status_code"], probe_result["final_url"]):
+                raise AssertionError("❌ Результаты режимов различаются")
+            if len(get_result["redirects"]) != len(probe_result["redirects"]):
+                raise AssertionError("❌ Цепочки редиректов различаются")
+
+        print(f"Ссылок: {args.links}, тело страницы: {args.body_kb} КБ")
+        print(f"{'mode':>6} {'time, s':>8} {'body bytes sent':>16}")
+        print(f"{'get':>6} {get_time:>8.3f} {get_bytes:>16}")
+        print(f"{'probe':>6} {probe_time:>8.3f} {probe_bytes:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Бенчмарк конвейера: последовательный прогон (извлечь весь корпус, затем
+проверить все ссылки, затем сравнить) против EmailPipeline, где проверка
+ссылок начинается с первой извлечённой ссылки. Ссылки корпуса указывают на
+локальный сервер-заглушку с задержкой ответа, запущенный в отдельном процессе. Время конвейера должно быть
+ближе к max(разбор, сеть), чем к их сумме.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_pipeline --emails 30 --links 8 --delay 60
+"""
+import argparse
+import json
+import multiprocessing
+import shutil
+import tempfile
+import time
+
+from benchmarks.corpus_generator import EmailSpec, generate_corpus
+from pages.base_page import EmailProcessor
+from utils.comparator import ContentComparator
+from utils.corpus import find_emails, detect_language, index_expected
+from utils.link_checker import LinkChecker
+from utils.local_server import LocalServer, StandInHandler
+from utils.pipeline import EmailPipeline
+
+
+def delayed_handler(delay):
+    """
+    Обработчик сервера-заглушки с одинаковой задержкой каждого ответа (мс).
+    """
+    class DelayedHandler(StandInHandler):
+        def respond(self, send_body):
+            time.sleep(delay / 1000)
+            super().respond(send_body)
+    return DelayedHandler
+
+
+def serve(delay, ports, stop):
+    """
+    Сервер-заглушка в отдельном процессе: его CPU не делит GIL с проверяемым конвейером.
+    """
+    with LocalServer(delayed_handler(delay)) as server:
+        ports.put(server.base_url)
+        stop.wait()
+
+
+def sequential(emails_dir, expected_file, mode, concurrency, per_host):
+    """
+    Прежний порядок стадий; возвращает (вердикты, время разбора, время сети, общее время).
+    """
+    with open(expected_file, "r", encoding="utf-8") as f:
+        expected_index = index_expected(json.load(f))
+    started = time.perf_counter()
+    emails = []
+    for path in find_emails(emails_dir):
+        emails.append(EmailProcessor(path, mode, emails_dir, detect_language(path)).extract()["emails"][0])
+    parsed = time.perf_counter()
+
+    urls = [content["expected"] for email in emails for content in email["content"] if content["type"] == "link"]
+    with LinkChecker(concurrency, per_host) as checker:
+        checker.check_urls(urls)
+    checked = time.perf_counter()
+
+    comparator = ContentComparator()
+    verdicts = []
+    for email in emails:
+        expected = expected_index[(email["name"], email["language"])]
+        verdicts.append(bool(comparator.compare_content(email["content"], expected["content"], email["name"])))
+    finished = time.perf_counter()
+    return verdicts, parsed - started, checked - parsed, finished - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк конвейера извлечение → ссылки → сравнение")
+    parser.add_argument("--emails", type=int, default=30)
+    parser.add_argument("--links", type=int, default=8, help="ссылок в письме")
+    parser.add_argument("--size-kb", type=int, default=100)
+    parser.add_argument("--delay", type=int, default=60, help="задержка ответа сервера, мс")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--per-host", type=int, default=16, help="все ссылки ведут на один хост заглушки")
+    parser.add_argument("--mode", choices=EmailProcessor.MODES, default="stream")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="email_pipeline_")
+    try:
+        ports = multiprocessing.Queue()
+        stop = multiprocessing.Event()
+        server = multiprocessing.Process(target=serve, args=(args.delay, ports, stop), daemon=True)
+        server.start()
+        try:
+            spec = EmailSpec(links=args.links, size_kb=args.size_kb, link_base=f"{ports.get(timeout=10)}/l")
+            expected_file = generate_corpus(work_dir, args.emails, spec)
+
+            verdicts, parse_time, network_time, sequential_time = sequential(work_dir, expected_file, args.mode,
+                                                                             args.concurrency, args.per_host)
+            started = time.perf_counter()
+            with LinkChecker(args.concurrency, args.per_host) as checker:
+                _, results = EmailPipeline(work_dir, expected_file, args.mode, checker).run()
+            pipeline_time = time.perf_counter() - started
+        finally:
+            stop.set()
+            server.join()
+    finally:
+        shutil.rmtree(work_dir)
+
+    if [bool(result["differences"]) for result in results] != verdicts:
+        raise AssertionError("❌ Вердикты конвейера отличаются от последовательного прогона")
+    if any(result["link_issues"] for result in results):
+        raise AssertionError("❌ Конвейер нашёл проблемные ссылки на сервере-заглушке")
+
+    print(f"Писем: {args.emails}, ссылок в письме: {args.links}, задержка сервера: {args.delay} мс")
+    print(f"{'stage':>20} {'time, s':>8}")
+    print(f"{'parse':>20} {parse_time:>8.2f}")
+    print(f"{'network':>20} {network_time:>8.2f}")
+    print(f"{'sequential total':>20} {sequential_time:>8.2f}")
+    print(f"{'pipeline total':>20} {pipeline_time:>8.2f}")
+    print(f"max(parse, network): {max(parse_time, network_time):.2f} с, "
+          f"ускорение: {sequential_time / pipeline_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
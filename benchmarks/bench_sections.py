@@ -0,0 +1,81 @@
+"""
+Бенчмарк проверки писем по секциям (SectionCache).
+
+Корпус генерируется с общими шапкой и подвалом (как у реальных шаблонов
+одного бренда) и уникальным телом; в ожидаемых данных подвала всех писем
+допущена одна и та же ошибка, чтобы сравнение находило различия. Конвейер
+прогоняется без секций и с SectionCache; проверяется, что content и
+различия совпадают, и сравниваются время и число разобранных секций.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_sections --emails 200 --size-kb 40
+"""
+import argparse
+import json
+import shutil
+import tempfile
+import time
+
+from benchmarks.corpus_generator import EmailSpec, generate_corpus
+from utils.pipeline import EmailPipeline
+from utils.sections import SectionCache
+
+
+def run_pipeline(emails_dir, expected_file, mode, sections=None):
+    """
+    Возвращает (время, документ, вердикты).
+    """
+    started = time.perf_counter()
+    corpus_data, results = EmailPipeline(emails_dir, expected_file, mode, sections=sections).run()
+    return time.perf_counter() - started, corpus_data, results
+
+
+def differences(results):
+    return [sorted(json.dumps(diff, ensure_ascii=False, sort_keys=True) for diff in result["differences"])
+            for result in results]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк проверки писем по секциям")
+    parser.add_argument("--emails", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=40)
+    parser.add_argument("--mode", choices=("soup", "stream"), default="stream")
+    parser.add_argument("--shared-sections", nargs="*", choices=("h", "b", "f"), default=("h", "f"),
+                        help="секции, одинаковые во всех письмах")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="email_sections_")
+    try:
+        expected_file = generate_corpus(work_dir, args.emails,
+                                        EmailSpec(size_kb=args.size_kb, shared_sections=args.shared_sections))
+        with open(expected_file, "r", encoding="utf-8") as f:
+            expected_data = json.load(f)
+        for email in expected_data["emails"]:
+            for item in email["content"]:
+                if item["selector"] == "f-text-1":
+                    item["expected"] += " (устарело)"
+        with open(expected_file, "w", encoding="utf-8") as f:
+            json.dump(expected_data, f, ensure_ascii=False)
+
+        plain_time, plain_data, plain_results = run_pipeline(work_dir, expected_file, args.mode)
+        sections = SectionCache()
+        sections_time, sections_data, sections_results = run_pipeline(work_dir, expected_file, args.mode,
+                                                                      sections)
+    finally:
+        shutil.rmtree(work_dir)
+
+    if plain_data != sections_data:
+        raise AssertionError("❌ Извлечённые данные по секциям отличаются от обычного прогона")
+    if differences(plain_results) != differences(sections_results):
+        raise AssertionError("❌ Различия по секциям отличаются от обычного прогона")
+
+    print(f"Писем: {args.emails} по {args.size_kb} КБ, общие секции: {' '.join(args.shared_sections) or '-'}, "
+          f"режим {args.mode}")
+    print(f"{'mode':>10} {'time, s':>8} {'emails/s':>9}")
+    print(f"{'plain':>10} {plain_time:>8.2f} {args.emails / plain_time:>9.1f}")
+    print(f"{'sections':>10} {sections_time:>8.2f} {args.emails / sections_time:>9.1f}")
+    print(f"Секции: {sections.summary()}")
+
+
+if __name__ == "__main__":
+    main()
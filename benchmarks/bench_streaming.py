@@ -0,0 +1,90 @@
+"""
+Бенчмарк потокового извлечения: пиковая память и время до первой записи
+против пути BeautifulSoup на многомегабайтных синтетических письмах.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_streaming --copies 20 100
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from bs4 import BeautifulSoup
+
+from utils.extractor import extract_content
+from utils.stream_extractor import extract_content_stream, iter_content_stream
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_EMAIL = os.path.join(BASE_DIR, "Emails", "frozen_account_RU.html")
+
+
+def digest_email(html, copies):
+    """
+    Письмо-дайджест: тело исходного письма повторяется copies раз подряд.
+    """
+    head, rest = html.split("<body", 1)
+    body_open, rest = rest.split(">", 1)
+    body, tail = rest.rsplit("</body>", 1)
+    return f"{head}<body{body_open}>{body * copies}</body>{tail}"
+
+
+def soup_path(path):
+    """
+    Текущий путь: чтение файла целиком, дерево BeautifulSoup, однопроходное извлечение.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    return extract_content(BeautifulSoup(html, "html.parser"))
+
+
+def measure(func, path):
+    """
+    Время и пик памяти (tracemalloc) одного запуска.
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(path)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def first_record_latency(path):
+    """
+    Время до первой готовой записи в потоковом режиме.
+    """
+    started = time.perf_counter()
+    next(iter_content_stream(path))
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк потокового извлечения")
+    parser.add_argument("--copies", type=int, nargs="+", default=[20, 100])
+    args = parser.parse_args()
+
+    with open(SOURCE_EMAIL, "r", encoding="utf-8") as f:
+        html = f.read()
+
+    print(f"{'size, MB':>9} {'soup peak, MB':>14} {'stream peak, MB':>16} {'soup, s':>8} {'stream, s':>10} "
+          f"{'first record, ms':>17}")
+    for copies in args.copies:
+        with tempfile.NamedTemporaryFile("w", suffix=".html", encoding="utf-8", delete=False) as f:
+            f.write(digest_email(html, copies))
+            path = f.name
+        try:
+            soup_content, soup_time, soup_peak = measure(soup_path, path)
+            stream_content, stream_time, stream_peak = measure(extract_content_stream, path)
+            if soup_content != stream_content:
+                raise AssertionError(f"❌ Результаты режимов различаются при copies={copies}")
+            size_mb = os.path.getsize(path) / 2 ** 20
+            print(f"{size_mb:>9.1f} {soup_peak / 2 ** 20:>14.1f} {stream_peak / 2 ** 20:>16.1f} "
+                  f"{soup_time:>8.2f} {stream_time:>10.2f} {first_record_latency(path) * 1000:>17.1f}")
+        finally:
+            os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Генератор синтетических писем и корпусов по образцу Emails/frozen_account_RU.html.
+
+Письмо собирается из трёх секций (шапка h-, тело b-, подвал f-) с заданным
+числом ссылок, изображений и текстов, вложенных в таблицы нужной глубины, и
+добивается до нужного размера «пустыми» табличными строками без id.
+Вместе с письмами генерируется ожидаемый JSON в формате expected_result.json.
+
+Запуск из корня проекта:
+    python -m benchmarks.corpus_generator /tmp/corpus --emails 100 --size-kb 200
+"""
+import argparse
+import json
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_EMAIL = os.path.join(BASE_DIR, "Emails", "frozen_account_RU.html")
+LOCALES = ("ru", "en", "kz", "uz")
+SECTIONS = ("h", "b", "f")
+
+FILLER_ROW = ('<tr><td dir="ltr" style="padding: 0; font-family: arial, sans-serif; font-size: 14px; '
+              'line-height: 21px; color: #ffffff; background-color: #001d3a">'
+              '<span style="color: #ffffff">&nbsp;</span></td></tr>\n')
+TEXT_SAMPLE = ("Ваш аккаунт временно заморожен. Для восстановления доступа обратитесь в службу поддержки "
+               "и подтвердите личность. Условия и правила акции действуют согласно договору оферты.")
+
+
+class EmailSpec:
+    """
+    Параметры синтетического письма.
+    """
+
+    def __init__(self, links=8, images=3, texts=12, depth=6, size_kb=40, link_base="https://mostbet-ru30.com",
+                 image_base="https://suite38.emarsys.net/custloads/799213038", shared_sections=()):
+        self.links = links
+        self.images = images
+        self.texts = texts
+        self.depth = depth
+        self.size_kb = size_kb
+        self.link_base = link_base.rstrip("/")
+        self.image_base = image_base.rstrip("/")
+        # Секции ("h", "b", "f"), одинаковые во всех письмах корпуса (общие шапка и подвал)
+        self.shared_sections = tuple(shared_sections)
+
+
+def _head():
+    """
+    <head> исходного письма (реальные стили шаблона).
+    """
+    with open(SOURCE_EMAIL, "r", encoding="utf-8") as f:
+        html = f.read()
+    return html.split("<body", 1)[0]
+
+
+def _nest(inner, depth):
+    """
+    Оборачивает фрагмент в depth уровней таблиц, как в реальных шаблонах.
+    """
+    for level in range(depth):
+        inner = (f'<table dir="ltr" align="center" cellpadding="0" cellspacing="0" width="100%" border="0" '
+                 f'style="margin: 0 auto; width: 100%; max-width: {600 - level * 10}px">'
+                 f'<tr><td dir="ltr">{inner}</td></tr></table>')
+    return inner
+
+
+def _distribute(total, parts=len(SECTIONS)):
+    """
+    Делит число элементов между секциями.
+    """
+    return [total // parts + (1 if index < total % parts else 0) for index in range(parts)]
+
+
+def generate_email(spec, template="frozen_account", seed=0):
+    """
+    Возвращает (html, content) синтетического письма; content — ожидаемые элементы.
+    """
+    links = _distribute(spec.links)
+    images = _distribute(spec.images)
+    texts = _distribute(spec.texts)
+    content = {"link": [], "image": [], "text": []}
+    sections = []
+
+    for section_index, section in enumerate(SECTIONS):
+        shared = section in spec.shared_sections
+        section_template, section_seed = ("shared", 0) if shared else (template, seed)
+        rows = []
+        for number in range(1, links[section_index] + 1):
+            selector = f"{section}-link-{number}"
+            href = (f"{spec.link_base}/{section_template}/{selector}?utm_medium=email&utm_source=system"
+                    f"&content={selector}&utm_campaign={section_template}")
+            label = f"{section}-text-link-{number}"
+            rows.append(f'<a href="{href}" id="{selector}" target="_blank" style="text-decoration: none; '
+                        f'color: #fab225">{label}</a>')
+            content["link"].append({"selector": selector, "type": "link", "expected": href})
+        for number in range(1, images[section_index] + 1):
+            selector = f"{section}-img-{number}"
+            src = f"{spec.image_base}/md_{section_seed}_{selector}.png"
+            rows.append(f'<img src="{src}" id="{selector}" width="129" alt="{selector}" />')
+            content["image"].append({"selector": selector, "type": "image", "expected": src})
+        for number in range(1, texts[section_index] + 1):
+            selector = f"{section}-text-{number}"
+            text = f"{TEXT_SAMPLE[:40 + (number * 17 + section_seed) % (len(TEXT_SAMPLE) - 40)]} №{number}"
+            rows.append(f'<p style="margin: 0"><span id="{selector}" style="color: #ffffff">\n'
+                        f'  <b>{text[:20]}</b>{text[20:]}\n</span></p>')
+            # Ожидаемое значение — как get_text(strip=True): каждая строка обрезается отдельно
+            content["text"].append({"selector": selector, "type": "text",
+                                    "expected": text[:20].strip() + text[20:].strip()})
+        sections.append(_nest("\n".join(f"<div>{row}</div>" for row in rows), spec.depth))
+
+    html = (f'{_head()}<body style="margin: 0; padding: 0; min-width: 100%; background-color: #001d3a">\n'
+            f'<center style="width: 100%">\n')
+    tail = "</center>\n</body>\n</html>\n"
+
+    # Добиваем до нужного размера строками без id (на результат извлечения не влияют);
+    # они стоят между телом и подвалом, чтобы общий подвал не зависел от размера письма
+    missing = spec.size_kb * 1024 - len((html + "\n".join(sections) + "\n" + tail).encode("utf-8"))
+    if missing > 0:
+        rows = missing // len(FILLER_ROW.encode("utf-8")) + 1
+        sections.insert(len(sections) - 1, _nest(f"<table>{FILLER_ROW * rows}</table>", min(spec.depth, 3)))
+    return html + "\n".join(sections) + "\n" + tail, content["link"] + content["image"] + content["text"]
+
+
+def generate_corpus(target_dir, emails, spec=None):
+    """
+    Генерирует корпус писем по папкам локалей и ожидаемый JSON к нему.
+    Возвращает путь к expected_result.json корпуса.
+    """
+    spec = spec or EmailSpec()
+    expected = []
+    for index in range(emails):
+        locale = LOCALES[index % len(LOCALES)]
+        name = f"template_{index}"
+        html, content = generate_email(spec, template=name, seed=index)
+        locale_dir = os.path.join(target_dir, locale)
+        os.makedirs(locale_dir, exist_ok=True)
+        document = os.path.join(locale_dir, f"{name}.html")
+        with open(document, "w", encoding="utf-8") as f:
+            f.write(html)
+        expected.append({"id": str(index + 1), "name": name, "language": locale, "document": document,
+                         "content": content})
+
+    expected_file = os.path.join(target_dir, "expected_result.json")
+    with open(expected_file, "w", encoding="utf-8") as f:
+        json.dump({"emails": expected}, f, ensure_ascii=False, indent=4)
+    return expected_file
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Генерация синтетического корпуса писем")
+    parser.add_argument("target_dir")
+    parser.add_argument("--emails", type=int, default=100)
+    parser.add_argument("--links", type=int, default=8)
+    parser.add_argument("--images", type=int, default=3)
+    parser.add_argument("--texts", type=int, default=12)
+    parser.add_argument("--depth", type=int, default=6)
+    parser.add_argument("--size-kb", type=int, default=40)
+    parser.add_argument("--shared-sections", nargs="*", choices=SECTIONS, default=(),
+                        help="секции, одинаковые во всех письмах")
+    args = parser.parse_args()
+
+    expected_file = generate_corpus(args.target_dir, args.emails,
+                                    EmailSpec(args.links, args.images, args.texts, args.depth, args.size_kb,
+                                              shared_sections=args.shared_sections))
+    print(f"✅ Корпус из {args.emails} писем создан, ожидаемый результат: {expected_file}")
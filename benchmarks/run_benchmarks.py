@@ -0,0 +1,199 @@
+"""
+Набор бенчмарков по стадиям с порогом регрессий.
+
+Каждая стадия (load_html, parse_html, extract_email_data, save_to_json,
+comparators, link_check, corpus, import_time подкоманд CLI) замеряется отдельно на синтетических письмах
+разного размера; результаты пишутся в машиночитаемый JSON. Команда compare
+завершается с кодом 1, если медиана какой-либо стадии выросла больше порога
+относительно базовой линии. Времена зависят от машины, поэтому базовая линия
+не хранится в репозитории: её снимают командой run на той же машине до изменений.
+
+Запуск из корня проекта:
+    python -m benchmarks.run_benchmarks run --sizes 40 500 --output baseline.json
+    python -m benchmarks.run_benchmarks run --sizes 40 500 --output bench.json
+    python -m benchmarks.run_benchmarks compare baseline.json bench.json --threshold 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_import_time import measure_import_time
+from benchmarks.corpus_generator import EmailSpec, generate_email, generate_corpus
+from pages.base_page import EmailPage, DataSaver
+from utils.comparator import compare_files
+from utils.corpus import CorpusProcessor
+from utils.link_checker import LinkChecker
+from utils.local_server import LocalServer
+
+
+def measure(func, repeat):
+    """
+    Запускает func repeat раз; возвращает (последний результат, список времён).
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return result, timings
+
+
+def summarize(timings, **extra):
+    summary = {"median": statistics.median(timings), "min": min(timings), "runs": len(timings)}
+    summary.update(extra)
+    return summary
+
+
+def bench_email_stages(work_dir, size_kb, spec_kwargs, repeat, server):
+    """
+    Стадии обработки одного письма заданного размера.
+    """
+    spec = EmailSpec(size_kb=size_kb, link_base=server.url("/"), **spec_kwargs)
+    html, content = generate_email(spec, template=f"bench_{size_kb}")
+    filename = f"bench_{size_kb}.html"
+    with open(os.path.join(work_dir, filename), "w", encoding="utf-8") as f:
+        f.write(html)
+
+    page = EmailPage(filename, emails_dir=work_dir)
+    saver = DataSaver(work_dir)
+    results = {}
+
+    html_text, timings = measure(page.load_html, repeat)
+    results["load_html"] = summarize(timings)
+    soup, timings = measure(lambda: page.parse_html(html_text), repeat)
+    results["parse_html"] = summarize(timings)
+    email_data, timings = measure(lambda: page.extract_email_data(soup), repeat)
+    results["extract_email_data"] = summarize(timings, elements=len(email_data["emails"][0]["content"]))
+    _, timings = measure(lambda: saver.save_to_json(email_data, "actual.json"), repeat)
+    results["save_to_json"] = summarize(timings)
+
+    expected_data = {"emails": [dict(email_data["emails"][0], content=content)]}
+    saver.save_to_json(expected_data, "expected.json")
+    differences, timings = measure(lambda: compare_files(os.path.join(work_dir, "actual.json"),
+                                                         os.path.join(work_dir, "expected.json")), repeat)
+    if differences:
+        raise AssertionError(f"❌ Синтетическое письмо {size_kb} КБ не совпало с ожидаемым")
+    results["comparators"] = summarize(timings)
+
+    urls = [item["expected"] for item in email_data["emails"][0]["content"] if item["type"] == "link"]
+
+    def check_links():
+        with LinkChecker() as checker:
+            return checker.check_urls(urls)
+
+    _, timings = measure(check_links, repeat)
+    results["link_check"] = summarize(timings, links=len(urls))
+    return results
+
+
+def bench_corpus(work_dir, emails, spec_kwargs, workers):
+    """
+    Пакетная обработка корпуса (извлечение и сравнение всех писем).
+    """
+    corpus_dir = os.path.join(work_dir, "corpus")
+    expected_file = generate_corpus(corpus_dir, emails, EmailSpec(**spec_kwargs))
+    processor = CorpusProcessor(emails_dir=corpus_dir, expected_file=expected_file, workers=workers, chunksize=4)
+    (_, results), timings = measure(processor.run, 1)
+    if any(result["status"] != "passed" for result in results):
+        raise AssertionError("❌ Синтетический корпус не совпал с ожидаемым")
+    return summarize(timings, emails=emails, emails_per_second=emails / timings[0])
+
+
+def run(args):
+    spec_kwargs = {"links": args.links, "images": args.images, "texts": args.texts, "depth": args.depth}
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "spec": spec_kwargs,
+        },
+        "stages": {},
+    }
+    work_dir = tempfile.mkdtemp(prefix="email_bench_")
+    try:
+        with LocalServer() as server:
+            for size_kb in args.sizes:
+                for stage, summary in bench_email_stages(work_dir, size_kb, spec_kwargs, args.repeat,
+                                                         server).items():
+                    report["stages"][f"{stage}@{size_kb}kb"] = summary
+        if args.corpus:
+            report["stages"][f"corpus@{args.corpus}"] = bench_corpus(work_dir, args.corpus, spec_kwargs,
+                                                                     args.workers)
+        for command, (timings, heavy) in measure_import_time(args.repeat).items():
+            report["stages"][f"import_time@{command}"] = summarize(timings, heavy_modules=heavy)
+    finally:
+        shutil.rmtree(work_dir)
+
+    for name, summary in report["stages"].items():
+        print(f"{name:>32} {summary['median'] * 1000:>10.2f} ms")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+        print(f"✅ Результаты сохранены в {args.output}")
+    return 0
+
+
+def compare(args):
+    """
+    Сравнивает результаты с базовой линией; код 1 при регрессии хотя бы одной стадии.
+    """
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)["stages"]
+    with open(args.current, "r", encoding="utf-8") as f:
+        current = json.load(f)["stages"]
+
+    regressions = 0
+    for name, base in baseline.items():
+        if name not in current:
+            print(f"⚠️ {name}: нет в текущих результатах")
+            continue
+        ratio = current[name]["median"] / base["median"] if base["median"] else 1.0
+        regressed = ratio > 1 + args.threshold
+        regressions += regressed
+        mark = "❌" if regressed else "✅"
+        print(f"{mark} {name:>32} {base['median'] * 1000:>10.2f} -> {current[name]['median'] * 1000:>10.2f} ms "
+              f"({(ratio - 1) * 100:+.1f}%)")
+    if regressions:
+        print(f"❌ Регрессий: {regressions} (порог {args.threshold * 100:.0f}%)")
+        return 1
+    print("✅ Регрессий нет")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарки стадий проверки писем")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="замерить стадии")
+    run_parser.add_argument("--sizes", type=int, nargs="+", default=[40, 500, 2000], help="размеры писем, КБ")
+    run_parser.add_argument("--links", type=int, default=8)
+    run_parser.add_argument("--images", type=int, default=3)
+    run_parser.add_argument("--texts", type=int, default=12)
+    run_parser.add_argument("--depth", type=int, default=6)
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--corpus", type=int, default=100, help="писем в корпусе (0 — не замерять)")
+    run_parser.add_argument("--workers", type=int, default=None)
+    run_parser.add_argument("--output", default=None)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = subparsers.add_parser("compare", help="сравнить с базовой линией")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.25, help="допустимый рост медианы (доля)")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    sys.exit(args.handler(args))
+
+
+if __name__ == "__main__":
+    main()
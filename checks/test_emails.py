@@ -0,0 +1,21 @@
+from utils.comparator import format_diff
+
+
+def test_content(content_case, actual_content, text_strategy):
+    """
+    Значение элемента письма совпадает с ожидаемым (по одной проверке на селектор).
+    """
+    assert content_case.document is not None, f"HTML-файл письма {content_case.email} не найден"
+    content = actual_content(content_case.document, content_case.language)
+    assert content is not None, f"Не удалось извлечь данные письма {content_case.email}"
+
+    actual = content.get(content_case.selector)
+    assert actual is not None, f"Элемент {content_case.selector} не найден в письме"
+    assert actual["type"] == content_case.type, \
+        f"Тип {content_case.selector}: {actual['type']} вместо {content_case.type}"
+
+    diff = text_strategy.compare(actual["expected"], content_case.expected)
+    assert diff is None, (f"Значение {content_case.selector} ({content_case.type}) не совпадает\n"
+                          f"ожидалось: {content_case.expected!r}\n"
+                          f"получено:  {actual['expected']!r}\n"
+                          f"{format_diff(diff, actual['expected'], content_case.expected)}")
@@ -0,0 +1,15 @@
+import pytest
+
+
+def test_link_status(link_case, actual_content, link_results):
+    """
+    Фактическая ссылка письма отвечает статусом вне 400-599 (все ссылки запрошены заранее параллельно).
+    """
+    content = actual_content(link_case.document, link_case.language) or {}
+    actual = content.get(link_case.selector)
+    if actual is None or not actual.get("expected"):
+        pytest.skip(f"Ссылка {link_case.selector} не извлечена (см. test_content)")
+
+    result = link_results[actual["expected"]]
+    assert result["is_valid"], (f"{link_case.selector}: {actual['expected']}\n"
+                                f"статус: {result['status_code']}, конечный URL: {result['final_url']}")
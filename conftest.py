@@ -0,0 +1,162 @@
+import json
+import os
+import sys
+
+import pytest
+
+# Абсолютный путь к корню проекта
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+from pages.base_page import EMAILS_DIR, DATA_DIR, EmailProcessor
+from utils.cassette import LinkCassette, DEFAULT_CASSETTE_FILE
+from utils.comparator import TextDiffStrategy
+from utils.corpus import find_emails, detect_language
+from utils.link_cache import LinkCache
+from utils.link_checker import LinkChecker
+from utils.parse_cache import ParseCache, DEFAULT_PARSE_CACHE_DIR
+
+# Данные сессии, которые готовятся один раз при конфигурации
+CASES_KEY = pytest.StashKey[dict]()
+
+
+class ContentCase:
+    """
+    Одна проверка: элемент content ожидаемого JSON и письмо, к которому он относится.
+    """
+
+    __slots__ = ("document", "language", "email", "selector", "type", "expected")
+
+    def __init__(self, document, language, email, selector, type, expected):
+        self.document = document
+        self.language = language
+        self.email = email
+        self.selector = selector
+        self.type = type
+        self.expected = expected
+
+    @property
+    def id(self):
+        return f"{self.email}:{self.language}:{self.selector}"
+
+
+def resolve_document(email, emails_dir, available):
+    """
+    Путь к HTML-файлу ожидаемого письма: поле document, если файл существует,
+    иначе файл из папки писем с тем же именем и языком.
+    """
+    document = email.get("document")
+    if document and os.path.exists(document):
+        return os.path.abspath(document)
+    candidates = available.get(email.get("name"), [])
+    for relative_path in candidates:
+        if detect_language(relative_path) == email.get("language"):
+            return relative_path
+    return candidates[0] if candidates else None
+
+
+def build_cases(expected_data, emails_dir):
+    """
+    Проверки по всем элементам ожидаемого JSON: (content-проверки, проверки ссылок).
+    """
+    available = {}
+    for relative_path in find_emails(emails_dir):
+        available.setdefault(os.path.splitext(os.path.basename(relative_path))[0], []).append(relative_path)
+
+    content_cases = []
+    for email in expected_data.get("emails", []):
+        document = resolve_document(email, emails_dir, available)
+        for item in email.get("content", []):
+            content_cases.append(ContentCase(document, email.get("language", "ru"), email.get("name"),
+                                             item.get("selector"), item.get("type"), item.get("expected")))
+    link_cases = [case for case in content_cases if case.type == "link"]
+    return {"content": content_cases, "links": link_cases}
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("emails", "проверка писем")
+    group.addoption("--emails-dir", default=EMAILS_DIR, help="папка с HTML-письмами")
+    group.addoption("--expected-file", default=os.path.join(DATA_DIR, "expected_result.json"),
+                    help="JSON с ожидаемыми результатами")
+    group.addoption("--parse-cache-dir", default=DEFAULT_PARSE_CACHE_DIR,
+                    help="каталог кэша извлечённых данных (общий для воркеров и сессий)")
+    group.addoption("--extract-mode", choices=EmailProcessor.MODES, default="soup")
+    group.addoption("--cassette-mode", choices=LinkCassette.MODES, default=None,
+                    help="записывать проверки ссылок в кассету или воспроизводить их без сети")
+    group.addoption("--cassette", default=DEFAULT_CASSETTE_FILE, help="файл кассеты проверок ссылок")
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "links: проверка доступности ссылок (сетевые запросы)")
+    expected_file = config.getoption("--expected-file")
+    expected_data = {}
+    if os.path.exists(expected_file):
+        with open(expected_file, "r", encoding="utf-8") as f:
+            expected_data = json.load(f)
+    config.stash[CASES_KEY] = build_cases(expected_data, config.getoption("--emails-dir"))
+
+
+def pytest_generate_tests(metafunc):
+    cases = metafunc.config.stash[CASES_KEY]
+    if "content_case" in metafunc.fixturenames:
+        metafunc.parametrize("content_case", cases["content"], ids=[case.id for case in cases["content"]])
+    if "link_case" in metafunc.fixturenames:
+        metafunc.parametrize("link_case", [pytest.param(case, marks=pytest.mark.links) for case in cases["links"]],
+                             ids=[case.id for case in cases["links"]])
+
+
+@pytest.fixture(scope="session")
+def parse_cache(pytestconfig):
+    """
+    Кэш извлечённых данных: каждое письмо парсится один раз за сессию (и между сессиями).
+    """
+    return ParseCache(pytestconfig.getoption("--parse-cache-dir"), pytestconfig.getoption("--extract-mode"))
+
+
+@pytest.fixture(scope="session")
+def actual_content(pytestconfig, parse_cache):
+    """
+    Функция (письмо, язык) -> {селектор: элемент content} по фактическим данным письма.
+    """
+    emails_dir = pytestconfig.getoption("--emails-dir")
+    indexes = {}
+
+    def lookup(document, language):
+        if document not in indexes:
+            email = parse_cache.get(document, emails_dir, language) if document else None
+            indexes[document] = None if email is None else {item["selector"]: item for item in email["content"]}
+        return indexes[document]
+
+    return lookup
+
+
+@pytest.fixture(scope="session")
+def link_results(pytestconfig, actual_content, tmp_path_factory):
+    """
+    Результаты проверки всех фактических ссылок, запрошенных заранее параллельно: {url: результат}.
+    Кэш ссылок — временный на сессию, чтобы тесты не писали в data/.
+    """
+    urls = []
+    for case in pytestconfig.stash[CASES_KEY]["links"]:
+        content = actual_content(case.document, case.language) or {}
+        item = content.get(case.selector)
+        if item is not None and item.get("expected"):
+            urls.append(item["expected"])
+    cassette = None
+    if pytestconfig.getoption("--cassette-mode"):
+        cassette = LinkCassette(pytestconfig.getoption("--cassette"), pytestconfig.getoption("--cassette-mode"))
+    cache = LinkCache(str(tmp_path_factory.mktemp("links") / "link_cache.sqlite"))
+    try:
+        with LinkChecker(cache=cache, cassette=cassette) as checker:
+            return dict(zip(urls, checker.fetch_urls(urls)))
+    finally:
+        cache.close()
+
+
+@pytest.fixture(scope="session")
+def text_strategy():
+    """
+    Стратегия сравнения значений (та же, что у ContentComparator).
+    """
+    return TextDiffStrategy()
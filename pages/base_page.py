@@ -1,19 +1,34 @@
 import json
-import requests
 import os
-import re
 from bs4 import BeautifulSoup
-from difflib import unified_diff
+from utils.extractor import extract_content
+from utils.selector_plans import extractor_for, DEFAULT_SELECTORS_FILE
+from utils.profiling import PROFILER, profiled
+from utils.json_diff import diff_json_files
+from utils.result_store import JsonlResultStore
+from utils.stream_extractor import StreamingExtractor, extract_content_stream, DEFAULT_CHUNK_SIZE
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 EMAILS_DIR = os.path.join(BASE_DIR, "Emails")
 DATA_DIR = os.path.join(BASE_DIR, "data")
 
+# Проверка ссылок (requests) импортируется только при обращении к этим именам
+_LINK_CHECKER_NAMES = ("check_url_status", "check_links", "LinkChecker")
+
+
+def __getattr__(name):
+    if name in _LINK_CHECKER_NAMES:
+        from utils import link_checker
+        return getattr(link_checker, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 class BasePage:
-    def __init__(self, email_filename):
+    def __init__(self, email_filename, emails_dir=EMAILS_DIR, language="ru"):
         self.email_filename = email_filename
-        self.email_path = os.path.join(EMAILS_DIR, email_filename)
+        self.email_path = os.path.join(emails_dir, email_filename)
+        self.language = language
 
+    @profiled("load_html")
     def load_html(self):
         if not os.path.exists(self.email_path):
             print(f"❌ Файл {self.email_path} не найден!")
@@ -26,106 +41,134 @@ class BasePage:
             return None
 
 class EmailPage(BasePage):
+    def __init__(self, email_filename, emails_dir=EMAILS_DIR, language="ru", selectors_file=DEFAULT_SELECTORS_FILE):
+        super().__init__(email_filename, emails_dir, language)
+        self.selectors_file = selectors_file
+
+    @profiled("parse_html")
     def parse_html(self, html):
         if html:
             return BeautifulSoup(html, "html.parser")
         else:
             return None
 
+    @profiled("extract_email_data")
     def extract_email_data(self, soup):
-        content = []
-        link_pattern = re.compile(r'^(?:[hbf]-link-\d+|f-social-link-\d+)$')
-        img_pattern = re.compile(r'^[hbf]-img-\d+$')
-        text_pattern = re.compile(r'^[hbf]-text-\d+$')
-
-        for link in soup.find_all("a", id=link_pattern):
-            content.append({
-                "selector": link.get("id", "link_no_id"),
-                "type": "link",
-                "expected": link.get("href")
-            })
-
-        for img in soup.find_all("img", id=img_pattern):
-            content.append({
-                "selector": img.get("id", "img_no_id"),
-                "type": "image",
-                "expected": img.get("src")
-            })
-
-        for text_element in soup.find_all(id=text_pattern):
-            content.append({
-                "selector": text_element.get("id", "text_no_id"),
-                "type": "text",
-                "expected": text_element.get_text(strip=True)
-            })
-
+        return self.build_email_data(extract_content(soup, extractor_for(self.email_name, self.selectors_file)))
+
+    def extract_into(self, store, soup):
+        """
+        Извлекает content письма в колоночное хранилище ContentStore; возвращает номер письма в нём.
+        """
+        return store.add_email(self.extract_email_data(soup)["emails"][0])
+
+    @staticmethod
+    def needs_tree(extractor):
+        """
+        CSS-правилам нужно дерево: такие письма всегда разбираются BeautifulSoup.
+        """
+        return any(rule.compiled_css is not None for rule in extractor.rules)
+
+    @profiled("stream_email_data")
+    def stream_email_data(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        extractor = extractor_for(self.email_name, self.selectors_file)
+        if self.needs_tree(extractor):
+            soup = self.parse_html(self.load_html())
+            return self.extract_email_data(soup) if soup else None
+        if not os.path.exists(self.email_path):
+            print(f"❌ Файл {self.email_path} не найден!")
+            return None
+        try:
+            content = extract_content_stream(self.email_path, extractor.rules, chunk_size)
+        except Exception as e:
+            print(f"❌ Ошибка при чтении {self.email_path}: {e}")
+            return None
+        return self.build_email_data(content)
+
+    def iter_records(self, mode="soup", chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Отдаёт (индекс правила, номер, запись content) по мере извлечения; в режиме
+        "stream" записи появляются до конца чтения файла. Сортировка по первым двум
+        полям даёт порядок extract_email_data. Ошибки чтения и разбора — исключения.
+        """
+        extractor = extractor_for(self.email_name, self.selectors_file)
+        if mode == "stream" and not self.needs_tree(extractor):
+            yield from StreamingExtractor(extractor.rules).iter_file(self.email_path, chunk_size)
+            return
+        soup = self.parse_html(self.load_html())
+        if soup is None:
+            raise ValueError(f"Не удалось прочитать {self.email_path}")
+        for ordinal, record in enumerate(extract_content(soup, extractor)):
+            yield 0, ordinal, record
+
+    @property
+    def email_name(self):
+        return os.path.splitext(os.path.basename(self.email_filename))[0]
+
+    def build_email_data(self, content):
         return {
             "emails": [{
                 "id": "1",
-                "name": os.path.splitext(self.email_filename)[0],
-                "language": "ru",
+                "name": self.email_name,
+                "language": self.language,
                 "document": self.email_path,
                 "content": content
             }]
         }
 
 class DataSaver:
-    def __init__(self):
-        if not os.path.exists(DATA_DIR):
-            os.makedirs(DATA_DIR)
+    def __init__(self, data_dir=DATA_DIR):
+        # Папка создаётся при первой записи, а не при создании объекта
+        self.data_dir = data_dir
 
+    @profiled("save_to_json")
     def save_to_json(self, data, filename="actual_result.json"):
-        file_path = os.path.join(DATA_DIR, filename)
+        file_path = os.path.join(self.data_dir, filename)
+        os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
         with open(file_path, "w", encoding="utf-8") as f:
             json.dump(data, f, ensure_ascii=False, indent=4)
 
+    @profiled("save_to_json")
+    def save_to_jsonl(self, data, dirname="results", compress=False):
+        """
+        Сохраняет письма в шардированное JSONL-хранилище (по записи на письмо).
+        """
+        with JsonlResultStore.create(os.path.join(self.data_dir, dirname), compress=compress) as store:
+            store.extend(data["emails"])
+        return store
+
 class EmailProcessor:
-    def __init__(self, email_filename):
-        self.email_page = EmailPage(email_filename)
+    # Режимы извлечения: "soup" строит дерево BeautifulSoup, "stream" читает файл порциями без дерева
+    MODES = ("soup", "stream")
+
+    def __init__(self, email_filename, mode="soup", emails_dir=EMAILS_DIR, language="ru",
+                 selectors_file=DEFAULT_SELECTORS_FILE):
+        if mode not in self.MODES:
+            raise ValueError(f"Неизвестный режим извлечения: {mode}")
+        self.email_page = EmailPage(email_filename, emails_dir, language, selectors_file)
         self.data_saver = DataSaver()
+        self.mode = mode
+
+    def extract(self):
+        with PROFILER.email(self.email_page.email_filename):
+            if self.mode == "stream":
+                return self.email_page.stream_email_data()
+            html_content = self.email_page.load_html()
+            if html_content:
+                soup = self.email_page.parse_html(html_content)
+                if soup:
+                    return self.email_page.extract_email_data(soup)
+            return None
 
     def process_email(self):
-        html_content = self.email_page.load_html()
-        if html_content:
-            soup = self.email_page.parse_html(html_content)
-            if soup:
-                email_data = self.email_page.extract_email_data(soup)
+        email_data = self.extract()
+        if email_data:
+            with PROFILER.email(self.email_page.email_filename):
                 self.data_saver.save_to_json(email_data)
 
-def check_url_status(url):
-    try:
-        response = requests.get(url, timeout=10)
-        if 399 < response.status_code < 600:
-            return False, response.status_code, response.url
-        return True, response.status_code, response.url
-    except requests.exceptions.RequestException as e:
-        return False, None, str(e)
-
-def check_links(data):
-    issues = []
-    for email in data['emails']:
-        for content in email['content']:
-            if content['type'] == 'link':
-                url = content['expected']
-                is_valid, status_code, final_url = check_url_status(url)
-                if not is_valid:
-                    issues.append({
-                        'selector': content['selector'],
-                        'url': url,
-                        'status_code': status_code,
-                        'final_url': final_url,
-                        'error': 'Ошибка при запросе' if status_code is None else f'Статус код: {status_code}'
-                    })
-    return issues
-
+@profiled("compare_json_files")
 def compare_json_files(actual_file, expected_file):
-    with open(actual_file, "r", encoding="utf-8") as f1, open(expected_file, "r", encoding="utf-8") as f2:
-        actual_data = json.load(f1)
-        expected_data = json.load(f2)
-
-    diff = unified_diff(
-        json.dumps(actual_data, indent=4).splitlines(),
-        json.dumps(expected_data, indent=4).splitlines(),
-        fromfile='actual', tofile='expected'
-    )
-    return list(diff)
\ No newline at end of file
+    """
+    Структурный diff фактического и ожидаемого JSON: список изменений с JSON-pointer путями.
+    """
+    return diff_json_files(actual_file, expected_file)
\ No newline at end of file
@@ -0,0 +1,125 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from utils.allure_report import AllureWriter, email_status
+from utils.comparator import TextDiffStrategy
+
+TIMINGS = {"extract": (100.0, 100.5), "compare": (100.5, 100.6)}
+
+
+def make_result(document, status="passed", differences=(), links=(), image_issues=(), email=True):
+    links = list(links)
+    return {
+        "document": document,
+        "email": {"name": os.path.splitext(os.path.basename(document))[0], "language": "ru",
+                  "content": [{"selector": "b-text-1", "type": "text", "expected": "Привет"}]} if email else None,
+        "status": status,
+        "differences": list(differences),
+        "link_issues": [link for link in links if not link["is_valid"]],
+        "image_issues": list(image_issues),
+        "links": links,
+        "timings": dict(TIMINGS) if email else {"extract": TIMINGS["extract"]},
+    }
+
+
+def make_link(selector, status_code, redirects=()):
+    return {"selector": selector, "expected": f"https://mostbet.com/{selector}", "is_valid": status_code < 400,
+            "status_code": status_code, "final_url": f"https://mostbet.com/{selector}/final",
+            "redirects": list(redirects), "start": 100.2, "stop": 101.0}
+
+
+def read_results(path):
+    results = {}
+    for file_name in os.listdir(path):
+        if file_name.endswith("-result.json"):
+            with open(os.path.join(path, file_name), "r", encoding="utf-8") as f:
+                test_result = json.load(f)
+            results[test_result["fullName"]] = test_result
+    return results
+
+
+def test_email_status():
+    """
+    Ошибка обработки — broken, нет ожидаемых данных — skipped, любые проблемы письма — failed.
+    """
+    assert email_status(make_result("a.html")) == "passed"
+    assert email_status(make_result("a.html", "error", email=False)) == "broken"
+    assert email_status(make_result("a.html", "no_expected")) == "skipped"
+    assert email_status(make_result("a.html", "failed")) == "failed"
+    assert email_status(make_result("a.html", links=[make_link("b-link-1", 404)])) == "failed"
+    assert email_status(make_result("a.html", image_issues=[{"selector": "b-img-1"}])) == "failed"
+
+
+def test_writer_output(tmp_path):
+    """
+    Письмо — отдельный тест со статусом, шагами по стадиям и вложениями на письмо.
+    """
+    diff = {"selector": "b-text-1", "type": "text", "status": "mismatch", "actual": "support@mostbet.com",
+            "expected": "support@mostbet.", "diff": TextDiffStrategy().compare("support@mostbet.com",
+                                                                              "support@mostbet.")}
+    links = [make_link("b-link-1", 200), make_link("b-link-2", 404),
+             make_link("b-link-3", 200, redirects=[{"url": "https://mostbet.com/old", "status_code": 301}])]
+    image_issue = {"selector": "b-img-1", "url": "https://cdn/logo.png", "errors": ["width: 5 вместо 4"]}
+    failed = make_result("ru/welcome.html", "failed", [diff], links, [image_issue])
+    failed["timings"]["images"] = (101.0, 101.2)
+
+    with AllureWriter(str(tmp_path)) as writer:
+        writer.write(make_result("ru/passed.html"))
+        writer.write(failed)
+        writer.write(make_result("ru/broken.html", "error", email=False))
+        writer.write(make_result("ru/skipped.html", "no_expected"))
+    assert writer.written == 4
+    assert writer.files == len(os.listdir(tmp_path)) == 6
+
+    results = read_results(str(tmp_path))
+    assert {name: result["status"] for name, result in results.items()} == {
+        "ru/passed.html#ru": "passed", "ru/welcome.html#ru": "failed", "ru/broken.html#": "broken",
+        "ru/skipped.html#ru": "skipped"}
+
+    result = results["ru/welcome.html#ru"]
+    assert result["statusDetails"]["message"] == \
+        "различий: 1, проблемных ссылок: 1, проблемных изображений: 1"
+    assert [(step["name"], step["status"]) for step in result["steps"]] == [
+        ("Извлечение", "passed"), ("Сравнение", "failed"), ("Проверка ссылок", "failed"),
+        ("Проверка изображений", "failed")]
+    assert [step["status"] for step in result["steps"][2]["steps"]] == ["passed", "failed", "passed"]
+    assert (result["start"], result["stop"]) == (100000, 101200)
+
+    attachments = {attachment["name"]: attachment["source"] for attachment in result["attachments"]}
+    text = (tmp_path / attachments["Различия"]).read_text(encoding="utf-8")
+    assert "delete в позиции 16: 'com' -> ''" in text
+    chains = json.loads((tmp_path / attachments["Редиректы и ошибки ссылок"]).read_text(encoding="utf-8"))
+    assert [chain["selector"] for chain in chains] == ["b-link-2", "b-link-3"]
+
+    assert results["ru/broken.html#"]["name"] == "broken"
+    assert [step["name"] for step in results["ru/passed.html#ru"]["steps"]] == ["Извлечение", "Сравнение"]
+    assert results["ru/passed.html#ru"]["attachments"] == []
+
+
+def test_batches_and_history(tmp_path):
+    """
+    Маленькие очередь и пачка не теряют писем; historyId одного письма не меняется между прогонами.
+    """
+    results = [make_result(f"ru/email_{index}.html") for index in range(50)]
+    for run in ("first", "second"):
+        with AllureWriter(str(tmp_path / run), queue_size=2, batch_size=3) as writer:
+            for result in results:
+                writer.write(result)
+        assert writer.written == 50
+    first, second = read_results(str(tmp_path / "first")), read_results(str(tmp_path / "second"))
+    assert len(first) == 50
+    assert all(first[name]["historyId"] == second[name]["historyId"] != first[name]["uuid"] for name in first)
+
+
+def test_write_errors_are_raised(tmp_path):
+    """
+    Ошибка записи в потоке не теряется: она выбрасывается из close.
+    """
+    writer = AllureWriter(str(tmp_path / "results")).start()
+    shutil.rmtree(tmp_path / "results")
+    writer.write(make_result("ru/welcome.html"))
+    with pytest.raises(OSError):
+        writer.close()
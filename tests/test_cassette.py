@@ -0,0 +1,39 @@
+from utils.cassette import LinkCassette
+from utils.link_checker import LinkChecker
+from utils.local_server import LocalServer
+
+
+def test_replay_without_network(tmp_path):
+    """
+    Записанная кассета воспроизводит статусы и редиректы при остановленном сервере;
+    ссылки, которых нет в кассете, не запрашиваются и считаются ошибкой.
+    """
+    path = str(tmp_path / "cassette.json")
+    with LocalServer() as server:
+        urls = [server.url("/page"), server.url("/status/404"), server.url("/redirect/2")]
+        with LinkChecker(cassette=LinkCassette(path, mode="record")) as checker:
+            recorded = checker.fetch_urls(urls)
+        assert server.stats.requests == 5
+
+    with LinkChecker(cassette=LinkCassette(path, mode="replay")) as checker:
+        replayed = checker.fetch_urls(urls)
+        missed = checker.fetch(urls[0] + "?new=1")
+    assert replayed == recorded
+    assert [result["status_code"] for result in replayed] == [200, 404, 200]
+    assert len(replayed[2]["redirects"]) == 2
+    assert missed["status_code"] is None and not missed["is_valid"]
+    assert checker.cassette.misses == [urls[0] + "?new=1"]
+
+
+def test_replay_is_per_check_mode(tmp_path):
+    """
+    Записи режимов get и probe хранятся раздельно.
+    """
+    path = str(tmp_path / "cassette.json")
+    with LocalServer() as server:
+        url = server.url("/page")
+        with LinkChecker(cassette=LinkCassette(path, mode="record")) as checker:
+            checker.fetch(url)
+
+    with LinkChecker(mode="probe", cassette=LinkCassette(path, mode="replay")) as checker:
+        assert checker.fetch(url)["status_code"] is None
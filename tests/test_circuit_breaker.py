@@ -0,0 +1,77 @@
+import pytest
+
+from utils.circuit_breaker import HostCircuitBreaker
+from utils.link_checker import LinkChecker
+from utils.local_server import BlackHoleServer, LocalServer
+
+URL = "https://example.com/page"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_and_half_opens():
+    """
+    Предохранитель размыкается на пороге, пропускает одну пробную проверку после паузы,
+    удваивает паузу при новой неудаче и замыкается после успеха.
+    """
+    clock = FakeClock()
+    breaker = HostCircuitBreaker(threshold=2, backoff=10, max_backoff=15, clock=clock)
+    breaker.record_failure(URL)
+    assert breaker.allow(URL)
+    breaker.record_failure(URL)
+    assert not breaker.allow("https://EXAMPLE.com/other")
+    assert breaker.open_hosts() == ["example.com"]
+
+    clock.now = 10
+    assert breaker.allow(URL)
+    assert not breaker.allow(URL)
+    breaker.record_failure(URL)
+    clock.now = 24
+    assert not breaker.allow(URL)
+    clock.now = 25
+    assert breaker.allow(URL)
+    breaker.record_success(URL)
+    assert not breaker.is_open(URL) and breaker.allow(URL)
+
+
+def test_unreachable_host_opens_breaker():
+    """
+    После threshold таймаутов подключения остальные ссылки на хост получают вердикт без запроса.
+    """
+    with BlackHoleServer("connect") as server:
+        urls = [server.url(f"/page/{index}") for index in range(6)]
+        with LinkChecker(per_host=1, connect_timeout=0.2, breaker=HostCircuitBreaker(threshold=3)) as checker:
+            results = checker.fetch_urls(urls)
+    assert [bool(result.get("connect_error")) for result in results] == [True] * 3 + [False] * 3
+    assert [bool(result.get("host_unreachable")) for result in results] == [False] * 3 + [True] * 3
+
+
+def test_read_timeout_keeps_breaker_closed():
+    """
+    Хост, принявший соединение, но не ответивший, доступен: таймаут чтения не размыкает предохранитель.
+    """
+    breaker = HostCircuitBreaker(threshold=1)
+    with BlackHoleServer("read") as server:
+        with LinkChecker(timeout=0.2, breaker=breaker) as checker:
+            result = checker.fetch(server.url("/"))
+        assert result["status_code"] is None and not result.get("connect_error")
+        assert not breaker.is_open(server.url("/"))
+
+
+@pytest.mark.parametrize("per_host", [1, 4])
+def test_deadline_expires_slow_links(per_host):
+    """
+    Ссылки, не проверенные до общего срока, получают вердикт deadline_expired и не кэшируются.
+    """
+    with LocalServer() as server:
+        urls = [server.url(f"/page/{index}?delay=1000") for index in range(4)]
+        with LinkChecker(per_host=per_host, deadline=0.3) as checker:
+            results = checker.fetch_urls(urls)
+    assert all(result.get("deadline_expired") for result in results)
+    assert all(not result["is_valid"] for result in results)
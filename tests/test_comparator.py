@@ -0,0 +1,113 @@
+import json
+from difflib import SequenceMatcher
+
+import pytest
+
+from utils.comparator import (ContentComparator, TextDiffStrategy, TextNormalizer, compare_files, email_name_key,
+                              format_diff)
+
+PAIRS = [
+    ("support@mostbet.com", "support@mostbet."),
+    ("https://t.me/+s259niHYNuE2OTA8", "https://t.me/+s259niHYNuE2"),
+    ("Ваш аккаунт заморожен", "Ваш аккаунт временно заморожен"),
+    ("abc", "xyz"),
+    ("", "новое"),
+    ("aaaa", "aa"),
+]
+
+
+def apply_opcodes(diff, actual, expected):
+    """
+    Собирает expected из actual по opcodes, проверяя, что они покрывают обе строки без разрывов.
+    """
+    result, position_actual, position_expected = [], 0, 0
+    for tag, i1, i2, j1, j2 in diff["opcodes"]:
+        assert (i1, j1) == (position_actual, position_expected)
+        if tag == "equal":
+            assert actual[i1:i2] == expected[j1:j2]
+        result.append(actual[i1:i2] if tag == "equal" else expected[j1:j2])
+        position_actual, position_expected = i2, j2
+    assert (position_actual, position_expected) == (len(actual), len(expected))
+    return "".join(result)
+
+
+@pytest.mark.parametrize("actual, expected", PAIRS)
+def test_structured_diff(actual, expected):
+    """
+    Opcodes превращают фактическую строку в ожидаемую, а похожесть совпадает с SequenceMatcher.
+    """
+    diff = TextDiffStrategy().compare(actual, expected)
+    assert apply_opcodes(diff, actual, expected) == expected
+    assert diff["truncated"] is False
+    assert diff["ratio"] == round(SequenceMatcher(None, actual, expected, autojunk=False).ratio(), 4)
+
+
+def test_fast_paths():
+    """
+    Равные строки и None дают None; длинная различающаяся середина не сравнивается посимвольно.
+    """
+    strategy = TextDiffStrategy(max_chars=10)
+    assert strategy.compare("same", "same") is None
+    assert strategy.compare(None, "") is None
+    assert strategy.compare(1, "1") is None
+
+    actual, expected = "prefix-" + "a" * 20 + "-suffix", "prefix-" + "b" * 30 + "-suffix"
+    diff = strategy.compare(actual, expected)
+    assert diff["truncated"] is True
+    assert diff["opcodes"] == [["equal", 0, 7, 0, 7], ["replace", 7, 27, 7, 37], ["equal", 27, 34, 37, 44]]
+    assert apply_opcodes(diff, actual, expected) == expected
+    assert "(diff сокращён)" in format_diff(diff, actual, expected)
+
+
+def test_normalizer():
+    """
+    С нормализацией неразрывные пробелы, формы Unicode и (по желанию) регистр не дают различий.
+    """
+    strategy = TextDiffStrategy(normalize=TextNormalizer(casefold=True))
+    assert strategy.compare("Ваш аккаунт  заморожен", "ваш аккаунт заморожен") is None
+    assert strategy.compare("ﬁ", "fi") is None
+    assert TextDiffStrategy().compare("a b", "a b") is not None
+
+
+def test_format_diff():
+    """
+    Структурированный diff выводится похожестью и правками; строковый diff — как есть.
+    """
+    diff = TextDiffStrategy().compare("support@mostbet.com", "support@mostbet.")
+    assert format_diff(diff, "support@mostbet.com", "support@mostbet.") == \
+        "похожесть: 91%\ndelete в позиции 16: 'com' -> ''"
+    assert format_diff("значения различаются", 1, 2) == "значения различаются"
+
+
+TYPES = {"text": "text", "link": "link", "img": "image"}
+
+
+def content(**values):
+    return [{"selector": selector, "type": TYPES[selector.split("-")[1]], "expected": value}
+            for selector, value in values.items()]
+
+
+def test_content_comparator(tmp_path):
+    """
+    Элементы сопоставляются по (письмо, селектор) независимо от порядка; статусы различий и фильтр типов.
+    """
+    actual = {"emails": [{"id": "1", "name": "welcome", "language": "ru", "content": list(reversed(content(
+        **{"b-text-1": "Привет", "b-link-1": "https://a", "b-img-1": "/new.png", "b-text-3": "лишний"})))}]}
+    expected = {"emails": [{"id": "7", "name": "welcome", "language": "ru", "content": content(
+        **{"b-text-1": "Привет", "b-link-1": "https://b", "b-img-1": "/old.png", "b-text-2": "нет"})}]}
+    expected["emails"][0]["content"][0]["type"] = "link"
+
+    comparator = ContentComparator(email_key=email_name_key)
+    differences = comparator.compare(actual, expected)
+    assert sorted((diff["selector"], diff["status"]) for diff in differences) == [
+        ("b-img-1", "mismatch"), ("b-link-1", "mismatch"), ("b-text-1", "type_mismatch"),
+        ("b-text-2", "missing"), ("b-text-3", "unexpected")]
+    assert all(diff["email"] == ("welcome", "ru") for diff in differences)
+    assert [diff["selector"] for diff in comparator.compare(actual, expected, types=("image",))] == ["b-img-1"]
+    # По умолчанию письма сопоставляются по id
+    assert {diff["status"] for diff in ContentComparator().compare(actual, expected)} == {"unexpected", "missing"}
+
+    actual_file, expected_file = tmp_path / "actual.json", tmp_path / "expected.json"
+    actual_file.write_text(json.dumps(actual), encoding="utf-8")
+    expected_file.write_text(json.dumps(expected), encoding="utf-8")
+    assert compare_files(str(actual_file), str(expected_file), comparator=comparator) == differences
@@ -0,0 +1,55 @@
+import copy
+
+from utils.comparator import ContentComparator
+from utils.content_store import ContentStore, StringTable
+
+DOCUMENT = {"emails": [
+    {"id": "1", "name": "welcome", "language": "ru", "document": "/emails/welcome.html", "content": [
+        {"selector": "h-link-1", "type": "link", "expected": "https://mostbet.com"},
+        {"selector": "h-img-1", "type": "image", "expected": "https://cdn/logo.png",
+         "asset": {"width": 129, "phash": "00ff"}},
+        {"selector": "b-text-1", "type": "text", "expected": None},
+        {"selector": "b-video-1", "type": "video", "expected": "https://cdn/clip.mp4"},
+    ]},
+    {"id": "2", "name": "welcome", "language": "en", "content": [
+        {"selector": "h-link-1", "type": "link", "expected": "https://mostbet.com"},
+    ]},
+]}
+
+
+def test_json_round_trip():
+    """
+    Документ проходит через хранилище без потерь: значения None, новые типы и дополнительные поля.
+    """
+    store = ContentStore.from_json(copy.deepcopy(DOCUMENT))
+    assert store.to_json() == DOCUMENT
+    assert len(store) == 5 and len(store.emails) == 2
+    # Повторяющиеся селектор и URL хранятся один раз
+    assert len(store.strings) == 7
+
+    records = list(store.records(types=("link", "video")))
+    assert [(record.email, record["selector"], record.get("type")) for record in records] == [
+        (0, "h-link-1", "link"), (0, "b-video-1", "video"), (1, "h-link-1", "link")]
+    assert records[0].to_dict() == DOCUMENT["emails"][0]["content"][0]
+    assert records[0].get("asset") is None
+    assert list(store.records(types=("unknown",))) == []
+
+
+def test_compare_stores_matches_json_comparison():
+    """
+    Сравнение хранилищ (в том числе с общей таблицей строк) даёт те же различия, что сравнение JSON.
+    """
+    expected = copy.deepcopy(DOCUMENT)
+    expected["emails"][0]["content"][0]["expected"] = "https://mostbet.com/ru"
+    expected["emails"][0]["content"][2]["type"] = "link"
+    del expected["emails"][1]["content"][0]
+    expected["emails"][1]["content"].append({"selector": "b-text-1", "type": "text", "expected": "Hello"})
+
+    comparator = ContentComparator()
+    differences = comparator.compare(DOCUMENT, expected)
+    assert len(differences) == 4
+    strings = StringTable()
+    for shared in (None, strings):
+        stores = ContentStore.from_json(DOCUMENT, shared), ContentStore.from_json(expected, shared)
+        assert comparator.compare(*stores) == differences
+        assert comparator.compare(*stores, types=("text",)) == comparator.compare(DOCUMENT, expected, ("text",))
@@ -0,0 +1,114 @@
+import copy
+import json
+import os
+
+import pytest
+
+from benchmarks.corpus_generator import EmailSpec, generate_corpus
+from utils.corpus import CorpusProcessor, detect_language, find_emails
+from utils.incremental import IncrementalState
+from utils.result_store import JsonlResultStore
+
+SPEC = EmailSpec(links=4, images=2, texts=6, depth=3, size_kb=4)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """
+    Корпус из 5 писем по папкам локалей и путь к его ожидаемому JSON.
+    """
+    emails_dir = tmp_path / "emails"
+    return str(emails_dir), generate_corpus(str(emails_dir), 5, SPEC)
+
+
+def summary(results):
+    return [(result["document"], result["status"], len(result["differences"])) for result in results]
+
+
+def test_find_emails_and_language(tmp_path):
+    """
+    Письма ищутся рекурсивно и сортируются; язык берётся из папки локали или суффикса имени.
+    """
+    for relative_path in ("kz/b.html", "a_EN.htm", "ru/c.txt"):
+        os.makedirs(os.path.dirname(tmp_path / relative_path), exist_ok=True)
+        (tmp_path / relative_path).write_text("", encoding="utf-8")
+    assert find_emails(str(tmp_path)) == ["a_EN.htm", os.path.join("kz", "b.html")]
+    assert [detect_language(path) for path in ("kz/b.html", "kz\\b.html", "a_EN.htm", "frozen.html")] == \
+        ["kz", "kz", "en", "ru"]
+
+
+def test_corpus_runner(corpus, tmp_path):
+    """
+    Последовательный и параллельный прогоны дают одинаковые вердикты; id назначаются по порядку писем.
+    """
+    emails_dir, expected_file = corpus
+    with open(os.path.join(emails_dir, "en", "template_1.html"), "a", encoding="utf-8") as f:
+        f.write('<p id="b-text-99">лишний</p>')
+
+    data, results = CorpusProcessor(emails_dir, expected_file, workers=1).run()
+    parallel_data, parallel_results = CorpusProcessor(emails_dir, expected_file, workers=2).run()
+    assert summary(results) == summary(parallel_results)
+    assert data == parallel_data
+    assert [email["id"] for email in data["emails"]] == ["1", "2", "3", "4", "5"]
+    assert [result["status"] for result in results].count("failed") == 1
+    assert results[0]["document"] == os.path.join("en", "template_1.html")
+    assert results[0]["differences"][0]["selector"] == "b-text-99"
+
+    store = JsonlResultStore(str(tmp_path / "results"))
+    store_data, _ = CorpusProcessor(emails_dir, expected_file, workers=1, sink=store).run()
+    assert list(JsonlResultStore(str(tmp_path / "results")).iter_emails()) == store_data["emails"]
+
+
+def test_incremental_state(corpus, tmp_path):
+    """
+    Неизменённые письма берутся из состояния (и после перезагрузки его с диска); изменение
+    письма или его ожидаемых данных перепроверяет только это письмо.
+    """
+    emails_dir, expected_file = corpus
+    state_file = str(tmp_path / "state.json")
+    processor = CorpusProcessor(emails_dir, expected_file, workers=1, state=IncrementalState(state_file))
+    first = processor.run()
+    assert processor.reused == 0
+
+    processor = CorpusProcessor(emails_dir, expected_file, workers=1, state=IncrementalState(state_file))
+    assert processor.run() == first
+    assert processor.reused == 5
+
+    # mtime изменился, содержимое нет: совпадает хэш
+    document = os.path.join(emails_dir, "ru", "template_0.html")
+    os.utime(document, ns=(0, 0))
+    assert processor.run() == first
+    assert processor.reused == 5
+
+    with open(document, "a", encoding="utf-8") as f:
+        f.write("<!-- изменено -->")
+    processor.run()
+    assert processor.reused == 4
+
+    with open(expected_file, "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    expected["emails"][1]["content"][0]["expected"] = "https://example.com/changed"
+    with open(expected_file, "w", encoding="utf-8") as f:
+        json.dump(expected, f)
+    _, results = processor.run()
+    assert processor.reused == 4
+    assert [result["status"] for result in results].count("failed") == 1
+
+    assert IncrementalState(state_file, version="другая версия извлечения").entries == {}
+
+
+def test_cached_results_are_not_mutated(corpus, tmp_path):
+    """
+    Повторные прогоны с тем же состоянием (в том числе compact) не меняют сохранённые в нём результаты.
+    """
+    emails_dir, expected_file = corpus
+    state = IncrementalState(str(tmp_path / "state.json"))
+    processor = CorpusProcessor(emails_dir, expected_file, workers=1, state=state)
+    data, _ = processor.run()
+    entries = copy.deepcopy(state.entries)
+
+    store, results = processor.run(compact=True)
+    assert processor.reused == 5
+    assert [result["email"] for result in results] == list(range(5))
+    assert state.entries == entries
+    assert processor.run()[0] == data
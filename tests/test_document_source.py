@@ -0,0 +1,58 @@
+import os
+
+from utils.document_source import DocumentCache, DocumentSource
+from utils.local_server import LocalServer
+
+HTML = b'<html><body><p id="b-text-1">Hello</p></body></html>'
+
+
+def source(url, fallback=None):
+    return {"name": "welcome", "language": "ru", "url": url, "fallback": fallback}
+
+
+def test_not_modified_keeps_document(tmp_path):
+    """
+    Повторная загрузка неизменённого документа получает 304 без тела и не перезаписывает файл;
+    изменённый документ загружается заново, а без сети используется кэшированная копия.
+    """
+    documents_dir = str(tmp_path / "documents")
+    with LocalServer(files={"/welcome.html": ("text/html", HTML)}) as server:
+        url = server.url("/welcome.html")
+        with DocumentSource(DocumentCache(documents_dir)) as documents:
+            first = documents.fetch_document(source(url))
+        assert first["status"] == "fetched" and first["changed"] and first["bytes"] == len(HTML)
+        mtime = os.stat(first["path"]).st_mtime_ns
+
+        server.reset_stats()
+        with DocumentSource(DocumentCache(documents_dir)) as documents:
+            second = documents.fetch_document(source(url))
+        assert second["status"] == "not_modified" and second["path"] == first["path"]
+        assert os.stat(second["path"]).st_mtime_ns == mtime
+        assert server.stats.body_bytes == 0
+
+        server.put_file("/welcome.html", "text/html", HTML.replace(b"Hello", b"Hi"))
+        with DocumentSource(DocumentCache(documents_dir)) as documents:
+            third = documents.fetch_document(source(url))
+        assert third["status"] == "fetched" and third["changed"]
+        with open(third["path"], "rb") as f:
+            assert b"Hi" in f.read()
+
+    with DocumentSource(DocumentCache(documents_dir), connect_timeout=0.5) as documents:
+        offline = documents.fetch_document(source(url))
+    assert offline["status"] == "cached" and offline["error"]
+    assert offline["path"] == first["path"]
+
+
+def test_fallback_and_error(tmp_path):
+    """
+    Без сети и кэша используется локальный файл; без него документ получает статус error.
+    """
+    fallback = tmp_path / "welcome.html"
+    fallback.write_bytes(HTML)
+    with LocalServer() as server:
+        with DocumentSource(DocumentCache(str(tmp_path / "documents"))) as documents:
+            results = documents.fetch_documents([source(server.url("/status/503"), str(fallback)),
+                                                 source(None)])
+    assert [result["status"] for result in results] == ["fallback", "error"]
+    with open(results[0]["path"], "rb") as f:
+        assert f.read() == HTML
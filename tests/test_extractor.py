@@ -0,0 +1,63 @@
+import os
+
+import pytest
+from bs4 import BeautifulSoup
+
+from benchmarks.bench_extraction import SOURCE_EMAIL, legacy_extract
+from benchmarks.corpus_generator import EmailSpec, generate_email
+from utils.extractor import ExtractionRule, SinglePassExtractor, extract_content
+
+EDGE_CASES = {
+    "nested_texts": '<div id="b-text-1"> A <p id="b-text-2">\n B </p><span>C</span></div><p id="b-text-10">D</p>',
+    "tag_mismatch": '<div id="h-link-1">не ссылка</div><a id="h-img-1" href="/x">не картинка</a>'
+                    '<img id="b-text-3" src="/text.png">',
+    "missing_attributes": '<a id="b-link-1">без href</a><img id="b-img-1">',
+    "unmatched_ids": '<a id="x-link-1" href="/a">x</a><a id="b-link-1a" href="/b">b</a>'
+                     '<a id="f-social-link-2" href="/c">c</a>',
+    "comments_and_entities": '<p id="f-text-1">a<!-- комментарий -->&nbsp;&amp;<br>b</p>',
+    "script_and_style": '<script id="b-text-1">var a = 1;</script><style id="b-text-2">p {}</style>'
+                        '<p id="b-text-3">x<script>var b;</script></p>',
+    "link_with_text": '<a id="h-link-1" href="/a"><span id="h-text-1">Текст ссылки</span></a>',
+}
+
+
+def parse(html):
+    return BeautifulSoup(html, "html.parser")
+
+
+@pytest.mark.parametrize("html", EDGE_CASES.values(), ids=EDGE_CASES.keys())
+def test_matches_per_selector_extraction(html):
+    """
+    Однопроходный движок даёт тот же content, что прежние три find_all по регулярным выражениям.
+    """
+    assert extract_content(parse(html)) == legacy_extract(parse(html))
+
+
+def test_matches_on_real_and_generated_emails():
+    """
+    То же на письме из репозитория и на синтетическом письме с глубокой вложенностью.
+    """
+    if os.path.exists(SOURCE_EMAIL):
+        with open(SOURCE_EMAIL, "r", encoding="utf-8") as f:
+            html = f.read()
+        assert extract_content(parse(html)) == legacy_extract(parse(html))
+
+    html, content = generate_email(EmailSpec(links=12, images=6, texts=30, depth=12, size_kb=60))
+    assert extract_content(parse(html)) == legacy_extract(parse(html)) == content
+
+
+def test_css_rules():
+    """
+    Правило с CSS-селектором проверяется в том же обходе; элемент без id адресуется селектором и номером.
+    """
+    extractor = SinglePassExtractor((ExtractionRule("link", tag="a", attribute="href", css="a.cta"),
+                                     ExtractionRule("text", r"^b-text-\d+$", css="p")))
+    html = '<a class="cta" href="/1">1</a><a href="/2">2</a><a class="cta" href="/3">3</a>' \
+           '<p id="b-text-1">p</p><span id="b-text-2">span</span>'
+    assert extractor.extract(parse(html)) == [
+        {"selector": "a.cta[1]", "type": "link", "expected": "/1"},
+        {"selector": "a.cta[2]", "type": "link", "expected": "/3"},
+        {"selector": "b-text-1", "type": "text", "expected": "p"},
+    ]
+    with pytest.raises(ValueError):
+        ExtractionRule("text")
@@ -0,0 +1,102 @@
+import io
+import json
+
+from PIL import Image
+
+from utils.image_checker import (DEFAULT_PHASH_THRESHOLD, ImageAssetCache, ImageChecker, hash_distance,
+                                 perceptual_hash)
+from utils.local_server import LocalServer, make_png
+from utils.pipeline import EmailPipeline
+
+SVG = b'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 10 10"><rect width="10" height="10"/></svg>'
+
+
+def email_data(server, asset=None):
+    images = [{"selector": "b-img-1", "type": "image", "expected": server.url("/logo.png")},
+              {"selector": "b-img-2", "type": "image", "expected": server.url("/icon.svg")},
+              {"selector": "b-img-3", "type": "image", "expected": server.url("/status/404")}]
+    if asset is not None:
+        images[0]["asset"] = asset
+    return {"emails": [{"name": "welcome", "language": "ru", "content": images}]}
+
+
+def test_served_png_is_checked(tmp_path):
+    """
+    PNG с сервера проходит проверку и совпадает со своим отпечатком; SVG без размеров не считается битым,
+    недоступное изображение и изменённое содержимое дают проблемы.
+    """
+    files = {"/logo.png": ("image/png", make_png(4, 3)), "/icon.svg": ("image/svg+xml", SVG)}
+    with LocalServer(files=files) as server:
+        with ImageChecker() as checker:
+            asset = checker.fetch(server.url("/logo.png"))
+            assert (asset["width"], asset["height"], asset["size"]) == (4, 3, len(files["/logo.png"][1]))
+            recorded = checker.record_assets(email_data(server))
+            issues = checker.check_images(recorded)
+            assert [(issue["selector"], issue["status_code"]) for issue in issues] == [("b-img-3", 404)]
+
+            server.put_file("/logo.png", "image/png", make_png(5, 3))
+            issues = checker.check_images(recorded)
+        assert [issue["selector"] for issue in issues] == ["b-img-1", "b-img-3"]
+        assert "width: 5 вместо 4" in issues[0]["errors"]
+
+        cache = ImageAssetCache(str(tmp_path / "images"))
+        with ImageChecker(cache=cache) as checker:
+            checker.check_images(email_data(server))
+            requests = server.stats.requests
+            checker.check_images(email_data(server))
+        # Кэшируются только загруженные изображения: повторно запрашивается лишь недоступное
+        assert server.stats.requests == requests + 1
+
+
+def gradient_png(width, height, reverse=False):
+    """
+    PNG с горизонтальным градиентом (у однотонных изображений одинаковый dHash).
+    """
+    image = Image.new("L", (width, height))
+    row = [x * 255 // width for x in range(width)]
+    image.putdata((row[::-1] if reverse else row) * height)
+    output = io.BytesIO()
+    image.save(output, "PNG")
+    return output.getvalue()
+
+
+def test_perceptual_hash():
+    """
+    dHash устойчив к масштабу и различает зеркальный градиент.
+    """
+    original = perceptual_hash(gradient_png(64, 32))
+    assert original is not None
+    assert hash_distance(original, perceptual_hash(gradient_png(128, 64))) <= DEFAULT_PHASH_THRESHOLD
+    assert hash_distance(original, perceptual_hash(gradient_png(64, 32, reverse=True))) > DEFAULT_PHASH_THRESHOLD
+    assert perceptual_hash(b"not an image") is None
+
+
+def test_expected_assets_and_pipeline(tmp_path):
+    """
+    Отпечатки берутся из ожидаемого JSON по письму, языку и селектору; конвейер с images
+    отдаёт проблемы изображений в image_issues.
+    """
+    with LocalServer(files={"/logo.png": ("image/png", gradient_png(64, 32))}) as server:
+        with ImageChecker() as checker:
+            asset = checker.fetch(server.url("/logo.png"))
+            html = f'<p id="b-text-1">Hi</p><img id="b-img-1" src="{server.url("/logo.png")}">'
+            (tmp_path / "welcome.html").write_text(html, encoding="utf-8")
+            expected = {"emails": [{"name": "welcome", "language": "ru", "content": [
+                {"selector": "b-text-1", "type": "text", "expected": "Hi"},
+                {"selector": "b-img-1", "type": "image", "expected": server.url("/logo.png"),
+                 "asset": {"phash": asset["phash"], "width": 64}}]}]}
+            expected_file = tmp_path / "expected.json"
+            expected_file.write_text(json.dumps(expected), encoding="utf-8")
+            image = {"selector": "b-img-1", "type": "image", "expected": server.url("/logo.png")}
+            actual = {"emails": [{"name": "welcome", "language": language, "content": [image]}
+                                 for language in ("ru", "en")]}
+            assert checker.check_images(actual, expected) == []
+
+            server.put_file("/logo.png", "image/png", gradient_png(64, 32, reverse=True))
+            issues = checker.check_images(actual, expected)
+            # Отпечаток есть только у русской версии письма
+            assert len(issues) == 1 and any("phash" in error for error in issues[0]["errors"])
+            _, results = EmailPipeline(str(tmp_path), str(expected_file), images=checker).run(["welcome.html"])
+    assert results[0]["status"] == "passed"
+    assert [issue["selector"] for issue in results[0]["image_issues"]] == ["b-img-1"]
+    assert any("phash" in error for error in results[0]["image_issues"][0]["errors"])
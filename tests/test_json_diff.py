@@ -0,0 +1,77 @@
+import json
+
+from utils.json_diff import StructuralDiff, diff_json_files, format_change
+from utils.result_store import JsonlResultStore
+
+
+def email(email_id, document="/home/user/Emails/welcome.html", **values):
+    content = [{"selector": selector, "type": "text", "expected": value} for selector, value in values.items()]
+    return {"id": email_id, "name": f"email-{email_id}", "language": "ru", "document": document,
+            "content": content}
+
+
+def changes(actual, expected):
+    return [(change["op"], change["path"]) for change in StructuralDiff().compare(actual, expected)]
+
+
+def test_changes_are_keyed_by_id_and_selector():
+    """
+    Письма сопоставляются по id, элементы — по селектору; порядок и поле document не важны.
+    """
+    actual = {"emails": [email("2", b="x"), email("1", a="1", b="2", c="3")]}
+    expected = {"emails": [email("1", document="C:\\Emails\\welcome.html", a="1", b="changed", d="4"),
+                           email("3", a="1")]}
+    assert changes(actual, expected) == [
+        ("remove", "/emails/2"),
+        ("replace", "/emails/1/content/b/expected"),
+        ("remove", "/emails/1/content/c"),
+        ("add", "/emails/1/content/d"),
+        ("add", "/emails/3"),
+    ]
+    assert changes(expected, expected) == []
+
+
+def test_scalars_are_compared_by_type():
+    """
+    1, 1.0 и true — разные значения JSON, в том числе внутри совпадающих по == поддеревьев.
+    """
+    assert changes({"a": [1, True]}, {"a": [1.0, 1]}) == [("replace", "/a/0"), ("replace", "/a/1")]
+    assert changes({"a": {"b": 1}}, {"a": {"b": 1}}) == []
+
+
+def test_duplicate_keys_are_reported():
+    """
+    Повторный id или селектор не склеивается молча: первый элемент сравнивается, повтор выдаётся отдельно.
+    """
+    actual = {"emails": [email("1", a="1"), email("1", a="2")]}
+    expected = {"emails": [email("1", a="1", b="2")]}
+    expected["emails"][0]["content"].append({"selector": "a", "type": "text", "expected": "3"})
+    result = StructuralDiff().compare(actual, expected)
+    assert [(change["op"], change["path"]) for change in result] == [
+        ("duplicate", "/emails/1/content/a"),
+        ("add", "/emails/1/content/b"),
+        ("duplicate", "/emails/1"),
+    ]
+    assert result[0]["expected"]["expected"] == "3"
+    assert result[2]["actual"]["content"][0]["expected"] == "2"
+    assert format_change(result[0]).startswith("! /emails/1/content/a: повторяющийся ключ")
+
+
+def test_stores_are_compared_email_by_email(tmp_path):
+    """
+    Каталог JsonlResultStore сравнивается с JSON-файлом и с другим хранилищем так же, как документы в памяти.
+    """
+    actual = {"emails": [email("1", a="1"), email("2", a="2"), email("2", a="3"), email("4", a="4")]}
+    expected = {"emails": [email("1", a="1"), email("2", a="changed"), email("3", a="3")]}
+    expected_file = tmp_path / "expected.json"
+    expected_file.write_text(json.dumps(expected), encoding="utf-8")
+    with JsonlResultStore(str(tmp_path / "actual"), shard_size=2, compress=True) as store:
+        store.extend(actual["emails"])
+    with JsonlResultStore(str(tmp_path / "expected")) as store:
+        store.extend(expected["emails"])
+
+    in_memory = StructuralDiff().compare(actual, expected)
+    for expected_path in (expected_file, tmp_path / "expected"):
+        streamed = diff_json_files(str(tmp_path / "actual"), str(expected_path))
+        assert sorted(map(format_change, streamed)) == sorted(map(format_change, in_memory))
+    assert {change["op"] for change in in_memory} == {"replace", "duplicate", "remove", "add"}
@@ -0,0 +1,38 @@
+from utils.link_cache import LinkCache, canonicalize_url
+from utils.link_checker import LinkChecker
+from utils.local_server import LocalServer
+
+
+def test_canonicalize_url():
+    """
+    Канонический URL не зависит от регистра хоста, порта по умолчанию, фрагмента и трекинговых параметров;
+    ссылки без URL и с нечисловым портом возвращаются как есть.
+    """
+    assert (canonicalize_url(" HTTPS://Example.com:443/a?utm_source=x&b=2&a=1#top ")
+            == "https://example.com/a?a=1&b=2")
+    assert canonicalize_url("http://example.com:8080") == "http://example.com:8080/"
+    assert canonicalize_url(None) is None
+    assert canonicalize_url("http://host:abc/x") == "http://host:abc/x"
+
+
+def test_cache_is_per_check_mode():
+    """
+    Результат проверки probe не выдаётся проверке get; ссылки без URL не кэшируются.
+    """
+    cache = LinkCache(":memory:")
+    result = {"is_valid": True, "status_code": 200, "final_url": "https://example.com/", "redirects": []}
+    cache.put("https://example.com/?utm_medium=mail", result, "probe")
+    assert cache.get("https://EXAMPLE.com/", "probe") == result
+    assert cache.get("https://example.com/", "get") is None
+    cache.put(None, result)
+    assert cache.get(None) is None and len(cache) == 1
+
+
+def test_broken_links_do_not_stop_cached_run():
+    """
+    Ссылка без href и ссылка с битым портом получают вердикт «ошибка», а не исключение.
+    """
+    with LocalServer() as server:
+        with LinkChecker(cache=LinkCache(":memory:")) as checker:
+            results = checker.check_urls([None, "http://host:abc/x", server.url("/page")])
+    assert [(valid, status) for valid, status, _ in results] == [(False, None), (False, None), (True, 200)]
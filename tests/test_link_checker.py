@@ -0,0 +1,58 @@
+import pytest
+
+from utils.link_checker import LinkChecker
+from utils.local_server import LocalServer
+
+
+@pytest.fixture
+def server():
+    with LocalServer() as local_server:
+        yield local_server
+
+
+def test_per_host_limit(server):
+    """
+    К одному хосту одновременно идёт не больше per_host запросов, даже при большем concurrency.
+    """
+    urls = [server.url(f"/page/{index}?delay=100") for index in range(8)]
+    with LinkChecker(concurrency=8, per_host=2) as checker:
+        results = checker.fetch_urls(urls)
+    assert all(result["is_valid"] for result in results)
+    assert server.stats.requests == len(urls)
+    assert server.stats.max_in_flight == 2
+
+
+def test_duplicate_urls_fetched_once(server):
+    """
+    Одинаковые ссылки запрашиваются один раз; результаты возвращаются в порядке входного списка.
+    """
+    urls = [server.url("/status/404"), server.url("/page"), server.url("/status/404")]
+    with LinkChecker() as checker:
+        results = checker.check_urls(urls)
+    assert [valid for valid, _, _ in results] == [False, True, False]
+    assert [status for _, status, _ in results] == [404, 200, 404]
+    assert server.stats.requests == 2
+
+
+def test_probe_falls_back_to_get(server):
+    """
+    В режиме probe ответ 405 на HEAD перепроверяется GET-запросом; редиректы проходятся без скачивания тел.
+    """
+    with LinkChecker(mode="probe") as checker:
+        no_head = checker.fetch(server.url("/page?nohead=1"))
+        redirected = checker.fetch(server.url("/redirect/2"))
+    assert no_head["is_valid"] and no_head["status_code"] == 200
+    assert redirected["final_url"] == server.url("/redirect/0")
+    assert len(redirected["redirects"]) == 2
+    assert server.stats.body_bytes == len(b"ok")
+
+
+def test_get_is_default_mode(server):
+    """
+    По умолчанию ссылки проверяются полным GET-запросом.
+    """
+    with LinkChecker() as checker:
+        result = checker.fetch(server.url("/page?nohead=1"))
+    assert checker.mode == "get"
+    assert result["status_code"] == 200
+    assert server.stats.requests == 1
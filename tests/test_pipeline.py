@@ -0,0 +1,87 @@
+import json
+import os
+
+from benchmarks.corpus_generator import EmailSpec, generate_corpus
+from utils.corpus import CorpusProcessor
+from utils.link_checker import LinkChecker
+from utils.local_server import LocalServer
+from utils.pipeline import EmailPipeline
+from utils.result_store import JsonlResultStore
+
+
+def make_corpus(tmp_path, server, emails=4):
+    """
+    Корпус с общими шапкой и подвалом (одинаковые ссылки во всех письмах) и одной битой ссылкой
+    в первом письме, которая есть и в ожидаемых данных.
+    """
+    emails_dir = str(tmp_path / "emails")
+    spec = EmailSpec(links=6, images=2, texts=6, depth=3, size_kb=4, link_base=server.url("/"),
+                     shared_sections=("h", "f"))
+    expected_file = generate_corpus(emails_dir, emails, spec)
+    broken = {"selector": "b-link-99", "type": "link", "expected": server.url("/status/404")}
+    with open(os.path.join(emails_dir, "ru", "template_0.html"), "a", encoding="utf-8") as f:
+        f.write(f'<a id="{broken["selector"]}" href="{broken["expected"]}">битая</a>')
+    with open(expected_file, "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    expected["emails"][0]["content"].insert(0, broken)
+    with open(expected_file, "w", encoding="utf-8") as f:
+        json.dump(expected, f)
+    return emails_dir, expected_file
+
+
+def test_pipeline_matches_corpus_runner(tmp_path):
+    """
+    Конвейер даёт те же письма и вердикты, что пакетная обработка; каждая уникальная ссылка
+    проверяется один раз, а report получает письмо, когда проверены все его ссылки.
+    """
+    with LocalServer() as server:
+        emails_dir, expected_file = make_corpus(tmp_path, server)
+        corpus_data, corpus_results = CorpusProcessor(emails_dir, expected_file, workers=1).run()
+        urls = {item["expected"] for email in corpus_data["emails"] for item in email["content"]
+                if item["type"] == "link"}
+
+        for mode in ("stream", "soup"):
+            server.reset_stats()
+            reported = []
+            store = JsonlResultStore(str(tmp_path / mode))
+            with LinkChecker() as checker:
+                data, results = EmailPipeline(emails_dir, expected_file, mode, checker, sink=store,
+                                              report=reported.append).run()
+            assert data == corpus_data
+            assert list(JsonlResultStore(str(tmp_path / mode)).iter_emails()) == data["emails"]
+            assert [result["status"] for result in results] == [result["status"] for result in corpus_results]
+            assert {result["status"] for result in results} == {"passed"}
+            assert server.stats.requests == len(urls)
+
+            assert sorted(result["document"] for result in reported) == sorted(result["document"]
+                                                                                for result in results)
+            for result in reported:
+                link_selectors = [item["selector"] for item in result["email"]["content"] if item["type"] == "link"]
+                assert [link["selector"] for link in result["links"]] == link_selectors
+                assert set(result["timings"]) == {"extract", "compare"}
+            issues = {result["document"]: [issue["selector"] for issue in result["link_issues"]]
+                      for result in results}
+            assert issues.pop(os.path.join("ru", "template_0.html")) == ["b-link-99"]
+            assert all(selectors == [] for selectors in issues.values())
+
+
+def test_pipeline_without_checker(tmp_path):
+    """
+    Без LinkChecker ссылки не проверяются; фильтр types и ошибки отдельных писем не останавливают прогон.
+    """
+    with LocalServer() as server:
+        emails_dir, expected_file = make_corpus(tmp_path, server, emails=2)
+        with open(os.path.join(emails_dir, "en", "template_1.html"), "a", encoding="utf-8") as f:
+            f.write('<p id="b-text-99">лишний</p>')
+
+        reported = []
+        data, results = EmailPipeline(emails_dir, expected_file, report=reported.append).run(
+            ["en/template_1.html", "ru/template_0.html", "ru/missing.html"])
+        assert [result["status"] for result in results] == ["failed", "passed", "error"]
+        assert [diff["selector"] for diff in results[0]["differences"]] == ["b-text-99"]
+        assert len(data["emails"]) == 2 and len(reported) == 3
+        assert server.stats.requests == 0
+        assert all(result["links"] == [] and result["link_issues"] == [] for result in results)
+
+        _, results = EmailPipeline(emails_dir, expected_file, types=("link", "image")).run(["en/template_1.html"])
+        assert results[0]["status"] == "passed"
@@ -0,0 +1,76 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from utils.result_store import INDEX_FILE, JsonlResultStore, load_results
+
+
+def make_emails(start, count):
+    return [{"id": str(number), "name": f"письмо-{number}", "language": "ru",
+             "content": [{"selector": "b-text-1", "type": "text", "expected": f"Текст {number}"}]}
+            for number in range(start, start + count)]
+
+
+@pytest.mark.parametrize("compress", (False, True), ids=("plain", "gzip"))
+def test_round_trip(tmp_path, compress):
+    """
+    Записи читаются потоком и по id, в том числе до закрытия шарда и из сжатых шардов.
+    """
+    path = str(tmp_path / "results")
+    emails = make_emails(1, 7)
+    store = JsonlResultStore(path, shard_size=3, compress=compress)
+    store.extend(emails[:5])
+    assert store.get("2") == emails[1] and store.get(5) == emails[4]
+    store.extend(emails[5:])
+    store.close()
+
+    assert store.shards == [f"shard-{shard:05d}.jsonl" + (".gz" if compress else "") for shard in range(3)]
+    assert list(store.iter_emails()) == emails
+    assert [store.get(email["id"]) for email in emails] == emails
+    assert store.get("100") is None and "7" in store and "8" not in store
+    if compress:
+        # Шард со сжатыми записями остаётся обычным gzip-файлом
+        with gzip.open(os.path.join(path, store.shards[0]), "rt", encoding="utf-8") as f:
+            assert [json.loads(line) for line in f] == emails[:3]
+
+
+@pytest.mark.parametrize("compress", (False, True), ids=("plain", "gzip"))
+def test_reopen_existing_index(tmp_path, compress):
+    """
+    Открытое заново хранилище берёт параметры из индекса и дописывает последний неполный шард.
+    """
+    path = str(tmp_path / "results")
+    with JsonlResultStore(path, shard_size=3, compress=compress) as store:
+        store.extend(make_emails(1, 4))
+
+    with JsonlResultStore(path) as store:
+        assert (store.shard_size, store.compress, len(store)) == (3, compress, 4)
+        assert store.get("4") == make_emails(4, 1)[0]
+        store.extend(make_emails(5, 3))
+
+    reopened = JsonlResultStore(path)
+    assert list(reopened.iter_emails()) == make_emails(1, 7)
+    assert len(reopened.shards) == 3
+    assert reopened.get("6") == make_emails(6, 1)[0]
+
+    JsonlResultStore.create(path)
+    assert sorted(os.listdir(path)) == []
+
+
+def test_json_import_export(tmp_path):
+    """
+    Импорт и экспорт одного JSON-файла; load_results читает и файл, и каталог хранилища.
+    """
+    source, exported = tmp_path / "source.json", tmp_path / "exported.json"
+    source.write_text(json.dumps({"emails": make_emails(1, 5)}, ensure_ascii=False), encoding="utf-8")
+    store = JsonlResultStore(str(tmp_path / "results"), shard_size=2, compress=True)
+    store.import_json(str(source))
+    assert os.path.exists(tmp_path / "results" / INDEX_FILE)
+
+    store.export_json(str(exported))
+    assert json.loads(exported.read_text(encoding="utf-8")) == {"emails": make_emails(1, 5)}
+    assert load_results(str(tmp_path / "results")) == load_results(str(exported)) == {"emails": make_emails(1, 5)}
+    JsonlResultStore(str(tmp_path / "empty")).export_json(str(exported))
+    assert json.loads(exported.read_text(encoding="utf-8")) == {"emails": []}
@@ -0,0 +1,78 @@
+import json
+
+from pages.base_page import EmailPage, EmailProcessor
+from utils.sections import SectionCache, split_sections
+
+EMAIL = ('<html><body>\r\n<table><tr><td><span id="h-text-1">Hello\r\nworld</span>'
+         '<a id="h-link-1" href="https://example.com/h">h</a></td></tr></table>\r\n'
+         '<p id="b-text-1">Body\rtext</p>\r\n'
+         '<p id="f-text-1">Footer\r\n</p></body></html>\r\n')
+
+
+def write_email(tmp_path, name, html=EMAIL):
+    with open(tmp_path / name, "w", encoding="utf-8", newline="") as f:
+        f.write(html)
+
+
+def test_split_sections_covers_document():
+    """
+    Части идут по порядку секций и покрывают весь документ; перемешанные секции не делятся.
+    """
+    html = EMAIL.encode("utf-8")
+    parts = split_sections(html)
+    assert [section for section, _, _ in parts] == [None, "h", "b", "f"]
+    assert parts[0][1] == 0 and parts[-1][2] == len(html)
+    assert all(parts[index][2] == parts[index + 1][1] for index in range(len(parts) - 1))
+    assert split_sections(b'<p id="h-text-1"></p><p id="b-text-1"></p><p id="h-text-2"></p>') is None
+
+
+def test_crlf_email_matches_plain_extraction(tmp_path):
+    """
+    Письмо с переводами строк CRLF извлекается по секциям так же, как целиком.
+    """
+    write_email(tmp_path, "crlf.html")
+    plain = EmailProcessor("crlf.html", "soup", str(tmp_path)).extract()["emails"][0]["content"]
+    content, digests = SectionCache().extract(EmailPage("crlf.html", str(tmp_path)))
+    assert content == plain
+    assert "Hello\nworld" in [item["expected"] for item in content]
+    assert set(digests) == {"h", "b", "f"}
+
+
+def test_shared_sections_are_reused(tmp_path):
+    """
+    Общие шапка и подвал разбираются один раз; CRLF и LF версии одного письма совпадают.
+    """
+    write_email(tmp_path, "first.html")
+    write_email(tmp_path, "second.html", EMAIL.replace("Body", "Other").replace("\r\n", "\n"))
+    cache = SectionCache()
+    first, first_digests = cache.extract(EmailPage("first.html", str(tmp_path)))
+    second, second_digests = cache.extract(EmailPage("second.html", str(tmp_path)))
+    assert first_digests["h"] == second_digests["h"] and first_digests["f"] == second_digests["f"]
+    assert first_digests["b"] != second_digests["b"]
+    assert cache.parsed == 5 and cache.reused == 3
+    assert second == EmailProcessor("second.html", "soup", str(tmp_path)).extract()["emails"][0]["content"]
+
+
+def test_ids_in_script_and_attributes_are_not_sections(tmp_path):
+    """
+    id в строках script и в значениях атрибутов не дают границ секций и не попадают в content.
+    """
+    html = EMAIL.replace('<p id="b-text-1">', '<script>var s = \'<div id="b-text-9">fake</div>\';</script>'
+                                              '<p id="b-text-1">')
+    write_email(tmp_path, "script.html", html)
+    content, _ = SectionCache().extract(EmailPage("script.html", str(tmp_path)))
+    assert content == EmailProcessor("script.html", "soup", str(tmp_path)).extract()["emails"][0]["content"]
+    assert "b-text-9" not in [item["selector"] for item in content]
+    assert split_sections(b'<p id="h-text-1">a</p><a title="<p id=b-text-1>">x</a>') is None
+
+
+def test_custom_selectors_file(tmp_path):
+    """
+    Секции извлекаются по файлу селекторов страницы, а не по data/selectors.json.
+    """
+    selectors_file = tmp_path / "selectors.json"
+    selectors_file.write_text(json.dumps({"families": {"default": [{"type": "text", "id": "^b-text-\\d+$"}]}}))
+    write_email(tmp_path, "custom.html")
+    page = EmailPage("custom.html", str(tmp_path), selectors_file=str(selectors_file))
+    content, _ = SectionCache().extract(page)
+    assert [item["selector"] for item in content] == ["b-text-1"]
@@ -0,0 +1,99 @@
+import json
+import os
+import re
+
+import pytest
+import soupsieve
+from bs4 import BeautifulSoup
+
+from utils.extractor import DEFAULT_RULES, extract_content
+from utils.selector_plans import (DEFAULT_SELECTORS_FILE, SelectorPlans, extractor_for, load_plans,
+                                  plans_fingerprint, rule_to_config)
+
+HTML = ('<a id="b-link-1" href="/a">a</a><p id="b-text-1">Текст</p><div class="promo">Промо</div>'
+        '<span data-code="X1" id="b-code-1">код</span>')
+PROMO_FAMILY = [
+    {"type": "text", "id": "^b-text-\\d+$"},
+    {"type": "promo", "css": "div.promo"},
+    {"type": "code", "id": "^b-code-\\d+$", "tag": "span", "attribute": "data-code"},
+]
+
+
+def write(path, config):
+    """
+    Записывает конфигурацию и сдвигает mtime, чтобы изменение было заметно и в пределах одной секунды.
+    """
+    path.write_text(json.dumps(config), encoding="utf-8")
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_default_plans_match_builtin_rules(tmp_path):
+    """
+    Без файла используются DEFAULT_RULES; data/selectors.json задаёт те же правила.
+    """
+    plans = load_plans(str(tmp_path / "missing.json"))
+    assert plans.families["default"] == [rule_to_config(rule) for rule in DEFAULT_RULES]
+    soup = BeautifulSoup(HTML, "html.parser")
+    assert plans.extractor_for("welcome").extract(soup) == extract_content(soup)
+    assert extractor_for("frozen_account_RU", DEFAULT_SELECTORS_FILE).extract(soup) == extract_content(soup)
+    assert plans_fingerprint(str(tmp_path / "missing.json")) == SelectorPlans().fingerprint
+
+
+def test_families_and_new_types(tmp_path):
+    """
+    Письмо получает план первого совпавшего шаблона; новые типы элементов извлечены тем же обходом.
+    """
+    path = tmp_path / "selectors.json"
+    default = [rule_to_config(rule) for rule in DEFAULT_RULES]
+    write(path, {"families": {"default": default, "promo": PROMO_FAMILY, "same": default},
+                 "templates": [{"pattern": "^promo_", "family": "promo"}, {"pattern": "^same", "family": "same"}]})
+    plans = load_plans(str(path))
+    assert [plans.family_for(name) for name in ("promo_ru", "same_ru", "welcome", None)] == \
+        ["promo", "same", "default", "default"]
+    assert plans.extractor_for("promo_ru").extract(BeautifulSoup(HTML, "html.parser")) == [
+        {"selector": "b-text-1", "type": "text", "expected": "Текст"},
+        {"selector": "div.promo[1]", "type": "promo", "expected": "Промо"},
+        {"selector": "b-code-1", "type": "code", "expected": "X1"},
+    ]
+    # План компилируется один раз на конфигурацию правил
+    assert plans.extractor_for("same_ru") is plans.extractor_for("welcome")
+    assert load_plans(str(path)) is plans
+
+
+def test_reload_after_change(tmp_path):
+    """
+    Файл перечитывается только после изменения; отпечаток меняется вместе с правилами.
+    """
+    path = tmp_path / "selectors.json"
+    write(path, {"families": {"default": PROMO_FAMILY}})
+    first = load_plans(str(path))
+    write(path, {"families": {"default": PROMO_FAMILY[:1]}})
+    second = load_plans(str(path))
+    assert second is not first and second.fingerprint != first.fingerprint
+    assert [item["type"] for item in extractor_for("x", str(path)).extract(BeautifulSoup(HTML, "html.parser"))] == \
+        ["text"]
+
+
+@pytest.mark.parametrize("config, error", [
+    ({"families": {"promo": PROMO_FAMILY}}, ValueError),
+    ({"families": {"default": PROMO_FAMILY}, "templates": [{"pattern": "^x", "family": "missing"}]}, KeyError),
+    ({"families": {"default": [{"type": "text", "id": "^b-text-(\\d+$"}]}}, re.error),
+    ({"families": {"default": [{"type": "text", "css": "div[["}]}}, soupsieve.SelectorSyntaxError),
+    ({"families": {"default": [{"type": "text"}]}}, ValueError),
+    ({"families": {"default": [{"id": "^x$"}]}}, KeyError),
+], ids=("no_default", "unknown_family", "bad_regex", "bad_css", "no_pattern", "no_type"))
+def test_config_errors(tmp_path, config, error):
+    """
+    Ошибки конфигурации видны при загрузке; с keep_previous до следующего изменения файла
+    используются прежние планы.
+    """
+    path = tmp_path / "selectors.json"
+    write(path, {"families": {"default": PROMO_FAMILY}})
+    good = load_plans(str(path))
+    write(path, config)
+    with pytest.raises(error):
+        load_plans(str(path))
+    with pytest.raises(error):
+        load_plans(str(path), keep_previous=True)
+    assert load_plans(str(path)) is good
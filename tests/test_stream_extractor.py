@@ -0,0 +1,62 @@
+import shutil
+
+import pytest
+from bs4 import BeautifulSoup
+
+from benchmarks.bench_extraction import SOURCE_EMAIL
+from benchmarks.corpus_generator import EmailSpec, generate_email
+from utils.extractor import ExtractionRule, extract_content
+from utils.stream_extractor import StreamingExtractor, extract_content_stream
+
+CHUNK_SIZES = (1, 3, 65536)
+
+DOCUMENTS = {
+    "nested_texts": '<div id="b-text-1"> A <p id="b-text-2">\n B </p><span>C</span></div><p id="b-text-10">D</p>',
+    "entities": '<p id="b-text-1">&laquo;Акция&raquo;&nbsp;&#8212;&#x41;&amp;&unknown; &lt;b&gt;</p>'
+                '<a id="b-link-1" href="/a?x=1&amp;y=2&copy">a</a>',
+    "void_and_self_closing": '<p id="b-text-1">a<br>b<br/>c<img id="b-img-1" src="/i.png"/>d</p>',
+    "unclosed_tags": '<div id="b-text-1"><p>one<p>two</div><span id="f-text-1">three',
+    "stray_end_tags": '<p id="b-text-1">a</span></b>b</p></div><p id="b-text-2">c</p>',
+    "comments_and_declarations": '<!DOCTYPE html><p id="b-text-1">a<!-- <p id="b-text-2">скрыт</p> -->b'
+                                 '<![CDATA[c]]></p><?php echo 1; ?>',
+    "script_and_style": '<script id="b-text-1">if (a < b) { x = "</p>"; }</script>'
+                        '<style id="b-text-2">p { color: red }</style><p id="b-text-3">x<script>y</script></p>',
+    "tag_mismatch": '<div id="h-link-1">не ссылка</div><a id="h-img-1" href="/x">x</a><a id="b-link-1">без href</a>',
+}
+
+
+def soup_content(html):
+    return extract_content(BeautifulSoup(html, "html.parser"))
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("name", DOCUMENTS)
+def test_stream_matches_soup(tmp_path, name, chunk_size):
+    """
+    Потоковое извлечение совпадает с BeautifulSoup + SinglePassExtractor при любом размере порции.
+    """
+    path = tmp_path / f"{name}.html"
+    path.write_text(DOCUMENTS[name], encoding="utf-8")
+    assert extract_content_stream(str(path), chunk_size=chunk_size) == soup_content(DOCUMENTS[name])
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_stream_matches_soup_on_emails(tmp_path, chunk_size):
+    """
+    То же на письме из репозитория и на синтетическом письме с глубокой вложенностью.
+    """
+    generated = tmp_path / "generated.html"
+    generated.write_text(generate_email(EmailSpec(texts=20, depth=10, size_kb=20))[0], encoding="utf-8")
+    shutil.copy(SOURCE_EMAIL, tmp_path / "source.html")
+    for path in (tmp_path / "source.html", generated):
+        expected = soup_content(path.read_text(encoding="utf-8"))
+        assert expected
+        assert extract_content_stream(str(path), chunk_size=chunk_size) == expected
+
+
+def test_css_rules_need_a_tree():
+    """
+    Правила с CSS-селектором потоковый режим не поддерживает.
+    """
+    with pytest.raises(ValueError):
+        StreamingExtractor((ExtractionRule("link", tag="a", attribute="href", css="a.cta"),))
@@ -0,0 +1,71 @@
+import json
+import os
+
+from utils.watch import EmailWatcher
+
+EMAIL = '<html><body><p id="b-text-1">Hello</p><p id="b-text-2">World</p></body></html>'
+RULES = [{"type": "text", "id": "^b-text-1$"}]
+
+
+def write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    # Новая запись должна отличаться по mtime даже на файловых системах с грубым временем
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+
+def selectors(text_id):
+    return json.dumps({"families": {"default": [{"type": "text", "id": text_id}]}})
+
+
+def test_bad_selectors_keep_last_good_plan(tmp_path, capsys):
+    """
+    Неверное регулярное выражение в плане селекторов не останавливает наблюдение:
+    письма извлекаются по прежнему плану, а исправленный план применяется на следующем опросе.
+    """
+    emails_dir = tmp_path / "Emails"
+    emails_dir.mkdir()
+    write(emails_dir / "welcome.html", EMAIL)
+    selectors_file = str(tmp_path / "selectors.json")
+    write(selectors_file, selectors("^b-text-1$"))
+    expected_file = str(tmp_path / "expected.json")
+    write(expected_file, json.dumps({"emails": [{"name": "welcome", "language": "ru", "content": [
+        {"selector": "b-text-1", "type": "text", "expected": "Hello"}]}]}))
+
+    with EmailWatcher(str(emails_dir), expected_file, selectors_file, check_links=False,
+                      report=lambda result: None) as watcher:
+        assert [result["status"] for result in watcher.poll()] == ["passed"]
+
+        write(selectors_file, selectors("^[hbf-text-(\\d+$"))
+        write(emails_dir / "welcome.html", EMAIL.replace("World", "Everyone"))
+        assert [result["status"] for result in watcher.poll()] == ["passed"]
+        assert "Не удалось прочитать" in capsys.readouterr().out
+        assert watcher.poll() == []
+
+        write(selectors_file, selectors("^b-text-\\d+$"))
+        results = watcher.poll()
+    assert [result["status"] for result in results] == ["failed"]
+    assert [diff["selector"] for diff in results[0]["differences"]] == ["b-text-2"]
+
+
+def test_bad_expected_json_is_retried(tmp_path):
+    """
+    Недописанный ожидаемый JSON не сбрасывает прежние ожидаемые данные.
+    """
+    emails_dir = tmp_path / "Emails"
+    emails_dir.mkdir()
+    write(emails_dir / "welcome.html", EMAIL)
+    expected_file = str(tmp_path / "expected.json")
+    content = [{"selector": "b-text-1", "type": "text", "expected": "Hello"}]
+    write(expected_file, json.dumps({"emails": [{"name": "welcome", "language": "ru", "content": content}]}))
+    selectors_file = str(tmp_path / "selectors.json")
+    write(selectors_file, json.dumps({"families": {"default": RULES}}))
+
+    with EmailWatcher(str(emails_dir), expected_file, selectors_file, check_links=False,
+                      report=lambda result: None) as watcher:
+        watcher.poll()
+        write(expected_file, '{"emails": [')
+        assert watcher.poll() == []
+        write(emails_dir / "welcome.html", EMAIL.replace("Hello", "Hi"))
+        assert [result["status"] for result in watcher.poll()] == ["failed"]
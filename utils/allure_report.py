@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+import uuid
+
+from utils.comparator import format_diff
+
+# Абсолютный путь для данных
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DEFAULT_ALLURE_DIR = os.path.join(DATA_DIR, "allure-results")
+
+# Писем в очереди на запись и писем, записываемых за один проход потока записи
+DEFAULT_QUEUE_SIZE = 64
+DEFAULT_BATCH_SIZE = 32
+
+_DONE = object()
+
+
+def _ms(seconds):
+    return int(seconds * 1000)
+
+
+def _span(*timings):
+    """
+    Общий интервал (start, stop) нескольких интервалов; пустые пропускаются.
+    """
+    timings = [timing for timing in timings if timing]
+    if not timings:
+        return None
+    return min(start for start, _ in timings), max(stop for _, stop in timings)
+
+
+def _step(name, status, timing, steps=(), parameters=None):
+    start, stop = timing
+    step = {"name": name, "status": status, "stage": "finished", "start": _ms(start), "stop": _ms(stop),
+            "steps": list(steps), "attachments": []}
+    if parameters:
+        step["parameters"] = [{"name": key, "value": str(value)} for key, value in parameters.items()]
+    return step
+
+
+def email_status(result):
+    """
+    Статус Allure для вердикта письма.
+    """
+    if result["status"] == "error":
+        return "broken"
+    if result["status"] == "no_expected":
+        return "skipped"
+    if result["status"] == "failed" or result["link_issues"] or result.get("image_issues"):
+        return "failed"
+    return "passed"
+
+
+class AllureWriter:
+    """
+    Потоковая запись результатов в формате Allure (allure-results).
+
+    Каждое письмо — отдельный тест <uuid>-result.json с шагами «Извлечение»,
+    «Сравнение» и «Проверка ссылок» (длительности — из замеров конвейера),
+    вложенными шагами по каждому различию и ссылке и вложениями: текст всех
+    различий письма и JSON с цепочками редиректов проблемных ссылок. Вложения
+    собираются на письмо, а не на элемент, поэтому число файлов не растёт с
+    числом элементов.
+
+    write() только ставит вердикт в ограниченную очередь (при переполнении
+    ждёт), а JSON собирается и пишется в отдельном потоке пачками до
+    batch_size писем, так что память ограничена размером очереди, а запись
+    файлов не тормозит извлечение и проверку. Отчёт строится командой
+    `allure generate <каталог>`.
+    """
+
+    def __init__(self, path=DEFAULT_ALLURE_DIR, queue_size=DEFAULT_QUEUE_SIZE, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.written = 0
+        self.files = 0
+        self._queue = queue.Queue(queue_size)
+        self._thread = None
+        self._error = None
+
+    def start(self):
+        os.makedirs(self.path, exist_ok=True)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def write(self, result):
+        """
+        Ставит вердикт письма в очередь на запись.
+        """
+        if self._error is not None:
+            raise self._error
+        self._queue.put(result)
+
+    def close(self):
+        if self._thread is None:
+            return
+        self._queue.put(_DONE)
+        self._thread.join()
+        self._thread = None
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        done = False
+        while not done:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if batch[-1] is _DONE:
+                batch.pop()
+                done = True
+            try:
+                self._write_batch(batch)
+            except Exception as e:
+                self._error = e
+
+    def _write_batch(self, batch):
+        for result in batch:
+            test_result, attachments = self.build(result)
+            for file_name, content in attachments:
+                with open(os.path.join(self.path, file_name), "w", encoding="utf-8") as f:
+                    f.write(content)
+            with open(os.path.join(self.path, f"{test_result['uuid']}-result.json"), "w", encoding="utf-8") as f:
+                json.dump(test_result, f, ensure_ascii=False)
+            self.written += 1
+            self.files += len(attachments) + 1
+
+    def build(self, result):
+        """
+        Тест Allure для вердикта письма; возвращает (result.json, [(имя файла вложения, содержимое)]).
+        """
+        email = result["email"] or {}
+        timings = result.get("timings", {})
+        name = email.get("name") or os.path.splitext(os.path.basename(result["document"]))[0]
+        language = email.get("language", "")
+        status = email_status(result)
+
+        steps = []
+        if "extract" in timings:
+            steps.append(_step("Извлечение", "passed" if email else "broken", timings["extract"],
+                               parameters={"элементов": len(email.get("content", []))} if email else None))
+        if "compare" in timings:
+            compare_timing = timings["compare"]
+            steps.append(_step("Сравнение", "failed" if result["differences"] else "passed", compare_timing,
+                               [_step(f"{diff['selector']}: {diff['status']}", "failed", compare_timing,
+                                      parameters={"ожидалось": diff["expected"], "получено": diff["actual"]})
+                                for diff in result["differences"]]))
+        links = result.get("links", [])
+        if links:
+            link_steps = [_step(f"{link['selector']}: {link['expected']}", "passed" if link["is_valid"] else "failed",
+                                (link["start"], link["stop"]),
+                                parameters={"статус код": link["status_code"], "конечный URL": link["final_url"]})
+                          for link in links]
+            steps.append(_step("Проверка ссылок", "failed" if result["link_issues"] else "passed",
+                               _span(*((link["start"], link["stop"]) for link in links)), link_steps))
+        image_issues = result.get("image_issues", [])
+        if "images" in timings:
+            steps.append(_step("Проверка изображений", "failed" if image_issues else "passed", timings["images"],
+                               [_step(f"{issue['selector']}: {issue['url']}", "failed", timings["images"],
+                                      parameters={"ошибки": "; ".join(issue["errors"])})
+                                for issue in image_issues]))
+
+        test_uuid = uuid.uuid4().hex
+        attachments = []
+        files = []
+        if result["differences"]:
+            text = "\n\n".join(self._format_difference(diff) for diff in result["differences"])
+            attachments.append({"name": "Различия", "source": f"{test_uuid}-diff-attachment.txt",
+                                "type": "text/plain"})
+            files.append((attachments[-1]["source"], text))
+        broken_links = [link for link in links if not link["is_valid"] or link["redirects"]]
+        if broken_links:
+            chains = [{"selector": link["selector"], "url": link["expected"], "status_code": link["status_code"],
+                       "final_url": link["final_url"], "redirects": link["redirects"]} for link in broken_links]
+            attachments.append({"name": "Редиректы и ошибки ссылок", "source": f"{test_uuid}-links-attachment.json",
+                                "type": "application/json"})
+            files.append((attachments[-1]["source"], json.dumps(chains, ensure_ascii=False, indent=1)))
+
+        span = _span(*timings.values(), *((link["start"], link["stop"]) for link in links)) or (0, 0)
+        full_name = f"{result['document']}#{language}"
+        message = (f"различий: {len(result['differences'])}, проблемных ссылок: {len(result['link_issues'])}, "
+                   f"проблемных изображений: {len(image_issues)}"
+                   if status == "failed" else {"broken": "ошибка обработки письма",
+                                               "skipped": "нет ожидаемого результата"}.get(status, ""))
+        test_result = {
+            "uuid": test_uuid,
+            "historyId": hashlib.md5(full_name.encode("utf-8")).hexdigest(),
+            "name": f"{name} ({language})" if language else name,
+            "fullName": full_name,
+            "status": status,
+            "statusDetails": {"message": message},
+            "stage": "finished",
+            "start": _ms(span[0]),
+            "stop": _ms(span[1]),
+            "labels": [{"name": "suite", "value": language or "emails"},
+                       {"name": "feature", "value": "Проверка email-шаблонов"},
+                       {"name": "framework", "value": "email-template-checker"}],
+            "parameters": [{"name": "document", "value": result["document"]}],
+            "steps": steps,
+            "attachments": attachments,
+        }
+        return test_result, files
+
+    @staticmethod
+    def _format_difference(diff):
+        lines = [f"{diff['selector']} ({diff['type']}, {diff['status']})",
+                 f"ожидалось: {diff['expected']!r}", f"получено:  {diff['actual']!r}"]
+        if diff.get("diff"):
+            lines.append(format_diff(diff["diff"], diff["actual"], diff["expected"]))
+        return "\n".join(lines)
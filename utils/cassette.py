@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+import time
+
+# Абсолютный путь для данных
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DEFAULT_CASSETTE_FILE = os.path.join(DATA_DIR, "link_cassette.json")
+
+
+class LinkCassette:
+    """
+    Кассета проверок ссылок: запись и воспроизведение результатов без сети.
+
+    Для каждой ссылки (и режима проверки probe/get) хранится полный результат:
+    статус, конечный URL, цепочка редиректов, заголовки ответа, время и момент
+    записи. Режимы:
+      "record"  — все ссылки запрашиваются заново, результаты перезаписываются;
+      "replay"  — только кассета, сеть не используется; ссылки, которых нет
+                  в кассете, считаются ошибкой проверки;
+      "refresh" — кассета, а сеть — только для отсутствующих записей и записей
+                  старше max_age секунд (они перезаписываются).
+    """
+
+    MODES = ("record", "replay", "refresh")
+
+    def __init__(self, path=DEFAULT_CASSETTE_FILE, mode="replay", max_age=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Неизвестный режим кассеты: {mode}")
+        self.path = path
+        self.mode = mode
+        self.max_age = max_age
+        self.dirty = False
+        self.misses = []
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f).get("entries", {})
+
+    @property
+    def allows_network(self):
+        return self.mode != "replay"
+
+    @staticmethod
+    def key(check_mode, url):
+        return f"{check_mode} {url}"
+
+    def play(self, check_mode, url):
+        """
+        Записанный результат проверки или None, если ссылку нужно запросить.
+        """
+        if self.mode == "record":
+            return None
+        with self._lock:
+            entry = self.entries.get(self.key(check_mode, url))
+        if entry is None:
+            return None
+        if self.mode == "refresh" and self.max_age is not None and entry["recorded_at"] + self.max_age <= time.time():
+            return None
+        return entry["result"]
+
+    def missing(self, url):
+        """
+        Результат для ссылки, которой нет в кассете, в режиме replay.
+        """
+        with self._lock:
+            self.misses.append(url)
+        return {"is_valid": False, "status_code": None, "final_url": f"Нет записи в кассете: {url}",
+                "redirects": [], "headers": {}, "elapsed": 0.0}
+
+    def record(self, check_mode, url, result):
+        with self._lock:
+            self.entries[self.key(check_mode, url)] = {"result": result, "recorded_at": time.time()}
+            self.dirty = True
+
+    def save(self):
+        """
+        Атомарно записывает кассету на диск (только если она менялась).
+        """
+        with self._lock:
+            if not self.dirty:
+                return
+            payload = json.dumps({"entries": self.entries}, ensure_ascii=False, indent=1, sort_keys=True)
+            self.dirty = False
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,89 @@
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Параметры предохранителя по умолчанию
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_BACKOFF = 30.0
+DEFAULT_MAX_BACKOFF = 600.0
+
+
+class HostCircuitBreaker:
+    """
+    Предохранитель по хостам для проверки ссылок.
+
+    После threshold подряд неудачных подключений к хосту (ошибка соединения
+    или таймаут подключения) предохранитель размыкается: остальные ссылки на
+    этот хост сразу получают вердикт «хост недоступен» без запроса. Через
+    backoff секунд пропускается одна пробная проверка; если хост снова не
+    отвечает, пауза удваивается (не больше max_backoff), если ответил —
+    предохранитель замыкается. Ответ с любым HTTP-статусом считается
+    успешным подключением.
+    """
+
+    def __init__(self, threshold=DEFAULT_FAILURE_THRESHOLD, backoff=DEFAULT_BACKOFF,
+                 max_backoff=DEFAULT_MAX_BACKOFF, clock=time.monotonic):
+        self.threshold = threshold
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        # Состояние хоста: [подряд неудач, разомкнут до, текущая пауза, идёт пробная проверка]
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def host(url):
+        return urlsplit(url).netloc.lower()
+
+    def _state(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = [0, None, self.backoff, False]
+        return state
+
+    def allow(self, url):
+        """
+        Можно ли запрашивать ссылку: хост доступен или пора пробной проверки.
+        """
+        with self._lock:
+            state = self._state(self.host(url))
+            if state[1] is None:
+                return True
+            if state[3] or self.clock() < state[1]:
+                return False
+            state[3] = True
+            return True
+
+    def record_success(self, url):
+        with self._lock:
+            state = self._state(self.host(url))
+            state[:] = [0, None, self.backoff, False]
+
+    def record_failure(self, url):
+        """
+        Учитывает неудачное подключение; размыкает предохранитель на пороге или после пробной проверки.
+        """
+        with self._lock:
+            state = self._state(self.host(url))
+            state[0] += 1
+            if state[3]:
+                state[2] = min(state[2] * 2, self.max_backoff)
+            if state[3] or state[0] >= self.threshold:
+                state[1] = self.clock() + state[2]
+            state[3] = False
+
+    def is_open(self, url):
+        with self._lock:
+            state = self._hosts.get(self.host(url))
+            return state is not None and state[1] is not None
+
+    def open_hosts(self):
+        with self._lock:
+            return sorted(host for host, state in self._hosts.items() if state[1] is not None)
+
+    def unreachable(self, url):
+        """
+        Вердикт для ссылки на хост с разомкнутым предохранителем.
+        """
+        return {"is_valid": False, "status_code": None, "final_url": f"Хост недоступен: {self.host(url)}",
+                "redirects": [], "headers": {}, "elapsed": 0.0, "host_unreachable": True}
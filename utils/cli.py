@@ -0,0 +1,244 @@
+"""
+Единая точка входа с подкомандами:
+
+    python -m utils.cli fetch [--expected ...] [--documents-dir data/documents]
+    python -m utils.cli extract [письма ...] [--mode stream] [--output actual_result.json] [--fetch]
+    python -m utils.cli compare [--actual ...] [--expected ...] [--types text link]
+    python -m utils.cli check-links [--actual ...] [--cassette-mode replay]
+    python -m utils.cli all [--no-save] [--allure [DIR]] [--sections]
+
+На уровне модуля импортируются только argparse, os и sys: bs4, requests и
+остальная логика импортируются внутри подкоманды, которой они нужны, так что
+compare не загружает HTTP-стек, а --help не загружает ничего. all работает
+конвейером (utils.pipeline): ссылки проверяются, пока разбираются следующие
+письма. Код возврата 1 — найдены различия или проблемы со ссылками.
+"""
+import argparse
+import os
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+EMAILS_DIR = os.path.join(BASE_DIR, "Emails")
+ACTUAL_FILE = os.path.join(DATA_DIR, "actual_result.json")
+EXPECTED_FILE = os.path.join(DATA_DIR, "expected_result.json")
+DOCUMENTS_DIR = os.path.join(DATA_DIR, "documents")
+
+
+def fetch(args):
+    """
+    Загружает документы писем по URL из ожидаемого JSON (условными запросами) в папку документов.
+    """
+    from utils.document_source import sync_documents, print_document
+
+    documents = sync_documents(args.expected, args.documents_dir, args.emails_dir)
+    for document in documents:
+        print_document(document)
+    return int(any(document["status"] == "error" for document in documents))
+
+
+def fetch_before(args):
+    """
+    С --fetch документы сначала обновляются, и дальше письма берутся из папки документов.
+    """
+    if not args.fetch:
+        return
+    fetch(args)
+    args.emails_dir = args.documents_dir
+
+
+def extract(args):
+    """
+    Извлекает данные писем и сохраняет их одним документом.
+    """
+    from pages.base_page import EmailProcessor, DataSaver
+    from utils.corpus import find_emails, detect_language
+
+    fetch_before(args)
+    emails = []
+    for relative_path in args.emails or find_emails(args.emails_dir):
+        email_data = EmailProcessor(relative_path, args.mode, args.emails_dir,
+                                    detect_language(relative_path)).extract()
+        if not email_data:
+            print(f"❌ {relative_path}: ошибка обработки")
+            continue
+        email = email_data["emails"][0]
+        email["id"] = str(len(emails) + 1)
+        emails.append(email)
+    DataSaver(os.path.dirname(os.path.abspath(args.output))).save_to_json({"emails": emails},
+                                                                          os.path.basename(args.output))
+    print(f"✅ Извлечено писем: {len(emails)} -> {args.output}")
+    return 0
+
+
+def compare(args):
+    """
+    Сравнивает фактический и ожидаемый результаты.
+    """
+    from utils.comparator import ContentComparator, compare_files, email_name_key, format_diff
+
+    # Письма сопоставляются по имени и языку: id в извлечённом результате назначаются при обработке
+    differences = compare_files(args.actual, args.expected, types=args.types,
+                                comparator=ContentComparator(email_key=email_name_key))
+    if not differences:
+        print("✅ Все значения совпадают.")
+        return 0
+    print(f"❌ Найдено различий: {len(differences)}")
+    for diff in differences:
+        name, language = diff['email']
+        print(f"🔹 {name} [{language}] / {diff['selector']} ({diff['type']}, {diff['status']})")
+        print(f"   ожидалось: {diff['expected']!r}")
+        print(f"   получено:  {diff['actual']!r}")
+        if diff['diff']:
+            print("   " + format_diff(diff['diff'], diff['actual'], diff['expected']).replace("\n", "\n   "))
+    return 1
+
+
+def check_links(args):
+    """
+    Проверяет ссылки из фактического результата.
+    """
+    from utils.cassette import LinkCassette
+    from utils.link_cache import LinkCache
+    from utils.link_checker import check_links as run_check_links
+    from utils.result_store import load_results
+
+    cassette = LinkCassette(args.cassette, args.cassette_mode) if args.cassette_mode else None
+    cache = LinkCache()
+    try:
+        issues = run_check_links(load_results(args.actual), cache=cache, mode=args.link_mode, cassette=cassette,
+                                 timeout=args.read_timeout, connect_timeout=args.connect_timeout,
+                                 deadline=args.deadline)
+    finally:
+        cache.close()
+    if not issues:
+        print("✅ Все ссылки работают корректно.")
+        return 0
+    print(f"❌ Проблемных ссылок: {len(issues)}")
+    for issue in issues:
+        print(f"🔗 {issue['selector']}: {issue['url']}")
+        print(f"   {issue['error']}, конечный URL: {issue['final_url']}")
+    return 1
+
+
+def run_all(args):
+    """
+    Извлечение, проверка ссылок и сравнение одним конвейером, без промежуточных файлов.
+    """
+    from pages.base_page import DataSaver
+    from utils.cassette import LinkCassette
+    from utils.link_cache import LinkCache
+    from utils.link_checker import LinkChecker
+    from utils.pipeline import EmailPipeline, print_result
+    from utils.sections import SectionCache
+
+    fetch_before(args)
+    sections = SectionCache() if args.sections else None
+    images = None
+    if args.images:
+        from utils.image_checker import ImageAssetCache, ImageChecker
+        images = ImageChecker(timeout=args.read_timeout, cache=ImageAssetCache())
+    cassette = LinkCassette(args.cassette, args.cassette_mode) if args.cassette_mode else None
+    cache = LinkCache()
+    checker = LinkChecker(timeout=args.read_timeout, cache=cache, mode=args.link_mode, cassette=cassette,
+                          connect_timeout=args.connect_timeout, deadline=args.deadline)
+    writer = None
+    if args.allure:
+        from utils.allure_report import AllureWriter
+        writer = AllureWriter(args.allure).start()
+    try:
+        corpus_data, results = EmailPipeline(args.emails_dir, args.expected, args.mode, checker, types=args.types,
+                                             report=writer.write if writer else None,
+                                             sections=sections, images=images).run(args.emails)
+    finally:
+        checker.close()
+        cache.close()
+        if images is not None:
+            images.close()
+        if writer is not None:
+            writer.close()
+    if not args.no_save:
+        DataSaver(os.path.dirname(os.path.abspath(args.actual))).save_to_json(corpus_data,
+                                                                              os.path.basename(args.actual))
+    for result in results:
+        print_result(result)
+    if sections is not None:
+        print(f"Секции: {sections.summary()}")
+    return int(any(result["status"] != "passed" or result["link_issues"] or result["image_issues"]
+                   for result in results))
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m utils.cli", description="Проверка email-шаблонов")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_extract_options(subparser):
+        subparser.add_argument("emails", nargs="*", help="письма относительно папки писем (по умолчанию все)")
+        subparser.add_argument("--emails-dir", default=EMAILS_DIR)
+        subparser.add_argument("--mode", choices=("soup", "stream"), default="soup")
+        add_fetch_options(subparser)
+        subparser.add_argument("--fetch", action="store_true",
+                               help="сначала загрузить документы по URL и проверять их")
+
+    def add_fetch_options(subparser):
+        subparser.add_argument("--documents-dir", default=DOCUMENTS_DIR)
+
+    def add_compare_options(subparser):
+        subparser.add_argument("--expected", default=EXPECTED_FILE)
+        subparser.add_argument("--types", nargs="+", default=None, help="типы элементов (text, link, image)")
+
+    def add_links_options(subparser):
+        subparser.add_argument("--link-mode", choices=("get", "probe"), default="get",
+                               help="get — полный GET; probe — HEAD без тел (с GET при 400/403/405/501)")
+        subparser.add_argument("--cassette-mode", choices=("record", "replay", "refresh"), default=None)
+        subparser.add_argument("--cassette", default=os.path.join(DATA_DIR, "link_cassette.json"))
+        subparser.add_argument("--connect-timeout", type=float, default=3.0, help="таймаут подключения, с")
+        subparser.add_argument("--read-timeout", type=float, default=10.0, help="таймаут ответа, с")
+        subparser.add_argument("--deadline", type=float, default=None,
+                               help="общий срок проверки ссылок, с (по истечении — частичные результаты)")
+
+    fetch_parser = subparsers.add_parser("fetch", help="загрузить документы писем по URL")
+    fetch_parser.add_argument("--emails-dir", default=EMAILS_DIR, help="локальные файлы для работы без сети")
+    fetch_parser.add_argument("--expected", default=EXPECTED_FILE)
+    add_fetch_options(fetch_parser)
+    fetch_parser.set_defaults(handler=fetch)
+
+    extract_parser = subparsers.add_parser("extract", help="извлечь данные писем")
+    add_extract_options(extract_parser)
+    extract_parser.add_argument("--expected", default=EXPECTED_FILE, help="источник URL документов для --fetch")
+    extract_parser.add_argument("--output", default=ACTUAL_FILE)
+    extract_parser.set_defaults(handler=extract)
+
+    compare_parser = subparsers.add_parser("compare", help="сравнить с ожидаемым результатом")
+    compare_parser.add_argument("--actual", default=ACTUAL_FILE)
+    add_compare_options(compare_parser)
+    compare_parser.set_defaults(handler=compare)
+
+    links_parser = subparsers.add_parser("check-links", help="проверить ссылки")
+    links_parser.add_argument("--actual", default=ACTUAL_FILE)
+    add_links_options(links_parser)
+    links_parser.set_defaults(handler=check_links)
+
+    all_parser = subparsers.add_parser("all", help="извлечь, проверить ссылки и сравнить")
+    add_extract_options(all_parser)
+    all_parser.add_argument("--actual", default=ACTUAL_FILE)
+    all_parser.add_argument("--no-save", action="store_true", help="не сохранять извлечённые данные")
+    all_parser.add_argument("--allure", nargs="?", const=os.path.join(DATA_DIR, "allure-results"), default=None,
+                            metavar="DIR", help="писать результаты Allure (по умолчанию в data/allure-results)")
+    all_parser.add_argument("--sections", action="store_true",
+                            help="разбирать и сравнивать общие шапки и подвалы один раз за прогон")
+    all_parser.add_argument("--images", action="store_true",
+                            help="скачивать изображения и сверять их с отпечатками ожидаемого JSON")
+    add_compare_options(all_parser)
+    add_links_options(all_parser)
+    all_parser.set_defaults(handler=run_all)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,284 @@
+import os
+import unicodedata
+
+# Абсолютный путь для данных
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+from utils.content_store import ContentStore
+from utils.profiling import profiled
+from utils.result_store import load_results
+
+
+# Предел длины различающейся части строк, после которого посимвольный diff не строится
+DEFAULT_MAX_DIFF_CHARS = 2000
+
+
+class TextNormalizer:
+    """
+    Нормализация строк перед сравнением: Unicode-форма, схлопывание пробельных
+    символов (включая неразрывные) и, по желанию, сравнение без учёта регистра.
+    """
+
+    def __init__(self, form="NFKC", whitespace=True, casefold=False):
+        self.form = form
+        self.whitespace = whitespace
+        self.casefold = casefold
+
+    def __call__(self, value):
+        if self.form:
+            value = unicodedata.normalize(self.form, value)
+        if self.whitespace:
+            value = " ".join(value.split())
+        if self.casefold:
+            value = value.casefold()
+        return value
+
+
+class TextDiffStrategy:
+    """
+    Стратегия сравнения строк с быстрым путём.
+
+    Совпадающие значения отсекаются обычным ==, так что прогон без различий
+    почти ничего не стоит. Посимвольный diff строится только при несовпадении:
+    общие начало и конец отрезаются заранее, а если различающаяся середина
+    длиннее max_chars, SequenceMatcher не запускается и середина целиком
+    считается заменой. Возвращает None или структурированный diff:
+    {"ratio": похожесть 0..1, "opcodes": [[тег, i1, i2, j1, j2], ...], "truncated": bool}.
+    """
+
+    def __init__(self, normalize=None, max_chars=DEFAULT_MAX_DIFF_CHARS):
+        self.normalize = normalize
+        self.max_chars = max_chars
+
+    def compare(self, actual, expected):
+        actual_line = "" if actual is None else str(actual)
+        expected_line = "" if expected is None else str(expected)
+        if actual_line == expected_line:
+            return None
+        if self.normalize is not None:
+            actual_line = self.normalize(actual_line)
+            expected_line = self.normalize(expected_line)
+            if actual_line == expected_line:
+                return None
+        return self.diff(actual_line, expected_line)
+
+    def diff(self, actual, expected):
+        """
+        Посимвольный diff двух различающихся строк (после нормализации).
+        """
+        prefix = len(os.path.commonprefix([actual, expected]))
+        limit = min(len(actual), len(expected)) - prefix
+        suffix = 0
+        while suffix < limit and actual[-1 - suffix] == expected[-1 - suffix]:
+            suffix += 1
+        actual_middle = actual[prefix:len(actual) - suffix]
+        expected_middle = expected[prefix:len(expected) - suffix]
+
+        truncated = len(actual_middle) + len(expected_middle) > self.max_chars
+        if truncated:
+            tag = "replace" if actual_middle and expected_middle else ("delete" if actual_middle else "insert")
+            middle = [[tag, 0, len(actual_middle), 0, len(expected_middle)]]
+            matched = 0
+        else:
+            from difflib import SequenceMatcher
+            matcher = SequenceMatcher(None, actual_middle, expected_middle, autojunk=False)
+            middle = [list(opcode) for opcode in matcher.get_opcodes()]
+            matched = sum(block.size for block in matcher.get_matching_blocks())
+
+        opcodes = [["equal", 0, prefix, 0, prefix]] if prefix else []
+        opcodes += [[tag, i1 + prefix, i2 + prefix, j1 + prefix, j2 + prefix] for tag, i1, i2, j1, j2 in middle]
+        if suffix:
+            opcodes.append(["equal", len(actual) - suffix, len(actual), len(expected) - suffix, len(expected)])
+        total = len(actual) + len(expected)
+        return {
+            "ratio": round(2.0 * (prefix + suffix + matched) / total, 4) if total else 1.0,
+            "opcodes": opcodes,
+            "truncated": truncated,
+        }
+
+
+DEFAULT_STRATEGIES = {
+    "text": TextDiffStrategy(),
+    "link": TextDiffStrategy(),
+    "image": TextDiffStrategy(),
+}
+
+
+def format_diff(diff, actual, expected, limit=80):
+    """
+    Читаемое описание структурированного diff: похожесть и по строке на каждую правку.
+    """
+    if not isinstance(diff, dict):
+        return diff
+    actual = "" if actual is None else str(actual)
+    expected = "" if expected is None else str(expected)
+    lines = [f"похожесть: {diff['ratio']:.0%}" + (" (diff сокращён)" if diff.get("truncated") else "")]
+    for tag, i1, i2, j1, j2 in diff["opcodes"]:
+        if tag == "equal":
+            continue
+        lines.append(f"{tag} в позиции {i1}: {actual[i1:i2][:limit]!r} -> {expected[j1:j2][:limit]!r}")
+    return "\n".join(lines)
+
+
+def email_id_key(email):
+    """
+    Ключ письма по умолчанию — его id.
+    """
+    return email.get("id")
+
+
+def email_name_key(email):
+    """
+    Ключ письма по имени и языку (для корпусов, где id назначаются при обработке).
+    """
+    return email.get("name"), email.get("language")
+
+
+class ContentComparator:
+    """
+    Единый сравниватель фактического и ожидаемого JSON по ключу (письмо, селектор).
+
+    Оба документа индексируются за один проход, затем все типы элементов
+    сравниваются за O(n) стратегиями из strategies (по одной на тип).
+    Порядок элементов не важен: вставка одного элемента не сдвигает остальные,
+    а лишние и недостающие элементы попадают в отчёт со статусами
+    "unexpected" и "missing".
+    """
+
+    def __init__(self, strategies=None, email_key=email_id_key):
+        self.strategies = dict(DEFAULT_STRATEGIES)
+        if strategies:
+            self.strategies.update(strategies)
+        self.email_key = email_key
+
+    def index(self, data, types=None):
+        """
+        Индексирует документ: {(ключ письма, селектор): элемент content}.
+        """
+        index = {}
+        for email in (data or {}).get("emails", []):
+            email_key = self.email_key(email)
+            for content in email.get("content", []):
+                if types is None or content.get("type") in types:
+                    index[(email_key, content.get("selector"))] = content
+        return index
+
+    @profiled("compare")
+    def compare(self, actual_data, expected_data, types=None):
+        """
+        Сравнивает два документа (JSON или ContentStore); возвращает список различий
+        по ключу (письмо, селектор).
+        """
+        if isinstance(actual_data, ContentStore) and isinstance(expected_data, ContentStore):
+            return self.compare_stores(actual_data, expected_data, types)
+        return self.compare_indexes(self.index(actual_data, types), self.index(expected_data, types))
+
+    def compare_indexes(self, actual_index, expected_index):
+        """
+        Сравнивает готовые индексы документов.
+        """
+        differences = []
+        for key, actual in actual_index.items():
+            expected = expected_index.get(key)
+            if expected is None:
+                differences.append(self._difference(key, "unexpected", actual, None))
+                continue
+            if actual.get("type") != expected.get("type"):
+                differences.append(self._difference(key, "type_mismatch", actual, expected))
+                continue
+            strategy = self.strategies.get(actual.get("type"))
+            if strategy is None:
+                diff = None if actual.get("expected") == expected.get("expected") else "значения различаются"
+            else:
+                diff = strategy.compare(actual.get("expected"), expected.get("expected"))
+            if diff is not None:
+                differences.append(self._difference(key, "mismatch", actual, expected, diff))
+
+        for key, expected in expected_index.items():
+            if key not in actual_index:
+                differences.append(self._difference(key, "missing", None, expected))
+        return differences
+
+    def compare_stores(self, actual_store, expected_store, types=None):
+        """
+        Сравнивает колоночные хранилища без построения словарей на элемент.
+        При общей таблице строк совпадение значений проверяется по их кодам.
+        """
+        actual_rows = actual_store.rows_by_key(self.email_key, types)
+        expected_rows = expected_store.rows_by_key(self.email_key, types)
+        shared_strings = actual_store.strings is expected_store.strings
+        actual_values = actual_store.value_column
+        expected_values = expected_store.value_column
+
+        differences = []
+        for key, row in actual_rows.items():
+            expected_row = expected_rows.get(key)
+            if expected_row is None:
+                differences.append(self._difference(key, "unexpected", actual_store.record(row), None))
+                continue
+            if shared_strings and actual_values[row] == expected_values[expected_row]:
+                if actual_store.types[actual_store.type_column[row]] == \
+                        expected_store.types[expected_store.type_column[expected_row]]:
+                    continue
+            actual = actual_store.record(row)
+            expected = expected_store.record(expected_row)
+            differences.extend(self.compare_indexes({key: actual}, {key: expected}))
+
+        for key, expected_row in expected_rows.items():
+            if key not in actual_rows:
+                differences.append(self._difference(key, "missing", None, expected_store.record(expected_row)))
+        return differences
+
+    @profiled("compare")
+    def compare_content(self, actual_content, expected_content, email_key=None):
+        """
+        Сравнивает списки content одного письма.
+        """
+        actual_index = {(email_key, item.get("selector")): item for item in actual_content}
+        expected_index = {(email_key, item.get("selector")): item for item in expected_content}
+        return self.compare_indexes(actual_index, expected_index)
+
+    @staticmethod
+    def _difference(key, status, actual, expected, diff=None):
+        email_key, selector = key
+        source = actual if actual is not None else expected
+        return {
+            "email": email_key,
+            "selector": selector,
+            "type": source.get("type"),
+            "status": status,
+            "actual": actual.get("expected") if actual is not None else None,
+            "expected": expected.get("expected") if expected is not None else None,
+            "diff": diff,
+        }
+
+
+def load_json(file_path):
+    """
+    Загружает JSON-файл или каталог JSONL-хранилища результатов.
+    """
+    return load_results(file_path)
+
+
+def compare_files(actual_file, expected_file, types=None, comparator=None):
+    """
+    Сравнивает два JSON-файла с результатами; каждый файл читается один раз.
+    """
+    return (comparator or ContentComparator()).compare(load_json(actual_file), load_json(expected_file), types)
+
+
+if __name__ == "__main__":
+    differences = compare_files(os.path.join(DATA_DIR, "actual_result.json"),
+                                os.path.join(DATA_DIR, "expected_result.json"))
+    if differences:
+        print("❌ Найдены различия:")
+        for diff in differences:
+            print(f"🔹 **Письмо:** {diff['email']}, **селектор:** {diff['selector']} ({diff['type']}, {diff['status']})")
+            print(f"✅ **Ожидаемое значение:** {diff['expected']}")
+            print(f"❌ **Фактическое значение:** {diff['actual']}")
+            if diff['diff']:
+                print(f"🔍 **Различия:**\n{format_diff(diff['diff'], diff['actual'], diff['expected'])}")
+            print("-" * 40)
+    else:
+        print("✅ Все значения совпадают.")
@@ -0,0 +1,163 @@
+import sys
+from array import array
+
+# Коды типов элементов, известных заранее; новые типы получают следующие коды
+DEFAULT_TYPES = ("link", "image", "text")
+# Код отсутствующего значения (expected = None)
+NO_VALUE = -1
+
+
+class StringTable:
+    """
+    Таблица уникальных строк: каждая строка хранится один раз, в колонках — её номер.
+    Одну таблицу можно разделить между несколькими хранилищами: тогда равенство
+    значений из разных хранилищ проверяется сравнением номеров.
+    """
+
+    def __init__(self):
+        self.strings = []
+        self._codes = {}
+
+    def code(self, value):
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.strings)
+            self.strings.append(sys.intern(value))
+        return code
+
+    def __getitem__(self, code):
+        return self.strings[code]
+
+    def __len__(self):
+        return len(self.strings)
+
+
+class ContentRecord:
+    """
+    Компактное представление одного элемента content (только при чтении из хранилища).
+    Поддерживает доступ как к словарю (record["expected"], record.get("type")),
+    поэтому подходит коду, написанному для JSON-формата.
+    """
+
+    __slots__ = ("email", "selector", "type", "expected")
+
+    def __init__(self, email, selector, type, expected):
+        self.email = email
+        self.selector = selector
+        self.type = type
+        self.expected = expected
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self):
+        return {"selector": self.selector, "type": self.type, "expected": self.expected}
+
+
+class ContentStore:
+    """
+    Колоночное хранилище извлечённого content для многих писем.
+
+    Вместо словаря на каждый элемент — параллельные массивы: номер письма,
+    код селектора и код значения в общей таблице строк, код типа. Повторяющиеся
+    селекторы и URL хранятся один раз. Поля писем (id, name, language, document)
+    хранятся отдельно, по словарю на письмо, а редкие дополнительные поля
+    элементов (например, "asset" у изображений) — в разреженном словаре extras.
+    Преобразование в JSON-формат {"emails": [...]} и обратно — без потерь.
+    """
+
+    def __init__(self, strings=None):
+        self.strings = strings if strings is not None else StringTable()
+        self.types = list(DEFAULT_TYPES)
+        self._type_codes = {name: code for code, name in enumerate(self.types)}
+        self.emails = []
+        self.email_column = array("I")
+        self.selector_column = array("I")
+        self.type_column = array("B")
+        self.value_column = array("i")
+        self.extras = {}
+
+    def __len__(self):
+        return len(self.type_column)
+
+    def _type_code(self, name):
+        code = self._type_codes.get(name)
+        if code is None:
+            code = self._type_codes[name] = len(self.types)
+            self.types.append(name)
+        return code
+
+    def add_email(self, email):
+        """
+        Добавляет письмо в JSON-формате; возвращает его номер в хранилище.
+        """
+        position = len(self.emails)
+        self.emails.append({key: value for key, value in email.items() if key != "content"})
+        code = self.strings.code
+        for item in email.get("content", []):
+            value = item.get("expected")
+            if len(item) > 3:
+                self.extras[len(self)] = {key: item[key] for key in item
+                                          if key not in ("selector", "type", "expected")}
+            self.email_column.append(position)
+            self.selector_column.append(code(item["selector"]))
+            self.type_column.append(self._type_code(item["type"]))
+            self.value_column.append(NO_VALUE if value is None else code(value))
+        return position
+
+    @classmethod
+    def from_json(cls, data, strings=None):
+        """
+        Хранилище из документа {"emails": [...]}.
+        """
+        store = cls(strings)
+        for email in (data or {}).get("emails", []):
+            store.add_email(email)
+        return store
+
+    def value(self, row):
+        code = self.value_column[row]
+        return None if code == NO_VALUE else self.strings[code]
+
+    def record(self, row):
+        return ContentRecord(self.email_column[row], self.strings[self.selector_column[row]],
+                             self.types[self.type_column[row]], self.value(row))
+
+    def records(self, types=None):
+        """
+        Генератор ContentRecord (по желанию — только заданных типов).
+        """
+        codes = None if types is None else {self._type_codes[name] for name in types if name in self._type_codes}
+        for row in range(len(self)):
+            if codes is None or self.type_column[row] in codes:
+                yield self.record(row)
+
+    def rows_by_key(self, email_key, types=None):
+        """
+        Индекс {(ключ письма, селектор): номер строки} для сравнения.
+        """
+        email_keys = [email_key(email) for email in self.emails]
+        codes = None if types is None else {self._type_codes[name] for name in types if name in self._type_codes}
+        index = {}
+        for row in range(len(self)):
+            if codes is None or self.type_column[row] in codes:
+                index[(email_keys[self.email_column[row]], self.strings[self.selector_column[row]])] = row
+        return index
+
+    def to_json(self):
+        """
+        Документ {"emails": [...]} в прежнем формате.
+        """
+        emails = [dict(email, content=[]) for email in self.emails]
+        for row in range(len(self)):
+            item = self.record(row).to_dict()
+            if row in self.extras:
+                item.update(self.extras[row])
+            emails[self.email_column[row]]["content"].append(item)
+        return {"emails": emails}
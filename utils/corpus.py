@@ -0,0 +1,265 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pages.base_page import EmailProcessor, DataSaver, EMAILS_DIR, DATA_DIR
+from utils.comparator import ContentComparator
+from utils.content_store import ContentStore
+from utils.incremental import IncrementalState, data_digest
+from utils.profiling import PROFILER
+from utils.result_store import JsonlResultStore
+from utils.selector_plans import load_plans
+
+# Ожидаемые письма, загружаются один раз в каждом рабочем процессе
+_expected_index = {}
+
+
+def find_emails(emails_dir=EMAILS_DIR):
+    """
+    Находит все HTML-файлы в папке писем (рекурсивно); пути относительные и отсортированы.
+    """
+    found = []
+    for root, _, files in os.walk(emails_dir):
+        for filename in files:
+            if filename.lower().endswith((".html", ".htm")):
+                found.append(os.path.relpath(os.path.join(root, filename), emails_dir))
+    return sorted(found)
+
+
+def detect_language(relative_path, default="ru"):
+    """
+    Определяет язык письма: по папке локали (Emails/ru/...) или по суффиксу имени (..._RU.html).
+    """
+    parts = relative_path.replace("\\", "/").split("/")
+    if len(parts) > 1:
+        return parts[0].lower()
+    stem = os.path.splitext(parts[0])[0]
+    if "_" in stem:
+        suffix = stem.rsplit("_", 1)[1]
+        if len(suffix) == 2 and suffix.isalpha():
+            return suffix.lower()
+    return default
+
+
+def index_expected(expected_data):
+    """
+    Индексирует ожидаемые письма по (имя, язык).
+    """
+    index = {}
+    for email in (expected_data or {}).get("emails", []):
+        index[(email.get("name"), email.get("language"))] = email
+    return index
+
+
+def _init_worker(expected_file):
+    """
+    Инициализация рабочего процесса: план селекторов компилируется, а ожидаемые
+    результаты читаются один раз на процесс.
+    """
+    global _expected_index
+    load_plans()
+    _expected_index = {}
+    if expected_file and os.path.exists(expected_file):
+        with open(expected_file, "r", encoding="utf-8") as f:
+            _expected_index = index_expected(json.load(f))
+
+
+def _init_pool_worker(expected_file):
+    """
+    Инициализация процесса пула: замеры, унаследованные от основного процесса, сбрасываются.
+    """
+    PROFILER.reset()
+    _init_worker(expected_file)
+
+
+def _process_in_worker(task):
+    """
+    Обработка письма в процессе пула; замеры профилировщика возвращаются вместе с результатом.
+    """
+    result = process_corpus_email(task)
+    if PROFILER.enabled:
+        result["profile"] = PROFILER.drain()
+    return result
+
+
+def process_corpus_email(task):
+    """
+    Парсинг, извлечение и сравнение одного письма корпуса (выполняется в рабочем процессе).
+    """
+    relative_path, emails_dir, mode = task
+    language = detect_language(relative_path)
+    email_data = EmailProcessor(relative_path, mode, emails_dir, language).extract()
+    if not email_data:
+        return {"document": relative_path, "email": None, "status": "error", "differences": []}
+
+    email = email_data["emails"][0]
+    expected = _expected_index.get((email["name"], email["language"]))
+    if expected is None:
+        return {"document": relative_path, "email": email, "status": "no_expected", "differences": []}
+
+    differences = ContentComparator().compare_content(email["content"], expected.get("content", []),
+                                                      email["name"])
+    return {"document": relative_path, "email": email, "status": "failed" if differences else "passed",
+            "differences": differences}
+
+
+class CorpusProcessor:
+    """
+    Пакетная обработка всех писем из папки Emails на нескольких ядрах.
+
+    С state (IncrementalState) письма, у которых не изменились содержимое,
+    версия извлечения и ожидаемые данные, не парсятся заново: берутся
+    сохранённые content и вердикт. С sink (JsonlResultStore) каждое письмо
+    дописывается в хранилище сразу, как только готов его результат.
+    """
+
+    def __init__(self, emails_dir=EMAILS_DIR, expected_file=os.path.join(DATA_DIR, "expected_result.json"),
+                 workers=None, chunksize=1, mode="soup", state=None, sink=None):
+        self.emails_dir = emails_dir
+        self.expected_file = expected_file
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.mode = mode
+        self.state = state
+        self.sink = sink
+        self.reused = 0
+
+    def _expected_digests(self, paths):
+        """
+        Хэши ожидаемых данных каждого письма (вердикт зависит и от них).
+        """
+        expected_index = {}
+        if self.expected_file and os.path.exists(self.expected_file):
+            with open(self.expected_file, "r", encoding="utf-8") as f:
+                expected_index = index_expected(json.load(f))
+        digests = {}
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            expected = expected_index.get((name, detect_language(path)))
+            digests[path] = data_digest(expected) if expected is not None else None
+        return digests
+
+    def _process(self, tasks):
+        """
+        Генератор результатов новых писем в порядке задач (в пуле процессов, если их несколько).
+        """
+        if self.workers == 1 or len(tasks) <= 1:
+            _init_worker(self.expected_file)
+            yield from map(process_corpus_email, tasks)
+            return
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(tasks)), initializer=_init_pool_worker,
+                                 initargs=(self.expected_file,)) as executor:
+            yield from executor.map(_process_in_worker, tasks, chunksize=self.chunksize)
+
+    def run(self, compact=False):
+        """
+        Обрабатывает корпус; возвращает (объединённый документ {"emails": [...]}, вердикты по письмам).
+        С compact вместо документа возвращается ContentStore, а в вердиктах
+        "email" заменяется номером письма в хранилище.
+        """
+        paths = find_emails(self.emails_dir)
+        results = [None] * len(paths)
+        pending = list(range(len(paths)))
+        self.reused = 0
+
+        if self.state is not None:
+            expected_digests = self._expected_digests(paths)
+            pending = []
+            for position, path in enumerate(paths):
+                cached = self.state.lookup(path, os.path.join(self.emails_dir, path), self.mode,
+                                           expected_digests[path])
+                if cached is None:
+                    pending.append(position)
+                else:
+                    results[position] = cached
+            self.reused = len(paths) - len(pending)
+
+        tasks = [(paths[position], self.emails_dir, self.mode) for position in pending]
+        fresh = self._process(tasks)
+        email_count = 0
+        for position, path in enumerate(paths):
+            if results[position] is None:
+                result = next(fresh)
+                if "profile" in result:
+                    PROFILER.merge(result.pop("profile"))
+                results[position] = result
+                if self.state is not None and result["status"] != "error":
+                    self.state.store(path, os.path.join(self.emails_dir, path), self.mode,
+                                     expected_digests[path], result)
+            # Результаты из state не меняются: id и compact пишутся в копии
+            result = results[position] = dict(results[position])
+            if result["email"] is not None:
+                email_count += 1
+                result["email"] = dict(result["email"], id=str(email_count))
+                if self.sink is not None:
+                    self.sink.append(result["email"])
+        if self.sink is not None:
+            self.sink.close()
+        if self.state is not None:
+            self.state.prune(paths)
+            self.state.save()
+
+        emails = []
+        store = ContentStore() if compact else None
+        for result in results:
+            if result["email"] is None:
+                continue
+            if compact:
+                result["email"] = store.add_email(result["email"])
+            else:
+                emails.append(result["email"])
+        if compact:
+            return store, results
+        return {"emails": emails}, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Проверка всех писем из папки Emails")
+    parser.add_argument("--workers", type=int, default=None, help="число процессов (по умолчанию все ядра)")
+    parser.add_argument("--chunksize", type=int, default=1, help="писем на одну задачу процесса")
+    parser.add_argument("--mode", choices=EmailProcessor.MODES, default="soup")
+    parser.add_argument("--output", default="actual_result.json")
+    parser.add_argument("--incremental", action="store_true",
+                        help="не перепроверять письма, не изменившиеся с прошлого запуска")
+    parser.add_argument("--jsonl", default=None, metavar="DIR",
+                        help="писать результаты в шардированное JSONL-хранилище вместо одного JSON")
+    parser.add_argument("--gzip", action="store_true", help="сжимать шарды JSONL-хранилища")
+    parser.add_argument("--fetch", action="store_true",
+                        help="загрузить документы по URL из ожидаемого JSON и проверять их (с --incremental "
+                             "неизменённые шаблоны, вернувшиеся как 304, не парсятся заново)")
+    args = parser.parse_args()
+
+    emails_dir = EMAILS_DIR
+    if args.fetch:
+        from utils.document_source import DEFAULT_DOCUMENTS_DIR, sync_documents, print_document
+        for document in sync_documents():
+            print_document(document)
+        emails_dir = DEFAULT_DOCUMENTS_DIR
+
+    sink = None
+    if args.jsonl:
+        sink = JsonlResultStore.create(args.jsonl, compress=args.gzip)
+    started = time.perf_counter()
+    processor = CorpusProcessor(emails_dir, workers=args.workers, chunksize=args.chunksize, mode=args.mode,
+                                state=IncrementalState() if args.incremental else None, sink=sink)
+    corpus_data, results = processor.run()
+    elapsed = time.perf_counter() - started
+    if sink is None:
+        DataSaver().save_to_json(corpus_data, args.output)
+
+    for result in results:
+        if result["status"] == "passed":
+            print(f"✅ {result['document']}")
+        elif result["status"] == "failed":
+            print(f"❌ {result['document']}: различий {len(result['differences'])}")
+            for diff in result["differences"]:
+                print(f"   🔹 {diff['selector']} ({diff['status']}): {diff['actual']!r} != {diff['expected']!r}")
+        elif result["status"] == "no_expected":
+            print(f"⚠️ {result['document']}: нет ожидаемого результата")
+        else:
+            print(f"❌ {result['document']}: ошибка обработки")
+    print(f"Писем: {len(results)}, из них без изменений: {processor.reused}, время: {elapsed:.2f} с")
+    if PROFILER.enabled:
+        print(f"Отчёт профилирования: {PROFILER.write_report()}")
@@ -0,0 +1,253 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from utils.corpus import find_emails, detect_language
+from utils.link_checker import LinkChecker, is_connect_error, DEFAULT_CONCURRENCY, DEFAULT_PER_HOST, DEFAULT_TIMEOUT
+
+# Абсолютный путь для данных
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+EMAILS_DIR = os.path.join(BASE_DIR, "Emails")
+DEFAULT_DOCUMENTS_DIR = os.path.join(DATA_DIR, "documents")
+
+
+def document_sources(expected_data, emails_dir=EMAILS_DIR):
+    """
+    Источники документов из ожидаемого JSON: [{"name", "language", "url", "fallback"}].
+
+    url — адрес HTML-документа (поле "url" письма или "document", если это
+    http(s)-адрес); fallback — локальный файл для работы без сети: поле
+    "document", если такой файл есть, иначе письмо с тем же именем и языком
+    из папки писем.
+    """
+    available = {}
+    for relative_path in find_emails(emails_dir):
+        name = os.path.splitext(os.path.basename(relative_path))[0]
+        available.setdefault(name, []).append(relative_path)
+
+    sources = []
+    for email in (expected_data or {}).get("emails", []):
+        document = email.get("document") or ""
+        url = email.get("url") or (document if document.startswith(("http://", "https://")) else None)
+        fallback = document if document and not url and os.path.exists(document) else None
+        if fallback is None:
+            candidates = available.get(email.get("name"), [])
+            matching = [path for path in candidates if detect_language(path) == email.get("language")]
+            if matching or candidates:
+                fallback = os.path.join(emails_dir, (matching or candidates)[0])
+        sources.append({"name": email.get("name"), "language": email.get("language") or "ru", "url": url,
+                        "fallback": fallback})
+    return sources
+
+
+class DocumentCache:
+    """
+    Локальный кэш HTML-документов, загруженных по URL.
+
+    Тело документа лежит в <каталог>/<язык>/<имя>.html, поэтому каталог
+    устроен как папка писем и передаётся вместо неё (emails_dir). index.json
+    связывает URL с путём, sha256 тела и валидаторами ETag / Last-Modified,
+    которые отправляются в условном запросе. Неизменённый документ не
+    перезаписывается: его mtime сохраняется, и кэш разбора и инкрементальная
+    проверка узнают его без повторного хэширования и парсинга.
+    """
+
+    def __init__(self, path=DEFAULT_DOCUMENTS_DIR):
+        self.path = path
+        self.index_file = os.path.join(path, "index.json")
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.index_file):
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def file_path(self, relative_path):
+        return os.path.join(self.path, relative_path)
+
+    def get(self, url):
+        """
+        Запись о документе, если его файл на месте.
+        """
+        with self._lock:
+            entry = self.entries.get(url)
+        if entry is None or not os.path.exists(self.file_path(entry["document"])):
+            return None
+        return entry
+
+    def validators(self, url):
+        """
+        Заголовки условного запроса для документа из кэша.
+        """
+        entry = self.get(url)
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def touch(self, url):
+        with self._lock:
+            self.entries[url]["checked_at"] = time.time()
+
+    def store_body(self, relative_path, body):
+        """
+        Записывает тело документа (атомарно и только если оно изменилось); возвращает, изменилось ли оно.
+        """
+        file_path = self.file_path(relative_path)
+        if os.path.exists(file_path) and os.path.getsize(file_path) == len(body):
+            with open(file_path, "rb") as f:
+                if f.read() == body:
+                    return False
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        temp_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(body)
+        os.replace(temp_path, file_path)
+        return True
+
+    def put(self, url, relative_path, body, etag=None, last_modified=None):
+        changed = self.store_body(relative_path, body)
+        with self._lock:
+            self.entries[url] = {"document": relative_path, "sha256": hashlib.sha256(body).hexdigest(),
+                                 "etag": etag, "last_modified": last_modified, "checked_at": time.time()}
+        return changed
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock:
+            payload = json.dumps(self.entries, ensure_ascii=False, indent=1, sort_keys=True)
+        temp_path = self.index_file + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(temp_path, self.index_file)
+
+
+class DocumentSource(LinkChecker):
+    """
+    Загрузка HTML-документов писем по URL из ожидаемого JSON.
+
+    Документы запрашиваются параллельно через общую сессию с пулом
+    соединений, лимитами на хост и предохранителем LinkChecker. Для документа
+    из кэша отправляются If-None-Match / If-Modified-Since, и неизменённый
+    шаблон возвращается дешёвым 304 без тела и без перезаписи файла. Без сети
+    (ошибка запроса, разомкнутый предохранитель, статус 4xx/5xx) используется
+    кэшированная копия, а если её нет — локальный файл из fallback.
+
+    Статусы результата: "fetched" (загружен, changed — изменился ли),
+    "not_modified" (304), "cached" и "fallback" (работа без сети),
+    "error" (документа нет ни в сети, ни локально).
+    """
+
+    def __init__(self, cache=None, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST,
+                 timeout=DEFAULT_TIMEOUT, **options):
+        super().__init__(concurrency, per_host, timeout, mode="get", **options)
+        self.documents = cache or DocumentCache()
+
+    def fetch_document(self, source):
+        """
+        Обновляет документ одного письма в кэше; возвращает описание результата.
+        """
+        relative_path = os.path.join(source["language"], f"{source['name']}.html")
+        result = {"name": source["name"], "language": source["language"], "url": source["url"],
+                  "document": relative_path, "path": self.documents.file_path(relative_path), "status": "error",
+                  "changed": False, "bytes": 0, "error": None}
+        url = source["url"]
+        if url is None:
+            return self._offline(source, result, "URL документа не задан")
+        with self._host_limit(url):
+            if not self.breaker.allow(url):
+                return self._offline(source, result, self.breaker.unreachable(url)["final_url"])
+            try:
+                response = self.session.get(url, headers=self.documents.validators(url),
+                                            timeout=self.request_timeout())
+            except requests.exceptions.RequestException as e:
+                if is_connect_error(e):
+                    self.breaker.record_failure(url)
+                return self._offline(source, result, str(e))
+            self.breaker.record_success(url)
+
+        entry = self.documents.get(url)
+        if response.status_code == 304:
+            if entry is None:
+                return self._offline(source, result, "304 без документа в кэше")
+            self.documents.touch(url)
+            result.update(status="not_modified", document=entry["document"],
+                          path=self.documents.file_path(entry["document"]))
+            return result
+        if not response.ok:
+            return self._offline(source, result, f"Статус код: {response.status_code}")
+        body = response.content
+        changed = self.documents.put(url, relative_path, body, response.headers.get("ETag"),
+                                     response.headers.get("Last-Modified"))
+        result.update(status="fetched", changed=changed, bytes=len(body))
+        return result
+
+    def _offline(self, source, result, error):
+        """
+        Документ без сети: кэшированная копия или локальный файл.
+        """
+        result["error"] = error
+        entry = self.documents.get(source["url"]) if source["url"] else None
+        if entry is not None:
+            result.update(status="cached", document=entry["document"],
+                          path=self.documents.file_path(entry["document"]))
+        elif source["fallback"] and os.path.exists(source["fallback"]):
+            with open(source["fallback"], "rb") as f:
+                body = f.read()
+            # Копия без валидаторов: при появлении сети документ загрузится полностью
+            result.update(status="fallback", changed=self.documents.store_body(result["document"], body))
+        return result
+
+    def fetch_documents(self, sources):
+        """
+        Обновляет документы параллельно; результаты в порядке sources.
+        """
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = list(executor.map(self.fetch_document, sources))
+        self.documents.save()
+        return results
+
+    def close(self):
+        self.documents.save()
+        super().close()
+
+
+def sync_documents(expected_file=os.path.join(DATA_DIR, "expected_result.json"), documents_dir=DEFAULT_DOCUMENTS_DIR,
+                   emails_dir=EMAILS_DIR, **options):
+    """
+    Обновляет все документы ожидаемого JSON в documents_dir; возвращает результаты по письмам.
+    """
+    with open(expected_file, "r", encoding="utf-8") as f:
+        expected_data = json.load(f)
+    with DocumentSource(DocumentCache(documents_dir), **options) as source:
+        return source.fetch_documents(document_sources(expected_data, emails_dir))
+
+
+def print_document(result):
+    marks = {"fetched": "⬇️", "not_modified": "✅", "cached": "⚠️", "fallback": "⚠️", "error": "❌"}
+    line = f"{marks[result['status']]} {result['document']}: {result['status']}"
+    if result["status"] == "fetched":
+        line += f" ({result['bytes']} байт, {'изменён' if result['changed'] else 'без изменений'})"
+    if result["error"]:
+        line += f" — {result['error']}"
+    print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Загрузка HTML-документов писем по URL из ожидаемого JSON")
+    parser.add_argument("--expected-file", default=os.path.join(DATA_DIR, "expected_result.json"))
+    parser.add_argument("--documents-dir", default=DEFAULT_DOCUMENTS_DIR)
+    parser.add_argument("--emails-dir", default=EMAILS_DIR, help="локальные файлы для работы без сети")
+    args = parser.parse_args()
+
+    for document in sync_documents(args.expected_file, args.documents_dir, args.emails_dir):
+        print_document(document)
@@ -0,0 +1,164 @@
+import hashlib
+import re
+import soupsieve
+from bs4 import NavigableString, CData, Tag
+
+# Версия логики извлечения: увеличивать при любом изменении результата content
+EXTRACTOR_VERSION = "1"
+
+# Типы строк, которые учитывает get_text() у обычного тега
+DEFAULT_STRING_TYPES = frozenset((NavigableString, CData))
+
+
+class ExtractionRule:
+    """
+    Правило извлечения: какой тип элемента, по какому id и что из него брать.
+    Если attribute не задан, извлекается текст элемента (как get_text(strip=True)).
+    Вместо регулярного выражения для id (или вместе с ним) можно задать
+    CSS-селектор css: он компилируется soupsieve один раз и проверяется на
+    каждом элементе того же обхода дерева.
+    """
+
+    def __init__(self, element_type, pattern=None, tag=None, attribute=None, css=None):
+        if pattern is None and css is None:
+            raise ValueError(f"Для правила '{element_type}' нужен pattern или css")
+        self.element_type = element_type
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.tag = tag
+        self.attribute = attribute
+        self.css = css
+        self.compiled_css = soupsieve.compile(css) if css is not None else None
+
+    def matches(self, tag_name, element_id):
+        """
+        Проверяет, подходит ли элемент под правило (та же семантика, что у find_all(id=regex)).
+        """
+        if self.tag is not None and tag_name != self.tag:
+            return False
+        if self.pattern is None:
+            return True
+        return element_id is not None and self.pattern.search(element_id) is not None
+
+    def matches_element(self, element, element_id):
+        """
+        Проверка элемента BeautifulSoup, включая CSS-селектор.
+        """
+        if not self.matches(element.name, element_id):
+            return False
+        return self.compiled_css is None or self.compiled_css.match(element)
+
+
+DEFAULT_RULES = (
+    ExtractionRule("link", r'^(?:[hbf]-link-\d+|f-social-link-\d+)$', tag="a", attribute="href"),
+    ExtractionRule("image", r'^[hbf]-img-\d+$', tag="img", attribute="src"),
+    ExtractionRule("text", r'^[hbf]-text-\d+$'),
+)
+
+
+class SinglePassExtractor:
+    """
+    Извлекает ссылки, изображения и тексты за один обход дерева BeautifulSoup.
+
+    Каждый элемент с id проверяется предкомпилированными правилами и попадает в
+    свою корзину. Текст собирается снизу вверх: все строки документа один раз
+    складываются в общий список, а текстовый элемент запоминает диапазон
+    своих строк, поэтому ни одно поддерево не обходится повторно.
+    Порядок в content совпадает с прежним: сначала все ссылки, затем
+    изображения, затем тексты, каждый тип в порядке документа.
+    """
+
+    def __init__(self, rules=DEFAULT_RULES):
+        self.rules = tuple(rules)
+        # Элементы без id проверяются, только если есть правила без регулярного выражения для id
+        self.matches_without_id = any(rule.pattern is None for rule in self.rules)
+
+    def extract(self, soup):
+        """
+        Возвращает список content в формате JSON с результатами.
+        """
+        buckets = [[] for _ in self.rules]
+        pieces = []
+        # Открытые текстовые элементы: (запись content, начало диапазона в pieces)
+        open_texts = []
+        stack = [(iter(soup.contents), None)]
+
+        while stack:
+            children, opened = stack[-1]
+            child = next(children, None)
+
+            if child is None:
+                stack.pop()
+                # Закрываем текстовые элементы, открытые этим тегом
+                if opened:
+                    for record, start, element in opened:
+                        if element.interesting_string_types == DEFAULT_STRING_TYPES:
+                            record["expected"] = "".join(pieces[start:])
+                        else:
+                            # <style>/<script> и подобные: другие типы строк, считаем как раньше
+                            record["expected"] = element.get_text(strip=True)
+                    del open_texts[-len(opened):]
+                    if not open_texts:
+                        pieces.clear()
+                continue
+
+            if isinstance(child, Tag):
+                opened = self._dispatch(child, buckets, open_texts, len(pieces))
+                stack.append((iter(child.contents), opened))
+            elif open_texts and type(child) in DEFAULT_STRING_TYPES:
+                value = child.strip()
+                if value:
+                    pieces.append(value)
+
+        content = []
+        for bucket in buckets:
+            content.extend(bucket)
+        return content
+
+    def _dispatch(self, element, buckets, open_texts, start):
+        """
+        Раскладывает элемент по корзинам правил; возвращает открытые им текстовые записи.
+        """
+        element_id = element.attrs.get("id")
+        if element_id is None and not self.matches_without_id:
+            return None
+
+        opened = None
+        for index, rule in enumerate(self.rules):
+            if rule.compiled_css is None:
+                if not rule.matches(element.name, element_id):
+                    continue
+            elif not rule.matches_element(element, element_id):
+                continue
+            # Элемент без id адресуется CSS-селектором правила и номером совпадения
+            selector = element_id if element_id is not None else f"{rule.css}[{len(buckets[index]) + 1}]"
+            record = {"selector": selector, "type": rule.element_type, "expected": None}
+            buckets[index].append(record)
+            if rule.attribute is not None:
+                record["expected"] = element.get(rule.attribute)
+            else:
+                if opened is None:
+                    opened = []
+                opened.append((record, start, element))
+                open_texts.append(record)
+        return opened
+
+
+def rules_fingerprint(rules=DEFAULT_RULES):
+    """
+    Отпечаток набора правил и версии извлечения (для кэшей извлечённых данных).
+    """
+    parts = [EXTRACTOR_VERSION]
+    for rule in rules:
+        pattern = rule.pattern.pattern if rule.pattern is not None else None
+        parts.append(f"{rule.element_type}|{pattern}|{rule.tag}|{rule.attribute}|{rule.css}")
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+DEFAULT_EXTRACTOR = SinglePassExtractor()
+
+
+def extract_content(soup, extractor=DEFAULT_EXTRACTOR):
+    """
+    Извлекает content из объекта BeautifulSoup за один проход.
+    """
+    return extractor.extract(soup)
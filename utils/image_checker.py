@@ -0,0 +1,288 @@
+import hashlib
+import io
+import json
+import os
+import struct
+import threading
+import time
+import requests
+
+from utils.link_checker import LinkChecker, DEFAULT_CONCURRENCY, DEFAULT_PER_HOST, DEFAULT_TIMEOUT
+
+# Абсолютный путь для данных
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DEFAULT_CACHE_DIR = os.path.join(DATA_DIR, "image_cache")
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow не обязателен: без него перцептивный хэш не считается
+    Image = None
+
+# Допустимое расстояние Хэмминга между перцептивными хэшами (из 64 бит)
+DEFAULT_PHASH_THRESHOLD = 5
+
+
+def image_size(data):
+    """
+    Размеры изображения (ширина, высота) по заголовку PNG/GIF/JPEG/WebP или None.
+    """
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        return struct.unpack(">II", data[16:24])
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return struct.unpack("<HH", data[6:10])
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        kind = data[12:16]
+        if kind == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return width & 0x3FFF, height & 0x3FFF
+        if kind == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if kind == b"VP8X":
+            return int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+    if data[:2] == b"\xff\xd8":
+        position = 2
+        while position + 9 < len(data):
+            if data[position] != 0xFF:
+                position += 1
+                continue
+            marker = data[position + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+                position += 1 if marker == 0xFF else 2
+                continue
+            length = struct.unpack(">H", data[position + 2:position + 4])[0]
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">HH", data[position + 5:position + 9])
+                return width, height
+            position += 2 + length
+    return None
+
+
+def perceptual_hash(data):
+    """
+    Разностный перцептивный хэш (dHash, 64 бита) в hex; None без Pillow или для нечитаемого файла.
+    """
+    if Image is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            pixels = list(image.convert("L").resize((9, 8)).getdata())
+    except Exception:
+        return None
+    bits = 0
+    for row in range(8):
+        for column in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + column] > pixels[row * 9 + column + 1])
+    return f"{bits:016x}"
+
+
+def hash_distance(first, second):
+    """
+    Расстояние Хэмминга между двумя hex-хэшами.
+    """
+    return bin(int(first, 16) ^ int(second, 16)).count("1")
+
+
+def describe_image(data):
+    """
+    Отпечаток содержимого изображения: размер файла, sha256, размеры и перцептивный хэш.
+    """
+    dimensions = image_size(data)
+    return {
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "width": dimensions[0] if dimensions else None,
+        "height": dimensions[1] if dimensions else None,
+        "phash": perceptual_hash(data),
+    }
+
+
+class ImageAssetCache:
+    """
+    Локальный контентно-адресуемый кэш изображений.
+
+    Тела хранятся один раз по sha256 (objects/<aa>/<sha256>), а индекс
+    index.json связывает URL с отпечатком и временем загрузки. Пока запись
+    не старше ttl, изображение не скачивается и не хэшируется повторно.
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_DIR, ttl=24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self.index_file = os.path.join(path, "index.json")
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.index_file):
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def key(self, url, mode="get"):
+        return url
+
+    def get(self, url):
+        with self._lock:
+            entry = self.entries.get(url)
+        if entry is None or entry["fetched_at"] + self.ttl <= time.time():
+            return None
+        return entry["asset"]
+
+    def put(self, url, asset, data):
+        object_path = os.path.join(self.path, "objects", asset["sha256"][:2], asset["sha256"])
+        if not os.path.exists(object_path):
+            os.makedirs(os.path.dirname(object_path), exist_ok=True)
+            with open(object_path, "wb") as f:
+                f.write(data)
+        with self._lock:
+            self.entries[url] = {"asset": asset, "fetched_at": time.time()}
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock:
+            payload = json.dumps(self.entries, ensure_ascii=False)
+        temp_path = self.index_file + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(payload)
+        os.replace(temp_path, self.index_file)
+
+
+class ImageChecker(LinkChecker):
+    """
+    Проверка реальных изображений письма: каждое уникальное изображение
+    скачивается параллельно через общую сессию (с лимитами на хост), затем
+    проверяются статус, content-type и размеры, а sha256 и перцептивный хэш
+    сравниваются со значениями "asset" из ожидаемого JSON.
+    """
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT,
+                 cache=None, phash_threshold=DEFAULT_PHASH_THRESHOLD):
+        super().__init__(concurrency, per_host, timeout, cache=cache, mode="get")
+        self.phash_threshold = phash_threshold
+
+    def fetch(self, url):
+        """
+        Скачивает изображение (или берёт отпечаток из кэша) и возвращает его описание.
+        """
+        if self.cache is not None:
+            cached = self.cache.get(url)
+            if cached is not None:
+                return cached
+        try:
+            with self._host_limit(url):
+                response = self.session.get(url, timeout=self.request_timeout())
+        except requests.exceptions.RequestException as e:
+            return {"url": url, "status_code": None, "content_type": None, "error": str(e)}
+
+        asset = {"url": url, "status_code": response.status_code,
+                 "content_type": response.headers.get("Content-Type", "").split(";")[0].strip().lower(),
+                 "error": None}
+        if response.ok:
+            asset.update(describe_image(response.content))
+            if self.cache is not None:
+                self.cache.put(url, asset, response.content)
+        return asset
+
+    def verify_asset(self, asset, expected_asset=None):
+        """
+        Список проблем изображения относительно проверок и ожидаемого отпечатка.
+        """
+        problems = []
+        if asset["status_code"] is None:
+            return [f"Ошибка при запросе: {asset['error']}"]
+        if not 200 <= asset["status_code"] < 300:
+            return [f"Статус код: {asset['status_code']}"]
+        if not asset["content_type"].startswith("image/"):
+            problems.append(f"Content-Type не изображение: {asset['content_type'] or 'не указан'}")
+        # Размеры векторного SVG из заголовка не читаются — это не признак битого файла
+        if asset.get("width") is None and asset["content_type"] != "image/svg+xml":
+            problems.append("Не удалось определить размеры (битое изображение)")
+
+        expected_asset = expected_asset or {}
+        for field in ("width", "height"):
+            if field in expected_asset and expected_asset[field] != asset.get(field):
+                problems.append(f"{field}: {asset.get(field)} вместо {expected_asset[field]}")
+        if "sha256" in expected_asset and expected_asset["sha256"] != asset.get("sha256"):
+            problems.append("Содержимое изменилось (sha256 не совпадает)")
+        if expected_asset.get("phash") and asset.get("phash"):
+            distance = hash_distance(expected_asset["phash"], asset["phash"])
+            if distance > self.phash_threshold:
+                problems.append(f"Изображение визуально отличается (расстояние phash {distance})")
+        return problems
+
+    def check_images(self, data, expected_data=None):
+        """
+        Проверяет все изображения документа; возвращает список проблем по селекторам.
+        Отпечатки берутся из поля "asset" элемента или из expected_data (по письму и селектору).
+        """
+        expected = expected_assets(expected_data or {})
+        images = [(content, content.get('asset') or expected.get((email.get('name'), email.get('language'),
+                                                                   content['selector'])))
+                  for email in data['emails']
+                  for content in email['content']
+                  if content['type'] == 'image' and content.get('expected')]
+        assets = self.fetch_urls([content['expected'] for content, _ in images])
+        if self.cache is not None:
+            self.cache.save()
+
+        issues = []
+        for (content, expected_asset), asset in zip(images, assets):
+            problems = self.verify_asset(asset, expected_asset)
+            if problems:
+                issues.append({
+                    'selector': content['selector'],
+                    'url': content['expected'],
+                    'status_code': asset['status_code'],
+                    'errors': problems
+                })
+        return issues
+
+    def record_assets(self, data):
+        """
+        Дописывает в элементы-изображения поле "asset" с текущим отпечатком (для ожидаемого JSON).
+        """
+        images = [content
+                  for email in data['emails']
+                  for content in email['content']
+                  if content['type'] == 'image' and content.get('expected')]
+        for content, asset in zip(images, self.fetch_urls([content['expected'] for content in images])):
+            if asset.get("sha256"):
+                content['asset'] = {field: asset[field]
+                                    for field in ("sha256", "phash", "width", "height") if asset.get(field)}
+        if self.cache is not None:
+            self.cache.save()
+        return data
+
+
+def expected_assets(expected_data):
+    """
+    Отпечатки изображений ожидаемого JSON: {(имя письма, язык, селектор): asset}.
+    """
+    assets = {}
+    for email in expected_data.get('emails', []):
+        for content in email.get('content', []):
+            if content.get('type') == 'image' and content.get('asset'):
+                assets[(email.get('name'), email.get('language'), content['selector'])] = content['asset']
+    return assets
+
+
+# Запуск проверки изображений
+if __name__ == "__main__":
+    # Проверяются только что извлечённые изображения, отпечатки — из ожидаемого JSON
+    with open(os.path.join(DATA_DIR, "actual_result.json"), "r", encoding="utf-8") as file:
+        actual_data = json.load(file)
+    with open(os.path.join(DATA_DIR, "expected_result.json"), "r", encoding="utf-8") as file:
+        expected_data = json.load(file)
+
+    with ImageChecker(cache=ImageAssetCache()) as checker:
+        issues = checker.check_images(actual_data, expected_data)
+
+    if issues:
+        print("❌ Найдены проблемы с изображениями:")
+        for issue in issues:
+            print(f"🖼 Селектор: {issue['selector']}")
+            print(f"URL: {issue['url']}")
+            for error in issue['errors']:
+                print(f"Ошибка: {error}")
+            print("-" * 30)
+    else:
+        print("✅ Все изображения доступны и совпадают с ожидаемыми.")
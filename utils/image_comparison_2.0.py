@@ -1,6 +1,9 @@
-import json
-import difflib
 import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.comparator import ContentComparator, format_diff
+from utils.result_store import load_results
 
 
 class DataSaver:
@@ -14,15 +17,14 @@ class DataSaver:
 
     def load_json(self, filename):
         """
-        Загружает JSON-файл.
+        Загружает JSON-файл или каталог JSONL-хранилища результатов.
         """
         file_path = os.path.join(self.DATA_DIR, filename)
         if not os.path.exists(file_path):
             print(f"❌ Файл {filename} не найден!")
             return None
         try:
-            with open(file_path, "r", encoding="utf-8") as file:
-                return json.load(file)
+            return load_results(file_path)
         except Exception as e:
             print(f"❌ Ошибка при чтении {filename}: {e}")
             return None
@@ -38,44 +40,11 @@ class JsonComparator:
         self.actual_data = self.data_saver.load_json(actual_filename)
         self.expected_data = self.data_saver.load_json(expected_filename)
 
-    def filter_image_elements(self, data):
-        """
-        Извлекает все элементы типа 'image'.
-        """
-        if not data:
-            return []
-
-        image_elements = []
-        for email in data.get("emails", []):
-            for content in email.get("content", []):
-                if content.get("type") == "image":
-                    image_elements.append({
-                        "selector": content.get("selector"),
-                        "expected": content.get("expected", "")
-                    })
-        return image_elements
-
     def compare_image_elements(self):
         """
         Сравнивает изображения (image) из JSON-файлов.
         """
-        actual_image_elements = self.filter_image_elements(self.actual_data)
-        expected_image_elements = self.filter_image_elements(self.expected_data)
-
-        differences = []
-
-        for actual, expected in zip(actual_image_elements, expected_image_elements):
-            diff = list(difflib.ndiff([actual["expected"]], [expected["expected"]]))
-
-            if any(line.startswith("- ") or line.startswith("+ ") for line in diff):
-                differences.append({
-                    "selector": actual["selector"],
-                    "actual": actual["expected"],
-                    "expected": expected["expected"],
-                    "diff": "\n".join(diff)
-                })
-
-        return differences
+        return ContentComparator().compare(self.actual_data, self.expected_data, types=("image",))
 
     def run_comparison(self):
         """
@@ -89,7 +58,10 @@ class JsonComparator:
                 print(f"🖼 **Селектор:** {diff['selector']}")
                 print(f"✅ **Ожидаемое значение:** {diff['expected']}")
                 print(f"❌ **Фактическое значение:** {diff['actual']}")
-                print(f"🔍 **Различия:**\n{diff['diff']}")
+                if diff['status'] != "mismatch":
+                    print(f"⚠️ **Статус:** {diff['status']}")
+                if diff['diff']:
+                    print(f"🔍 **Различия:**\n{format_diff(diff['diff'], diff['actual'], diff['expected'])}")
                 print("-" * 40)
         else:
             print("✅ Все значения типа 'image' совпадают.")
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+
+from utils.selector_plans import plans_fingerprint
+
+# Абсолютный путь для данных
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DEFAULT_STATE_FILE = os.path.join(DATA_DIR, "incremental_state.json")
+
+
+def file_digest(file_path):
+    """
+    SHA-256 содержимого файла.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def data_digest(data):
+    """
+    SHA-256 JSON-данных (ключи отсортированы, чтобы порядок не влиял на хэш).
+    """
+    payload = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IncrementalState:
+    """
+    Состояние инкрементальной проверки: для каждого файла письма хранятся хэш
+    содержимого, версия извлечения, хэш ожидаемых данных и результат прошлой
+    проверки (извлечённый content и вердикт сравнения).
+
+    Файл считается неизменным, если совпадают размер и mtime (тогда хэш не
+    пересчитывается) либо совпадает хэш содержимого.
+    """
+
+    def __init__(self, path=DEFAULT_STATE_FILE, version=None):
+        self.path = path
+        self.version = version or plans_fingerprint()
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("version") == self.version:
+                self.entries = state.get("entries", {})
+
+    def _fingerprint(self, file_path, entry=None):
+        """
+        (размер, mtime, хэш) файла; хэш берётся из entry, если размер и mtime не изменились.
+        """
+        stat = os.stat(file_path)
+        if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return stat.st_size, stat.st_mtime_ns, entry["digest"]
+        return stat.st_size, stat.st_mtime_ns, file_digest(file_path)
+
+    def lookup(self, key, file_path, mode, expected_digest):
+        """
+        Возвращает сохранённый результат, если письмо, режим и ожидаемые данные не менялись.
+        """
+        entry = self.entries.get(key)
+        if entry is None or entry["mode"] != mode or entry["expected_digest"] != expected_digest:
+            return None
+        size, mtime_ns, digest = self._fingerprint(file_path, entry)
+        if digest != entry["digest"]:
+            return None
+        if (size, mtime_ns) != (entry["size"], entry["mtime_ns"]):
+            entry["size"], entry["mtime_ns"] = size, mtime_ns
+            self.dirty = True
+        return entry["result"]
+
+    def store(self, key, file_path, mode, expected_digest, result):
+        """
+        Запоминает результат проверки письма.
+        """
+        size, mtime_ns, digest = self._fingerprint(file_path)
+        self.entries[key] = {"size": size, "mtime_ns": mtime_ns, "digest": digest, "mode": mode,
+                             "expected_digest": expected_digest, "result": result}
+        self.dirty = True
+
+    def prune(self, keys):
+        """
+        Удаляет записи о письмах, которых больше нет в корпусе.
+        """
+        for key in set(self.entries) - set(keys):
+            del self.entries[key]
+            self.dirty = True
+
+    def save(self):
+        """
+        Атомарно записывает состояние на диск (только если оно менялось).
+        """
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+        self.dirty = False
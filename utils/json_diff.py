@@ -0,0 +1,237 @@
+import json
+import os
+import sys
+
+from utils.result_store import JsonlResultStore
+
+# Абсолютный путь для данных
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+
+# Поля, которые зависят от машины и не участвуют в сравнении (путь к письму и т.п.)
+DEFAULT_VOLATILE_FIELDS = ("document",)
+# Поля, по которым сопоставляются элементы списков (письма — по id, элементы content — по селектору)
+DEFAULT_LIST_KEYS = ("id", "selector")
+
+
+def escape_pointer_token(token):
+    """
+    Экранирует часть JSON-pointer (RFC 6901): "~" -> "~0", "/" -> "~1".
+    """
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+class StructuralDiff:
+    """
+    Структурное сравнение двух JSON-документов.
+
+    Деревья обходятся параллельно: списки словарей сопоставляются по первому
+    ключу из list_keys, который есть у всех элементов (письма по id, content
+    по селектору), остальные списки — по позиции. Совпадающие поддеревья
+    отсекаются сравнением на уровне C (== и json.dumps), без обхода в Python;
+    остальные узлы посещаются один раз. Скаляры сравниваются по типу и значению,
+    поэтому 1, 1.0 и true различаются. Поля из volatile_fields пропускаются.
+    Повторный ключ сопоставления в списке — отдельное изменение "duplicate":
+    с первым элементом сравнивается пара, повторы выдаются как есть.
+    Изменения выдаются генератором в виде
+    {"op": "replace" | "add" | "remove" | "duplicate", "path": JSON-pointer, "actual", "expected"};
+    в пути вместо индексов стоят ключи сопоставления (/emails/1/content/h-link-1/expected).
+
+    compare и iter_changes работают с документами в памяти; iter_email_changes
+    сравнивает письма из хранилищ по одному (см. diff_json_files).
+    """
+
+    def __init__(self, volatile_fields=DEFAULT_VOLATILE_FIELDS, list_keys=DEFAULT_LIST_KEYS):
+        self.volatile_fields = frozenset(volatile_fields)
+        self.list_keys = tuple(list_keys)
+
+    def iter_changes(self, actual, expected, path=""):
+        """
+        Генератор изменений между actual и expected.
+        """
+        if self._same_tree(actual, expected):
+            return
+        if isinstance(actual, dict) and isinstance(expected, dict):
+            yield from self._diff_dicts(actual, expected, path)
+        elif isinstance(actual, list) and isinstance(expected, list):
+            yield from self._diff_lists(actual, expected, path)
+        elif type(actual) is not type(expected) or actual != expected:
+            # == в Python считает равными True, 1 и 1.0; в JSON это разные значения
+            yield {"op": "replace", "path": path, "actual": actual, "expected": expected}
+
+    def compare(self, actual, expected):
+        """
+        Список всех изменений.
+        """
+        return list(self.iter_changes(actual, expected))
+
+    def iter_email_changes(self, actual_store, expected_store, path="/emails"):
+        """
+        Генератор изменений между письмами двух хранилищ (iter_emails и get(id)),
+        сопоставленных по id. Фактические письма читаются потоком, ожидаемые — по id,
+        так что в памяти держатся сравниваемая пара писем и множества id.
+        """
+        seen = set()
+        for email in actual_store.iter_emails():
+            email_id = str(email.get("id"))
+            child = f"{path}/{escape_pointer_token(email_id)}"
+            if email_id in seen:
+                yield {"op": "duplicate", "path": child, "actual": email, "expected": None}
+                continue
+            seen.add(email_id)
+            expected = expected_store.get(email_id)
+            if expected is None:
+                yield {"op": "remove", "path": child, "actual": email, "expected": None}
+            elif not self._same_tree(email, expected):
+                yield from self._diff_dicts(email, expected, child)
+        expected_seen = set()
+        for email in expected_store.iter_emails():
+            email_id = str(email.get("id"))
+            child = f"{path}/{escape_pointer_token(email_id)}"
+            if email_id in expected_seen:
+                yield {"op": "duplicate", "path": child, "actual": None, "expected": email}
+            elif email_id not in seen:
+                yield {"op": "add", "path": child, "actual": None, "expected": email}
+            expected_seen.add(email_id)
+
+    @staticmethod
+    def _same_tree(actual, expected):
+        """
+        Поддеревья совпадают как JSON. == отсекает различия на уровне C, но считает
+        равными 1, 1.0 и true; json.dumps их различает. Поддеревья с разным порядком
+        ключей сюда не проходят и обходятся обычным путём.
+        """
+        if actual is expected:
+            return True
+        if not isinstance(actual, (dict, list)) or actual != expected:
+            return False
+        return json.dumps(actual, check_circular=False) == json.dumps(expected, check_circular=False)
+
+    def _diff_dicts(self, actual, expected, path):
+        for key, actual_value in actual.items():
+            if key in self.volatile_fields:
+                continue
+            if key not in expected:
+                yield {"op": "remove", "path": f"{path}/{escape_pointer_token(key)}", "actual": actual_value,
+                       "expected": None}
+                continue
+            expected_value = expected[key]
+            # Совпадающие скаляры (большинство полей) отсекаются без рекурсии
+            if (type(actual_value) is type(expected_value) and not isinstance(actual_value, (dict, list))
+                    and actual_value == expected_value):
+                continue
+            yield from self.iter_changes(actual_value, expected_value, f"{path}/{escape_pointer_token(key)}")
+        for key, expected_value in expected.items():
+            if key not in actual and key not in self.volatile_fields:
+                yield {"op": "add", "path": f"{path}/{escape_pointer_token(key)}", "actual": None,
+                       "expected": expected_value}
+
+    def _list_key(self, items):
+        for key in self.list_keys:
+            if all(isinstance(item, dict) and key in item for item in items):
+                return key
+        return None
+
+    def _diff_lists(self, actual, expected, path):
+        key = self._list_key(actual + expected)
+        if key is None:
+            for index in range(max(len(actual), len(expected))):
+                child = f"{path}/{index}"
+                if index >= len(expected):
+                    yield {"op": "remove", "path": child, "actual": actual[index], "expected": None}
+                elif index >= len(actual):
+                    yield {"op": "add", "path": child, "actual": None, "expected": expected[index]}
+                else:
+                    yield from self.iter_changes(actual[index], expected[index], child)
+            return
+
+        expected_index = {}
+        for item in expected:
+            if item[key] in expected_index:
+                yield {"op": "duplicate", "path": f"{path}/{escape_pointer_token(item[key])}", "actual": None,
+                       "expected": item}
+            else:
+                expected_index[item[key]] = item
+        seen = set()
+        for item in actual:
+            item_key = item[key]
+            child = f"{path}/{escape_pointer_token(item_key)}"
+            if item_key in seen:
+                yield {"op": "duplicate", "path": child, "actual": item, "expected": None}
+                continue
+            seen.add(item_key)
+            if item_key not in expected_index:
+                yield {"op": "remove", "path": child, "actual": item, "expected": None}
+            elif not self._same_tree(item, expected_index[item_key]):
+                # Элементы с ключом сопоставления — всегда словари
+                yield from self._diff_dicts(item, expected_index[item_key], child)
+        for item_key, item in expected_index.items():
+            if item_key not in seen:
+                yield {"op": "add", "path": f"{path}/{escape_pointer_token(item_key)}", "actual": None,
+                       "expected": item}
+
+
+def format_change(change):
+    """
+    Строка изменения для консоли.
+    """
+    if change["op"] == "add":
+        return f"+ {change['path']}: {change['expected']!r}"
+    if change["op"] == "remove":
+        return f"- {change['path']}: {change['actual']!r}"
+    if change["op"] == "duplicate":
+        return f"! {change['path']}: повторяющийся ключ: {change['actual'] or change['expected']!r}"
+    return f"~ {change['path']}: {change['actual']!r} != {change['expected']!r}"
+
+
+class JsonEmails:
+    """
+    Письма JSON-файла {"emails": [...]} с тем же доступом, что у JsonlResultStore.
+    """
+
+    def __init__(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            self.emails = json.load(f).get("emails", [])
+        self.index = {}
+        for email in self.emails:
+            self.index.setdefault(str(email.get("id")), email)
+
+    def get(self, email_id):
+        return self.index.get(str(email_id))
+
+    def iter_emails(self):
+        return iter(self.emails)
+
+
+def open_emails(path):
+    """
+    Хранилище писем по пути: каталог JsonlResultStore или JSON-файл.
+    """
+    return JsonlResultStore(path) if os.path.isdir(path) else JsonEmails(path)
+
+
+def diff_json_files(actual_file, expected_file, differ=None):
+    """
+    Структурный diff двух файлов результатов. Если хотя бы один из них — каталог
+    JsonlResultStore, письма сравниваются по одному (iter_email_changes) и
+    хранилище не загружается целиком; два JSON-файла сравниваются в памяти.
+    """
+    differ = differ or StructuralDiff()
+    if os.path.isdir(actual_file) or os.path.isdir(expected_file):
+        return list(differ.iter_email_changes(open_emails(actual_file), open_emails(expected_file)))
+    with open(actual_file, "r", encoding="utf-8") as f1, open(expected_file, "r", encoding="utf-8") as f2:
+        actual_data = json.load(f1)
+        expected_data = json.load(f2)
+    return differ.compare(actual_data, expected_data)
+
+
+if __name__ == "__main__":
+    actual_path = sys.argv[1] if len(sys.argv) > 1 else os.path.join(DATA_DIR, "actual_result.json")
+    expected_path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(DATA_DIR, "expected_result.json")
+    changes = diff_json_files(actual_path, expected_path)
+    if changes:
+        print(f"❌ Найдено изменений: {len(changes)}")
+        for change in changes:
+            print(format_change(change))
+    else:
+        print("✅ Документы совпадают.")
@@ -0,0 +1,151 @@
+import fnmatch
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Абсолютный путь для данных
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DEFAULT_CACHE_FILE = os.path.join(DATA_DIR, "link_cache.sqlite")
+
+# Параметры, не влияющие на адрес назначения (маски fnmatch)
+DEFAULT_TRACKING_PARAMS = ("utm_*", "content")
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url, tracking_params=DEFAULT_TRACKING_PARAMS):
+    """
+    Приводит URL к каноническому виду: схема и хост в нижнем регистре, без порта
+    по умолчанию и фрагмента, без трекинговых параметров, параметры отсортированы.
+    Не-строки (ссылка без href) и URL, которые не разбираются (порт не число),
+    возвращаются как есть.
+    """
+    if not isinstance(url, str):
+        return url
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if port and port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not any(fnmatch.fnmatchcase(key, pattern) for pattern in tracking_params)]
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(sorted(query)), ""))
+
+
+class LinkCache:
+    """
+    Дисковый кэш результатов проверки ссылок (sqlite).
+
+    Ключ — режим проверки (get/probe) и канонический URL: результат HEAD-проверки
+    не выдаётся полной проверке GET. Ссылки без URL (нет href) не кэшируются.
+    У каждой записи свой срок жизни: отдельно для успешных и для неуспешных
+    проверок. При превышении max_entries вытесняются записи, к которым дольше
+    всего не обращались (LRU).
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_FILE, success_ttl=24 * 3600, failure_ttl=15 * 60,
+                 max_entries=50000, tracking_params=DEFAULT_TRACKING_PARAMS):
+        self.path = path
+        self.success_ttl = success_ttl
+        self.failure_ttl = failure_ttl
+        self.max_entries = max_entries
+        self.tracking_params = tuple(tracking_params)
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS link_checks ("
+            " url TEXT PRIMARY KEY,"
+            " is_valid INTEGER NOT NULL,"
+            " status_code INTEGER,"
+            " final_url TEXT,"
+            " redirects TEXT NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " last_used REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS link_checks_lru ON link_checks (last_used)")
+        self._connection.commit()
+
+    def key(self, url, mode="get"):
+        """
+        Ключ записи; None для ссылок без URL.
+        """
+        if not isinstance(url, str):
+            return None
+        return f"{mode} {canonicalize_url(url, self.tracking_params)}"
+
+    def get(self, url, mode="get"):
+        """
+        Возвращает сохранённый результат {"is_valid", "status_code", "final_url", "redirects"}
+        или None, если записи нет или её срок истёк.
+        """
+        key = self.key(url, mode)
+        if key is None:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT is_valid, status_code, final_url, redirects, expires_at FROM link_checks WHERE url = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            if row[4] <= now:
+                self._connection.execute("DELETE FROM link_checks WHERE url = ?", (key,))
+                self._connection.commit()
+                return None
+            self._connection.execute("UPDATE link_checks SET last_used = ? WHERE url = ?", (now, key))
+            self._connection.commit()
+        return {"is_valid": bool(row[0]), "status_code": row[1], "final_url": row[2],
+                "redirects": json.loads(row[3])}
+
+    def put(self, url, result, mode="get"):
+        """
+        Сохраняет результат проверки; срок жизни зависит от успешности.
+        """
+        key = self.key(url, mode)
+        if key is None:
+            return
+        now = time.time()
+        ttl = self.success_ttl if result["is_valid"] else self.failure_ttl
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO link_checks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, int(result["is_valid"]), result["status_code"], result["final_url"],
+                 json.dumps(result.get("redirects", []), ensure_ascii=False), now + ttl, now))
+            self._evict()
+            self._connection.commit()
+
+    def _evict(self):
+        """
+        Удаляет самые давно использованные записи сверх max_entries.
+        """
+        count = self._connection.execute("SELECT COUNT(*) FROM link_checks").fetchone()[0]
+        if count > self.max_entries:
+            self._connection.execute(
+                "DELETE FROM link_checks WHERE url IN "
+                "(SELECT url FROM link_checks ORDER BY last_used LIMIT ?)", (count - self.max_entries,))
+
+    def purge_expired(self):
+        """
+        Удаляет все записи с истёкшим сроком.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM link_checks WHERE expires_at <= ?", (time.time(),))
+            self._connection.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM link_checks").fetchone()[0]
+
+    def close(self):
+        self._connection.close()
@@ -2,43 +2,317 @@ import json
 import requests
 import os
 import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, urljoin
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, NewConnectionError
+
+from utils.circuit_breaker import HostCircuitBreaker
+from utils.content_store import ContentStore
+from utils.profiling import profiled
 
 # Абсолютный путь для данных
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")  # Папка data находится в основной директории проекта
 
-# Функция для проверки статуса кода HTTP и получения конечного URL
-def check_url_status(url):
+# Параметры параллельной проверки по умолчанию: таймаут чтения и отдельный, короткий — подключения
+DEFAULT_TIMEOUT = 10
+DEFAULT_CONNECT_TIMEOUT = 3
+DEFAULT_TIMEOUTS = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_TIMEOUT)
+DEFAULT_CONCURRENCY = 16
+DEFAULT_PER_HOST = 4
+DEFAULT_MAX_REDIRECTS = 30
+
+# Ответы на HEAD, после которых ссылка перепроверяется через GET без тела
+HEAD_FALLBACK_STATUSES = (400, 403, 405, 501)
+
+
+# Функция для проверки, что хост не принял соединение: отказ, таймаут подключения, ошибка DNS
+# (сброс уже принятого соединения и ошибка TLS — не недоступность хоста)
+def is_connect_error(error):
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError) or isinstance(error, requests.exceptions.SSLError):
+        return False
+    reason = error.args[0] if error.args else None
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+# Функция для описания ошибки запроса
+def request_error(error, redirects, started):
+    return {"is_valid": False, "status_code": None, "final_url": str(error), "redirects": redirects,
+            "elapsed": time.perf_counter() - started, "connect_error": is_connect_error(error)}
+
+
+# Функция для запроса ссылки: статус, конечный URL и цепочка редиректов
+def fetch_url(url, session=None, timeout=DEFAULT_TIMEOUTS):
+    started = time.perf_counter()
+    try:
+        response = (session or requests).get(url, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        return request_error(e, [], started)
+    return {
+        "is_valid": not 399 < response.status_code < 600,
+        "status_code": response.status_code,
+        "final_url": response.url,
+        "redirects": [{"url": hop.url, "status_code": hop.status_code, "elapsed": hop.elapsed.total_seconds()}
+                      for hop in response.history],
+        "headers": dict(response.headers),
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+# Функция для проверки ссылки без скачивания тел: HEAD, при отказе — GET с закрытием после заголовков
+def probe_url(url, session=None, timeout=DEFAULT_TIMEOUTS, max_redirects=DEFAULT_MAX_REDIRECTS):
+    session = session or requests
+    redirects = []
+    current_url = url
+    started = time.perf_counter()
     try:
-        response = requests.get(url, timeout=10)
-        if 399 < response.status_code < 600:
-            return False, response.status_code, response.url
-        return True, response.status_code, response.url
+        while True:
+            hop_started = time.perf_counter()
+            response = session.head(current_url, timeout=timeout, allow_redirects=False)
+            if response.status_code in HEAD_FALLBACK_STATUSES:
+                response = session.get(current_url, timeout=timeout, allow_redirects=False, stream=True)
+                response.close()
+            elapsed = time.perf_counter() - hop_started
+
+            location = response.headers.get("Location")
+            if not response.is_redirect or not location:
+                break
+            redirects.append({"url": current_url, "status_code": response.status_code, "elapsed": elapsed})
+            if len(redirects) > max_redirects:
+                raise requests.exceptions.TooManyRedirects(f"Exceeded {max_redirects} redirects.")
+            current_url = urljoin(current_url, location)
     except requests.exceptions.RequestException as e:
-        return False, None, str(e)
+        return request_error(e, redirects, started)
+    return {
+        "is_valid": not 399 < response.status_code < 600,
+        "status_code": response.status_code,
+        "final_url": current_url,
+        "redirects": redirects,
+        "headers": dict(response.headers),
+        "elapsed": time.perf_counter() - started,
+    }
+
+
+# Функция для проверки статуса кода HTTP и получения конечного URL
+@profiled("check_url_status")
+def check_url_status(url, session=None, timeout=DEFAULT_TIMEOUTS):
+    result = fetch_url(url, session, timeout)
+    return result["is_valid"], result["status_code"], result["final_url"]
+
+
+class LinkChecker:
+    """
+    Параллельная проверка ссылок через общую сессию requests.
+
+    Соединения переиспользуются (keep-alive) из пула сессии, общее число
+    одновременных запросов ограничено concurrency, а к одному хосту —
+    per_host, чтобы не перегружать собственные домены. С кэшем (LinkCache)
+    каждый канонический URL запрашивается не больше одного раза за запуск,
+    а свежие результаты прошлых запусков берутся с диска.
+    Режим "get" (по умолчанию) — полный GET, как check_url_status; режим
+    "probe" (по выбору) проверяет ссылки без скачивания тел (probe_url) и
+    записывает каждый редирект, но серверы, отвечающие на HEAD иначе, чем на
+    GET, могут дать в нём другой вердикт.
+    С кассетой (LinkCassette) результаты записываются в файл или
+    воспроизводятся из него без обращения к сети.
+
+    Подключение ограничено connect_timeout, ответ — timeout. Предохранитель
+    (HostCircuitBreaker) после нескольких подряд неудачных подключений к хосту
+    сразу возвращает для его ссылок вердикт «хост недоступен». С deadline
+    (секунды от создания проверяющего) запросы укорачиваются до оставшегося
+    времени, а после его истечения ссылки не запрашиваются и помечаются
+    непроверенными — проверка возвращает частичные результаты.
+    """
+
+    MODES = ("get", "probe")
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT,
+                 cache=None, mode="get", cassette=None, connect_timeout=DEFAULT_CONNECT_TIMEOUT, breaker=None,
+                 deadline=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Неизвестный режим проверки ссылок: {mode}")
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.breaker = breaker if breaker is not None else HostCircuitBreaker()
+        self.deadline_at = time.monotonic() + deadline if deadline is not None else None
+        self.cache = cache
+        self.mode = mode
+        self.cassette = cassette
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_limits = defaultdict(lambda: threading.BoundedSemaphore(self.per_host))
+        self._host_limits_lock = threading.Lock()
+
+    def _host_limit(self, url):
+        """
+        Семафор хоста ссылки (создаётся при первом обращении).
+        """
+        host = urlsplit(url).netloc.lower()
+        with self._host_limits_lock:
+            return self._host_limits[host]
+
+    def remaining(self):
+        """
+        Секунды до общего срока проверки (None — срока нет).
+        """
+        if self.deadline_at is None:
+            return None
+        return self.deadline_at - time.monotonic()
+
+    def request_timeout(self):
+        """
+        Таймауты (подключение, чтение) запроса, укороченные до общего срока проверки.
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return self.connect_timeout, self.timeout
+        return min(self.connect_timeout, remaining), min(self.timeout, remaining)
+
+    def expired(self, url):
+        """
+        Вердикт для ссылки, не проверенной до общего срока.
+        """
+        return {"is_valid": False, "status_code": None, "final_url": f"Не проверена: истёк срок проверки ({url})",
+                "redirects": [], "headers": {}, "elapsed": 0.0, "deadline_expired": True}
+
+    @profiled("check_url_status")
+    def fetch(self, url):
+        """
+        Полный результат проверки одной ссылки: из кассеты, из кэша или запросом с учётом
+        лимита на хост, предохранителя и общего срока проверки.
+        """
+        if self.cassette is not None:
+            recorded = self.cassette.play(self.mode, url)
+            if recorded is not None:
+                return recorded
+            if not self.cassette.allows_network:
+                return self.cassette.missing(url)
+        if self.cache is not None and (self.cassette is None or self.cassette.mode != "record"):
+            cached = self.cache.get(url, self.mode)
+            if cached is not None:
+                return cached
+        request = probe_url if self.mode == "probe" else fetch_url
+        with self._host_limit(url):
+            # Проверяется после ожидания лимита: пока ссылка ждала, хост мог оказаться недоступен
+            remaining = self.remaining()
+            if remaining is not None and remaining <= 0:
+                return self.expired(url)
+            if not self.breaker.allow(url):
+                return self.breaker.unreachable(url)
+            result = request(url, self.session, self.request_timeout())
+            if result.get("connect_error"):
+                self.breaker.record_failure(url)
+            else:
+                self.breaker.record_success(url)
+        # Запрос, оборванный общим сроком, — не вердикт о ссылке: не кэшируется и не записывается
+        if result["status_code"] is None and self.deadline_at is not None and self.remaining() <= 0:
+            return self.expired(url)
+        if self.cache is not None:
+            self.cache.put(url, result, self.mode)
+        if self.cassette is not None:
+            self.cassette.record(self.mode, url, result)
+        return result
+
+    def cache_key(self, url):
+        """
+        Ключ ссылки для кэша и для запроса одинаковых ссылок один раз.
+        """
+        return self.cache.key(url, self.mode) if self.cache is not None else url
+
+    def check_url(self, url):
+        """
+        Проверяет одну ссылку; результат (is_valid, status_code, final_url).
+        """
+        result = self.fetch(url)
+        return result["is_valid"], result["status_code"], result["final_url"]
+
+    def fetch_urls(self, urls):
+        """
+        Проверяет ссылки параллельно; полные результаты в порядке входного списка.
+        Ссылки с одинаковым каноническим URL запрашиваются один раз.
+        """
+        unique = {}
+        for url in urls:
+            unique.setdefault(self.cache_key(url), url)
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = dict(zip(unique, executor.map(self.fetch, unique.values())))
+        return [results[self.cache_key(url)] for url in urls]
+
+    def check_urls(self, urls):
+        """
+        Проверяет ссылки параллельно; результаты (is_valid, status_code, final_url) в порядке входного списка.
+        """
+        return [(result["is_valid"], result["status_code"], result["final_url"])
+                for result in self.fetch_urls(urls)]
+
+    def close(self):
+        self.session.close()
+        if self.cassette is not None:
+            self.cassette.save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
 
 # Функция для проверки всех ссылок
-def check_links(data):
+def check_links(data, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST, cache=None, mode="get",
+                cassette=None, timeout=DEFAULT_TIMEOUT, connect_timeout=DEFAULT_CONNECT_TIMEOUT, deadline=None):
     issues = []
 
-    for email in data['emails']:
-        for content in email['content']:
-            if content['type'] == 'link':
-                url = content['expected']
-                is_valid, status_code, final_url = check_url_status(url)
-
-                if not is_valid:
-                    issues.append({
-                        'selector': content['selector'],
-                        'url': url,
-                        'status_code': status_code,
-                        'final_url': final_url,
-                        'error': 'Ошибка при запросе' if status_code is None else f'Статус код: {status_code}'
-                    })
+    if isinstance(data, ContentStore):
+        links = list(data.records(("link",)))
+    else:
+        links = [content
+                 for email in data['emails']
+                 for content in email['content']
+                 if content['type'] == 'link']
+
+    with LinkChecker(concurrency, per_host, timeout, cache=cache, mode=mode, cassette=cassette,
+                     connect_timeout=connect_timeout, deadline=deadline) as checker:
+        results = checker.fetch_urls([content['expected'] for content in links])
+
+    for content, result in zip(links, results):
+        if not result['is_valid']:
+            issues.append(link_issue(content, result))
 
     return issues
 
-# Запуск проверки
+
+# Функция для описания проблемной ссылки в отчёте
+def link_issue(content, result):
+    if result.get('host_unreachable'):
+        error = 'Хост недоступен'
+    elif result.get('deadline_expired'):
+        error = 'Не проверена: истёк срок проверки'
+    elif result['status_code'] is None:
+        error = 'Ошибка при запросе'
+    else:
+        error = f"Статус код: {result['status_code']}"
+    return {
+        'selector': content['selector'],
+        'url': content['expected'],
+        'status_code': result['status_code'],
+        'final_url': result['final_url'],
+        'error': error
+    }
+
+# Запуск проверки (из корня проекта: python -m utils.link_checker)
 if __name__ == "__main__":
     # Путь к файлу actual_result.json
     actual_result_file = os.path.join(DATA_DIR, "actual_result.json")
@@ -48,8 +322,15 @@ if __name__ == "__main__":
     with open(actual_result_file, "r", encoding="utf-8") as file:
         actual_data = json.load(file)
 
-    # Проверка ссылок
-    issues = check_links(actual_data)
+    # Кассета: --record сохраняет результаты, --replay проверяет без сети, --refresh дозаписывает недостающие
+    from utils.cassette import LinkCassette
+    cassette_modes = [mode for mode in LinkCassette.MODES if f"--{mode}" in sys.argv[1:]]
+    cassette = LinkCassette(mode=cassette_modes[0]) if cassette_modes else None
+
+    # Проверка ссылок (результаты кэшируются в data/link_cache.sqlite); --probe — без скачивания тел
+    from utils.link_cache import LinkCache
+    mode = "probe" if "--probe" in sys.argv[1:] else "get"
+    issues = check_links(actual_data, cache=LinkCache(), mode=mode, cassette=cassette)
 
     if issues:
         print("Найдены проблемы с некоторыми ссылками:")
@@ -61,4 +342,4 @@ if __name__ == "__main__":
             print(f"Ошибка: {issue['error']}")
             print("-" * 30)
     else:
-        print("Все ссылки работают корректно.")
\ No newline at end of file
+        print("Все ссылки работают корректно.")
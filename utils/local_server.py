@@ -0,0 +1,290 @@
+import hashlib
+import socket
+import struct
+import threading
+import time
+import zlib
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик локального сервера-заглушки.
+
+    Маршруты:
+        /status/<код>     — ответ с указанным статус-кодом
+        /redirect/<n>     — цепочка из n редиректов 302, затем 200
+        /bytes/<n>        — тело ответа размером n байт
+        пути из files      — статические файлы-фикстуры (например, изображения)
+                             с ETag и Last-Modified; на If-None-Match /
+                             If-Modified-Since неизменённый файл отдаётся как 304
+        всё остальное      — 200 с коротким телом
+    Параметр ?delay=<мс> добавляет задержку перед ответом на любом маршруте,
+    ?nohead=1 заставляет отвечать 405 на HEAD (как серверы, не поддерживающие HEAD).
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.stats.connection_opened()
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        # Клиенты (probe, разрыв после заголовков) закрывают соединения без предупреждения
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_GET(self):
+        self.respond(send_body=True)
+
+    def do_HEAD(self):
+        self.respond(send_body=False)
+
+    def respond(self, send_body):
+        stats = self.server.stats
+        stats.request_started()
+        try:
+            parts = urlsplit(self.path)
+            query = parse_qs(parts.query)
+            delay = float(query.get("delay", ["0"])[0]) / 1000
+            if delay:
+                time.sleep(delay)
+            if not send_body and "nohead" in query:
+                status, headers, body = 405, {"Allow": "GET"}, b""
+            else:
+                status, headers, body = self.route(parts.path.strip("/").split("/"), parts.query)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if send_body:
+                # Пишем порциями: клиент может закрыть соединение сразу после заголовков
+                for start in range(0, len(body), 64 * 1024):
+                    self.wfile.write(body[start:start + 64 * 1024])
+                    stats.bytes_sent(len(body[start:start + 64 * 1024]))
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+        finally:
+            stats.request_finished()
+
+    def route(self, segments, query):
+        """
+        Возвращает (статус, заголовки, тело) для пути.
+        """
+        suffix = f"?{query}" if query else ""
+        path = "/" + "/".join(segments)
+        static = self.server.files.get(path)
+        if static is not None:
+            content_type, body = static
+            modified = int(self.server.file_times.get(path, self.server.started_at))
+            headers = {"Content-Type": content_type, "ETag": f'"{hashlib.sha1(body).hexdigest()}"',
+                       "Last-Modified": formatdate(modified, usegmt=True)}
+            if self.not_modified(headers["ETag"], modified):
+                return 304, headers, b""
+            return 200, headers, body
+        if len(segments) == 2 and segments[0] == "status" and segments[1].isdigit():
+            return int(segments[1]), {}, b"status"
+        if len(segments) == 2 and segments[0] == "redirect" and segments[1].isdigit():
+            hops = int(segments[1])
+            if hops > 0:
+                return 302, {"Location": f"/redirect/{hops - 1}{suffix}"}, b""
+            return 200, {}, b"landing"
+        if len(segments) == 2 and segments[0] == "bytes" and segments[1].isdigit():
+            return 200, {"Content-Type": "application/octet-stream"}, b"x" * int(segments[1])
+        return 200, {"Content-Type": "text/html"}, b"ok"
+
+    def not_modified(self, etag, modified):
+        """
+        Условный запрос к неизменённому файлу: If-None-Match важнее If-Modified-Since.
+        """
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(",")]
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is None:
+            return False
+        try:
+            return modified <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+
+
+def make_png(width, height, color=(255, 0, 0)):
+    """
+    Собирает PNG-изображение заданного размера, залитое одним цветом (фикстура для тестов).
+    """
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    row = b"\x00" + bytes(color) * width
+    return (b"\x89PNG\r\n\x1a\n"
+            + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(row * height))
+            + chunk(b"IEND", b""))
+
+
+class ServerStats:
+    """
+    Счётчики сервера: соединения, запросы, переданные байты и пик одновременных запросов.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.body_bytes = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def connection_opened(self):
+        with self._lock:
+            self.connections += 1
+
+    def request_started(self):
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def request_finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def bytes_sent(self, size):
+        with self._lock:
+            self.body_bytes += size
+
+
+class LocalServer:
+    """
+    Локальный HTTP-сервер-заглушка для тестов и бенчмарков проверки ссылок.
+
+        with LocalServer() as server:
+            check_url_status(server.url("/status/404"))
+    """
+
+    def __init__(self, handler_class=StandInHandler, host="127.0.0.1", port=0, files=None):
+        self.httpd = ThreadingHTTPServer((host, port), handler_class)
+        self.httpd.daemon_threads = True
+        self.httpd.stats = ServerStats()
+        # Статические файлы: {"/путь": (content-type, байты)} и время их изменения для Last-Modified
+        self.httpd.files = dict(files or {})
+        self.httpd.started_at = time.time()
+        self.httpd.file_times = {}
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def stats(self):
+        return self.httpd.stats
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path="/"):
+        return self.base_url + path
+
+    def put_file(self, path, content_type, body):
+        """
+        Добавляет или заменяет статический файл (меняются его ETag и Last-Modified).
+        """
+        self.httpd.files[path] = (content_type, body)
+        self.httpd.file_times[path] = time.time()
+
+    def reset_stats(self):
+        self.httpd.stats = ServerStats()
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class BlackHoleServer:
+    """
+    Адрес, который «глотает» соединения, — для проверки таймаутов и предохранителя.
+
+    В режиме "connect" очередь подключений слушающего сокета заполнена, а
+    соединения не принимаются: новые SYN отбрасываются, и клиент получает
+    таймаут подключения, как на заблокированном хосте. В режиме "read"
+    соединения принимаются, но ответ не отправляется никогда (таймаут чтения).
+
+        with BlackHoleServer() as server:
+            probe_url(server.url("/"), timeout=(1, 5))  # таймаут подключения через 1 с
+    """
+
+    MODES = ("connect", "read")
+
+    def __init__(self, mode="connect", host="127.0.0.1", port=0):
+        if mode not in self.MODES:
+            raise ValueError(f"Неизвестный режим сервера: {mode}")
+        self.mode = mode
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.connections = []
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.sock.getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    def url(self, path="/"):
+        return self.base_url + path
+
+    def start(self):
+        if self.mode == "connect":
+            self.sock.listen(0)
+            # Заполняем очередь собственными подключениями, которые никто не примет
+            for _ in range(4):
+                filler = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                filler.setblocking(False)
+                try:
+                    filler.connect(self.sock.getsockname())
+                except BlockingIOError:
+                    pass
+                self.connections.append(filler)
+            time.sleep(0.05)
+        else:
+            self.sock.listen(64)
+            self.thread = threading.Thread(target=self._hold, daemon=True)
+            self.thread.start()
+        return self
+
+    def _hold(self):
+        while True:
+            try:
+                connection, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections.append(connection)
+
+    def stop(self):
+        self.sock.close()
+        for connection in self.connections:
+            connection.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
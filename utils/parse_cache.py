@@ -0,0 +1,76 @@
+import hashlib
+import json
+import os
+import threading
+
+from pages.base_page import EmailProcessor
+from utils.incremental import file_digest
+from utils.selector_plans import plans_fingerprint
+
+# Абсолютный путь для данных
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DEFAULT_PARSE_CACHE_DIR = os.path.join(DATA_DIR, "parse_cache")
+
+
+class ParseCache:
+    """
+    Кэш извлечённых данных писем для тестовой сессии.
+
+    Каждое письмо парсится один раз: результат хранится в памяти процесса и на
+    диске (<каталог>/<aa>/<ключ>.json), поэтому параллельные воркеры pytest и
+    следующие сессии не парсят его заново. Ключ — хэш содержимого файла,
+    имени письма (по нему выбирается план), режима извлечения и отпечатка
+    плана селекторов, так что изменённое письмо или план дают новый ключ. На
+    диске хранится только content; имя, язык и путь документа заполняются при
+    каждом обращении, поэтому одинаковые файлы в разных папках языков не
+    получают чужие метаданные. Запись на диск атомарная (временный файл + os.replace).
+    """
+
+    def __init__(self, path=DEFAULT_PARSE_CACHE_DIR, mode="soup", version=None):
+        self.path = path
+        self.mode = mode
+        self.version = version or plans_fingerprint()
+        self.parsed = 0
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    def key(self, file_path):
+        name = os.path.splitext(os.path.basename(file_path))[0]
+        payload = f"{file_digest(file_path)}|{name}|{self.mode}|{self.version}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.path, key[:2], f"{key}.json")
+
+    def get(self, document, emails_dir, language):
+        """
+        Извлечённое письмо {"id", "name", "language", "document", "content"} или None при ошибке.
+        """
+        file_path = os.path.abspath(os.path.join(emails_dir, document))
+        with self._lock:
+            if (file_path, language) in self._memory:
+                return self._memory[(file_path, language)]
+
+        key = self.key(file_path)
+        disk_path = self._disk_path(key)
+        email = None
+        if os.path.exists(disk_path):
+            with open(disk_path, "r", encoding="utf-8") as f:
+                content = json.load(f)["content"]
+            email = {"id": "1", "name": os.path.splitext(os.path.basename(document))[0], "language": language,
+                     "document": os.path.join(emails_dir, document), "content": content}
+        else:
+            email_data = EmailProcessor(document, self.mode, emails_dir, language).extract()
+            if email_data:
+                email = email_data["emails"][0]
+                self.parsed += 1
+                os.makedirs(os.path.dirname(disk_path), exist_ok=True)
+                temp_path = f"{disk_path}.{os.getpid()}.tmp"
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump({"content": email["content"]}, f, ensure_ascii=False)
+                os.replace(temp_path, disk_path)
+
+        with self._lock:
+            self._memory[(file_path, language)] = email
+        return email
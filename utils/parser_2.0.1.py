@@ -1,8 +1,12 @@
 import os
+import sys
 import json
-import re
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.extractor import extract_content
+from utils.selector_plans import extractor_for
+
 class DataSaver:
     """
     Класс для сохранения данных в JSON.
@@ -57,24 +61,10 @@ class EmailProcessor:
 
     def extract_email_data(self, soup):
         """
-        Извлекает ссылки, изображения и текст из HTML.
+        Извлекает ссылки, изображения и текст из HTML за один проход по дереву
+        по плану селекторов из data/selectors.json.
         """
-        content = []
-        link_pattern = re.compile(r'^(?:[hbf]-link-\d+|f-social-link-\d+)$')
-        img_pattern = re.compile(r'^[hbf]-img-\d+$')
-        text_pattern = re.compile(r'^[hbf]-text-\d+$')
-
-        # Извлекаем ссылки
-        for link in soup.find_all("a", id=link_pattern):
-            content.append({"selector": link.get("id"), "type": "link", "expected": link.get("href")})
-
-        # Извлекаем изображения
-        for img in soup.find_all("img", id=img_pattern):
-            content.append({"selector": img.get("id"), "type": "image", "expected": img.get("src")})
-
-        # Извлекаем текст
-        for text_element in soup.find_all(id=text_pattern):
-            content.append({"selector": text_element.get("id"), "type": "text", "expected": text_element.get_text(strip=True)})
+        content = extract_content(soup, extractor_for(os.path.splitext(self.email_filename)[0]))
 
         return {
             "emails": [{
@@ -0,0 +1,332 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+
+from pages.base_page import EmailPage, DataSaver, EMAILS_DIR, DATA_DIR
+from utils.comparator import ContentComparator
+from utils.corpus import find_emails, detect_language, index_expected
+from utils.link_checker import LinkChecker, link_issue
+from utils.profiling import PROFILER
+from utils.stream_extractor import DEFAULT_CHUNK_SIZE
+
+# Ёмкость очередей между стадиями: извлечение ждёт, если проверка ссылок или сравнение отстают
+DEFAULT_QUEUE_SIZE = 256
+
+# Признак конца потока в очереди стадии
+_DONE = object()
+
+
+class EmailPipeline:
+    """
+    Конвейер извлечение → проверка ссылок → сравнение для корпуса писем.
+
+    Извлечение идёт в вызывающем потоке и отдаёт записи content генератором
+    (EmailPage.iter_records): каждая новая ссылка сразу попадает в ограниченную
+    очередь, которую разбирают потоки проверки LinkChecker, так что сетевые
+    ожидания идут параллельно с разбором следующих элементов и писем. Готовое
+    письмо уходит в очередь сравнения и сравнивается с ожидаемыми данными из
+    индекса в памяти. Промежуточных файлов нет; с sink (JsonlResultStore)
+    письма дописываются по мере сравнения. Общее время корпуса стремится к
+    max(разбор, сеть), а не к их сумме.
+
+    С sections (SectionCache) шапка, тело и подвал письма разбираются и
+    сравниваются только при первой встрече за прогон: общие для шаблонов
+    секции берутся из кэша по хэшу их HTML и ожидаемых данных.
+
+    С images (ImageChecker) изображения письма скачиваются после сравнения
+    и проверяются по отпечаткам "asset" ожидаемых данных (image_issues).
+    """
+
+    def __init__(self, emails_dir=EMAILS_DIR, expected_file=os.path.join(DATA_DIR, "expected_result.json"),
+                 mode="stream", checker=None, comparator=None, types=None, sink=None,
+                 queue_size=DEFAULT_QUEUE_SIZE, chunk_size=DEFAULT_CHUNK_SIZE, report=None, sections=None,
+                 images=None):
+        self.emails_dir = emails_dir
+        self.expected_file = expected_file
+        self.mode = mode
+        self.checker = checker
+        self.comparator = comparator or ContentComparator()
+        self.types = types
+        self.sink = sink
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self.report = report
+        self.sections = sections
+        self.images = images
+        self.link_results = {}
+        # Начало и конец проверки каждой ссылки (time.time()): {ключ ссылки: (start, stop)}
+        self.link_times = {}
+        self._errors = []
+        self._lock = threading.Lock()
+        # Письма, ждущие ссылок: {позиция: непроверенные ключи}, {ключ: позиции}
+        self._pending = {}
+        self._waiters = {}
+        self._compared = set()
+
+    def _link_key(self, url):
+        return self.checker.cache_key(url)
+
+    def _link_worker(self, links, results):
+        while True:
+            url = links.get()
+            if url is _DONE:
+                return
+            try:
+                key = self._link_key(url)
+                started = time.time()
+                link_result = self.checker.fetch(url)
+                ready = []
+                with self._lock:
+                    self.link_results[key] = link_result
+                    self.link_times[key] = (started, time.time())
+                    for position in self._waiters.pop(key, []):
+                        pending = self._pending[position]
+                        pending.discard(key)
+                        if not pending and position in self._compared:
+                            ready.append(position)
+                for position in ready:
+                    self._finish(results[position])
+            except Exception as e:
+                self._errors.append(e)
+
+    def _compare_worker(self, emails, expected_index, results):
+        email_count = 0
+        while True:
+            item = emails.get()
+            if item is _DONE:
+                return
+            position, email, digests = item
+            try:
+                result = results[position]
+                started = time.time()
+                expected = expected_index.get((email["name"], email["language"]))
+                if expected is None:
+                    result["status"] = "no_expected"
+                elif digests is not None:
+                    result["differences"] = self.sections.compare(
+                        self.comparator, dict(email, content=self._filter(email["content"])),
+                        self._filter(expected.get("content", [])), digests)
+                else:
+                    result["differences"] = self.comparator.compare_content(
+                        self._filter(email["content"]), self._filter(expected.get("content", [])), email["name"])
+                if expected is not None:
+                    result["status"] = "failed" if result["differences"] else "passed"
+                result["timings"]["compare"] = (started, time.time())
+                if self.images is not None:
+                    started = time.time()
+                    result["image_issues"] = self.images.check_images(
+                        {"emails": [email]}, {"emails": [expected]} if expected is not None else None)
+                    result["timings"]["images"] = (started, time.time())
+                email_count += 1
+                email["id"] = str(email_count)
+                if self.sink is not None:
+                    self.sink.append(email)
+                with self._lock:
+                    self._compared.add(position)
+                    ready = not self._pending.get(position)
+                if ready:
+                    self._finish(result)
+            except Exception as e:
+                self._errors.append(e)
+
+    def _filter(self, content):
+        if self.types is None:
+            return content
+        return [item for item in content if item.get("type") in self.types]
+
+    def _finish(self, result):
+        """
+        Письмо сравнено, и все его ссылки проверены: собирает итог и передаёт его в report.
+        """
+        if self.checker is not None:
+            result["links"] = self.email_links(result["email"])
+            result["link_issues"] = [link_issue(link, link) for link in result["links"] if not link["is_valid"]]
+        if self.report is not None:
+            self.report(result)
+
+    def extract(self, relative_path, links, seen):
+        """
+        Извлекает письмо; каждая ещё не встречавшаяся ссылка сразу ставится в очередь проверки.
+        Возвращает (письмо, ключи секций для SectionCache или None).
+        """
+        page = EmailPage(relative_path, self.emails_dir, detect_language(relative_path))
+        with PROFILER.email(relative_path):
+            extracted = self.sections.extract(page) if self.sections is not None else None
+            if extracted is not None:
+                content, digests = extracted
+                for item in content:
+                    self._queue_link(item, links, seen)
+                return page.build_email_data(content)["emails"][0], digests
+
+            records = []
+            for record in page.iter_records(self.mode, self.chunk_size):
+                records.append(record)
+                self._queue_link(record[2], links, seen)
+        records.sort(key=lambda item: item[:2])
+        return page.build_email_data([content for _, _, content in records])["emails"][0], None
+
+    def _queue_link(self, content, links, seen):
+        if links is not None and content["type"] == "link" and content["expected"]:
+            key = self._link_key(content["expected"])
+            if key not in seen:
+                seen.add(key)
+                links.put(content["expected"])
+
+    def _wait_for_links(self, position, email):
+        """
+        Запоминает ссылки письма, которые ещё проверяются.
+        """
+        if self.checker is None:
+            return
+        keys = {self._link_key(content["expected"]) for content in email["content"]
+                if content["type"] == "link" and content["expected"]}
+        with self._lock:
+            pending = {key for key in keys if key not in self.link_results}
+            self._pending[position] = pending
+            for key in pending:
+                self._waiters.setdefault(key, []).append(position)
+
+    def run(self, paths=None):
+        """
+        Обрабатывает корпус (или письма paths относительно папки писем); возвращает
+        (документ {"emails": [...]}, вердикты по письмам).
+        Вердикт: {"document", "email", "status", "differences", "link_issues", "image_issues", "links",
+        "timings"};
+        report получает каждый вердикт, как только письмо сравнено и его ссылки проверены.
+        """
+        expected_index = {}
+        if self.expected_file and os.path.exists(self.expected_file):
+            with open(self.expected_file, "r", encoding="utf-8") as f:
+                expected_index = index_expected(json.load(f))
+
+        paths = paths or find_emails(self.emails_dir)
+        results = [{"document": path, "email": None, "status": "error", "differences": [], "link_issues": [],
+                    "image_issues": [], "links": [], "timings": {}}
+                   for path in paths]
+        self.link_results = {}
+        self.link_times = {}
+        self._errors = []
+        self._pending = {}
+        self._waiters = {}
+        self._compared = set()
+
+        links = queue.Queue(self.queue_size) if self.checker is not None else None
+        emails = queue.Queue(self.queue_size)
+        workers = [threading.Thread(target=self._compare_worker, args=(emails, expected_index, results),
+                                    daemon=True)]
+        if links is not None:
+            workers += [threading.Thread(target=self._link_worker, args=(links, results), daemon=True)
+                        for _ in range(self.checker.concurrency)]
+        for worker in workers:
+            worker.start()
+
+        seen = set()
+        try:
+            for position, path in enumerate(paths):
+                started = time.time()
+                try:
+                    email, digests = self.extract(path, links, seen)
+                except Exception as e:
+                    print(f"❌ Ошибка при обработке {path}: {e}")
+                    results[position]["timings"]["extract"] = (started, time.time())
+                    if self.report is not None:
+                        self.report(results[position])
+                    continue
+                results[position]["timings"]["extract"] = (started, time.time())
+                results[position]["email"] = email
+                self._wait_for_links(position, email)
+                emails.put((position, email, digests))
+        finally:
+            emails.put(_DONE)
+            if links is not None:
+                for _ in range(self.checker.concurrency):
+                    links.put(_DONE)
+            for worker in workers:
+                worker.join()
+        if self.sink is not None:
+            self.sink.close()
+        if self._errors:
+            raise self._errors[0]
+        return {"emails": [result["email"] for result in results if result["email"] is not None]}, results
+
+    def email_links(self, email):
+        """
+        Результаты проверки ссылок письма: {"selector", "expected", "is_valid", "status_code",
+        "final_url", "redirects", "start", "stop", ...} в порядке content.
+        """
+        links = []
+        for content in email["content"]:
+            if content["type"] != "link" or not content["expected"]:
+                continue
+            key = self._link_key(content["expected"])
+            start, stop = self.link_times[key]
+            link = dict(self.link_results[key], selector=content["selector"], expected=content["expected"],
+                        start=start, stop=stop)
+            link.pop("headers", None)
+            links.append(link)
+        return links
+
+def print_result(result):
+    image_issues = result.get("image_issues", [])
+    if result["status"] == "passed" and not result["link_issues"] and not image_issues:
+        print(f"✅ {result['document']}")
+    elif result["status"] == "no_expected":
+        print(f"⚠️ {result['document']}: нет ожидаемого результата")
+    elif result["status"] == "error":
+        print(f"❌ {result['document']}: ошибка обработки")
+    else:
+        print(f"❌ {result['document']}: различий {len(result['differences'])}, "
+              f"проблемных ссылок {len(result['link_issues'])}, проблемных изображений {len(image_issues)}")
+        for diff in result["differences"]:
+            print(f"   🔹 {diff['selector']} ({diff['status']}): {diff['actual']!r} != {diff['expected']!r}")
+        for issue in result["link_issues"]:
+            print(f"   🔗 {issue['selector']}: {issue['url']} ({issue['error']})")
+        for issue in image_issues:
+            print(f"   🖼 {issue['selector']}: {issue['url']} ({'; '.join(issue['errors'])})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Конвейерная проверка всех писем: извлечение, ссылки, сравнение")
+    parser.add_argument("--emails-dir", default=EMAILS_DIR)
+    parser.add_argument("--expected-file", default=os.path.join(DATA_DIR, "expected_result.json"))
+    parser.add_argument("--mode", choices=("soup", "stream"), default="stream")
+    parser.add_argument("--no-links", action="store_true", help="не проверять ссылки")
+    parser.add_argument("--output", default=None, help="сохранить извлечённые данные в data/<файл>")
+    parser.add_argument("--allure", default=None, metavar="DIR", help="писать результаты Allure в каталог")
+    parser.add_argument("--sections", action="store_true",
+                        help="разбирать и сравнивать общие шапки и подвалы один раз за прогон")
+    parser.add_argument("--images", action="store_true", help="скачивать и проверять изображения")
+    args = parser.parse_args()
+
+    from utils.allure_report import AllureWriter
+    from utils.image_checker import ImageAssetCache, ImageChecker
+    from utils.link_cache import LinkCache
+    from utils.sections import SectionCache
+    sections = SectionCache() if args.sections else None
+    images = ImageChecker(cache=ImageAssetCache()) if args.images else None
+    checker = None if args.no_links else LinkChecker(cache=LinkCache())
+    writer = AllureWriter(args.allure).start() if args.allure else None
+    started = time.perf_counter()
+    try:
+        corpus_data, results = EmailPipeline(args.emails_dir, args.expected_file, args.mode, checker,
+                                             report=writer.write if writer else None, sections=sections,
+                                             images=images).run()
+    finally:
+        if checker is not None:
+            checker.close()
+        if images is not None:
+            images.close()
+        if writer is not None:
+            writer.close()
+    elapsed = time.perf_counter() - started
+    if args.output:
+        DataSaver().save_to_json(corpus_data, args.output)
+
+    for result in results:
+        print_result(result)
+    print(f"Писем: {len(results)}, время: {elapsed:.2f} с")
+    if sections is not None:
+        print(f"Секции: {sections.summary()}")
@@ -0,0 +1,248 @@
+import atexit
+import functools
+import json
+import marshal
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# cProfile и tracemalloc импортируются только при включении профилирования
+cProfile = None
+tracemalloc = None
+
+# Абсолютный путь для данных
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DEFAULT_REPORT_FILE = os.path.join(DATA_DIR, "profile_report.json")
+DEFAULT_CPROFILE_FILE = os.path.join(DATA_DIR, "slowest_email.prof")
+
+# Переменная окружения: EMAIL_PROFILE=1 (время), =memory (+ tracemalloc), =full (+ cProfile)
+PROFILE_ENV = "EMAIL_PROFILE"
+
+
+class StageProfiler:
+    """
+    Замеры стадий обработки: wall time, CPU time потока и (по желанию) пик памяти
+    tracemalloc — по каждой стадии и по каждому письму.
+
+    По умолчанию выключен: обёрнутая функция делает одну проверку флага и
+    вызывается напрямую. Включается enable() или переменной окружения EMAIL_PROFILE.
+
+    Пик tracemalloc один на процесс, поэтому пики памяти замеряются только в
+    главном потоке; стадии в потоках пула (проверка ссылок) записываются без
+    пика и без письма (email=None). Пока в пуле идут запросы, пик стадии
+    главного потока включает и их выделения: точны пики только однопоточного
+    прогона. Профиль cProfile самого медленного письма хранится в памяти,
+    приходит из рабочих процессов через drain()/merge() и записывается один
+    раз в write_report().
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.memory = False
+        self.cprofile = False
+        self.report_path = DEFAULT_REPORT_FILE
+        self.cprofile_path = DEFAULT_CPROFILE_FILE
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        # {(письмо, стадия): [вызовы, wall, cpu, пик памяти]}
+        self.records = {}
+        self.slowest_email = None
+        self.slowest_time = 0.0
+        # Статистика cProfile самого медленного письма (ещё не переданная или не записанная)
+        self.slowest_stats = None
+
+    def enable(self, memory=False, cprofile=False, report_path=DEFAULT_REPORT_FILE,
+               cprofile_path=DEFAULT_CPROFILE_FILE):
+        global cProfile, tracemalloc
+        import cProfile
+        import tracemalloc
+        self.enabled = True
+        self.memory = memory
+        self.cprofile = cprofile
+        self.report_path = report_path
+        self.cprofile_path = cprofile_path
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        self.enabled = False
+        if self.memory and tracemalloc is not None and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    @property
+    def current_email(self):
+        return getattr(self._local, "email", None)
+
+    def record(self, email, stage, wall, cpu, peak=0):
+        with self._lock:
+            entry = self.records.setdefault((email, stage), [0, 0.0, 0.0, 0])
+            entry[0] += 1
+            entry[1] += wall
+            entry[2] += cpu
+            entry[3] = max(entry[3], peak)
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Замер одной стадии для текущего письма.
+        """
+        if not self.enabled:
+            yield
+            return
+        memory = self.memory and threading.current_thread() is threading.main_thread()
+        if memory:
+            # Пик tracemalloc один на процесс: перед вложенной стадией он сбрасывается,
+            # а уже набранный пик внешней стадии хранится в стеке
+            peaks = self._local.__dict__.setdefault("peaks", [])
+            if peaks:
+                peaks[-1] = max(peaks[-1], tracemalloc.get_traced_memory()[1])
+            peaks.append(0)
+            tracemalloc.reset_peak()
+        wall_started = time.perf_counter()
+        cpu_started = time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_started
+            cpu = time.thread_time() - cpu_started
+            peak = 0
+            if memory:
+                peaks = self._local.peaks
+                peak = max(peaks.pop(), tracemalloc.get_traced_memory()[1])
+                if peaks:
+                    peaks[-1] = max(peaks[-1], peak)
+            self.record(self.current_email, name, wall, cpu, peak)
+
+    @contextmanager
+    def email(self, name):
+        """
+        Контекст обработки письма: стадии внутри относятся к нему; при cprofile
+        запоминается профиль самого медленного письма.
+        """
+        if not self.enabled:
+            yield
+            return
+        previous = self.current_email
+        self._local.email = name
+        profile = cProfile.Profile() if self.cprofile else None
+        started = time.perf_counter()
+        if profile is not None:
+            profile.enable()
+        try:
+            with self.stage("email"):
+                yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            elapsed = time.perf_counter() - started
+            self._local.email = previous
+            if profile is not None:
+                profile.create_stats()
+            with self._lock:
+                if elapsed > self.slowest_time:
+                    self.slowest_email, self.slowest_time = name, elapsed
+                    self.slowest_stats = profile.stats if profile is not None else None
+
+    def drain(self):
+        """
+        Забирает накопленные записи (для передачи из рабочего процесса в основной).
+        Самое медленное письмо процесса остаётся: его профиль передаётся один раз,
+        пока более медленное письмо не заменит его.
+        """
+        with self._lock:
+            records = [[email, stage] + values for (email, stage), values in self.records.items()]
+            slowest = [self.slowest_email, self.slowest_time, self.slowest_stats]
+            self.records = {}
+            self.slowest_stats = None
+        return {"records": records, "slowest": slowest}
+
+    def merge(self, drained):
+        """
+        Добавляет записи, полученные drain() в другом процессе.
+        """
+        for email, stage, calls, wall, cpu, peak in drained["records"]:
+            with self._lock:
+                entry = self.records.setdefault((email, stage), [0, 0.0, 0.0, 0])
+                entry[0] += calls
+                entry[1] += wall
+                entry[2] += cpu
+                entry[3] = max(entry[3], peak)
+        email, elapsed, stats = drained["slowest"]
+        with self._lock:
+            if email is not None and elapsed > self.slowest_time:
+                self.slowest_email, self.slowest_time, self.slowest_stats = email, elapsed, stats
+
+    def report(self):
+        """
+        Отчёт: итоги по стадиям и разбивка по письмам.
+        """
+        stages = {}
+        emails = {}
+        with self._lock:
+            items = list(self.records.items())
+        for (email, stage), (calls, wall, cpu, peak) in items:
+            total = stages.setdefault(stage, {"calls": 0, "wall": 0.0, "cpu": 0.0, "peak_memory": 0})
+            total["calls"] += calls
+            total["wall"] += wall
+            total["cpu"] += cpu
+            total["peak_memory"] = max(total["peak_memory"], peak)
+            if email is not None:
+                emails.setdefault(email, {})[stage] = {"calls": calls, "wall": wall, "cpu": cpu,
+                                                       "peak_memory": peak}
+        return {
+            "stages": dict(sorted(stages.items(), key=lambda item: -item[1]["wall"])),
+            "emails": emails,
+            "slowest_email": {"email": self.slowest_email, "wall": self.slowest_time,
+                              "cprofile": self.cprofile_path if self.slowest_stats is not None else None},
+        }
+
+    def write_report(self, path=None):
+        """
+        Записывает отчёт о замерах в JSON и профиль самого медленного письма в cprofile_path.
+        """
+        path = path or self.report_path
+        with self._lock:
+            stats = self.slowest_stats
+        if stats is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.cprofile_path)), exist_ok=True)
+            # Формат файла тот же, что у cProfile.Profile.dump_stats (читается pstats и snakeviz)
+            with open(self.cprofile_path, "wb") as f:
+                marshal.dump(stats, f)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=4)
+        return path
+
+
+PROFILER = StageProfiler()
+
+
+def profiled(stage):
+    """
+    Декоратор стадии: при выключенном профилировании вызывает функцию напрямую.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with PROFILER.stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _enable_from_environment():
+    mode = os.environ.get(PROFILE_ENV, "").strip().lower()
+    if not mode or mode in ("0", "false", "no"):
+        return
+    PROFILER.enable(memory=mode in ("memory", "full"), cprofile=mode == "full")
+    atexit.register(PROFILER.write_report)
+
+
+_enable_from_environment()
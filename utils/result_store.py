@@ -0,0 +1,189 @@
+import gzip
+import json
+import os
+
+# Абсолютный путь для данных
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DEFAULT_STORE_DIR = os.path.join(DATA_DIR, "results")
+
+# Писем в одном файле-шарде
+DEFAULT_SHARD_SIZE = 1000
+INDEX_FILE = "index.json"
+
+
+class JsonlResultStore:
+    """
+    Хранилище результатов в формате JSON Lines: по одной строке-записи на письмо,
+    записи разложены по шардам shard-00000.jsonl[.gz] по shard_size писем.
+
+    Письма дописываются по мере готовности (append), читаются лениво
+    генератором (iter_emails), а файл index.json связывает id письма с шардом,
+    смещением и длиной записи, так что get(id) читает одну запись без
+    просмотра шарда. При compress каждая запись сжимается отдельным gzip-членом:
+    шард остаётся обычным .gz-файлом, а запись по-прежнему читается по смещению.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_DIR, shard_size=DEFAULT_SHARD_SIZE, compress=False):
+        self.path = path
+        self.shard_size = shard_size
+        self.compress = compress
+        self.shards = []
+        self.index = {}
+        self._file = None
+        self._shard_count = 0
+        index_path = os.path.join(path, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            self.shard_size = saved["shard_size"]
+            self.compress = saved["compress"]
+            self.shards = saved["shards"]
+            self.index = saved["emails"]
+            if self.shards:
+                self._shard_count = sum(1 for shard, _, _ in self.index.values() if shard == len(self.shards) - 1)
+
+    @classmethod
+    def create(cls, path=DEFAULT_STORE_DIR, shard_size=DEFAULT_SHARD_SIZE, compress=False):
+        """
+        Новое пустое хранилище: прежние шарды и индекс в каталоге удаляются.
+        """
+        cls(path).clear()
+        return cls(path, shard_size, compress)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, email_id):
+        return str(email_id) in self.index
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _shard_path(self, shard):
+        return os.path.join(self.path, self.shards[shard])
+
+    def _open_shard(self):
+        """
+        Открывает последний шард на дозапись или начинает новый, если он заполнен.
+        """
+        if not self.shards or self._shard_count >= self.shard_size:
+            self.close()
+            self.shards.append(f"shard-{len(self.shards):05d}.jsonl" + (".gz" if self.compress else ""))
+            self._shard_count = 0
+        if self._file is None:
+            os.makedirs(self.path, exist_ok=True)
+            self._file = open(self._shard_path(len(self.shards) - 1), "ab")
+        return self._file
+
+    def append(self, email):
+        """
+        Дописывает запись письма и возвращает его id.
+        """
+        line = (json.dumps(email, ensure_ascii=False) + "\n").encode("utf-8")
+        if self.compress:
+            line = gzip.compress(line)
+        f = self._open_shard()
+        offset = f.tell()
+        f.write(line)
+        self._shard_count += 1
+        email_id = str(email.get("id", len(self.index) + 1))
+        self.index[email_id] = [len(self.shards) - 1, offset, len(line)]
+        return email_id
+
+    def extend(self, emails):
+        for email in emails:
+            self.append(email)
+
+    def get(self, email_id):
+        """
+        Запись письма по id (одно чтение по смещению из индекса) или None.
+        """
+        location = self.index.get(str(email_id))
+        if location is None:
+            return None
+        shard, offset, length = location
+        if self._file is not None and shard == len(self.shards) - 1:
+            self._file.flush()
+        with open(self._shard_path(shard), "rb") as f:
+            f.seek(offset)
+            data = f.read(length)
+        if self.compress:
+            data = gzip.decompress(data)
+        return json.loads(data)
+
+    def iter_emails(self):
+        """
+        Генератор записей писем по всем шардам в порядке записи.
+        """
+        if self._file is not None:
+            self._file.flush()
+        for shard in range(len(self.shards)):
+            opener = gzip.open if self.compress else open
+            with opener(self._shard_path(shard), "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def save_index(self):
+        os.makedirs(self.path, exist_ok=True)
+        index_path = os.path.join(self.path, INDEX_FILE)
+        temp_path = index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"shard_size": self.shard_size, "compress": self.compress, "shards": self.shards,
+                       "emails": self.index}, f, ensure_ascii=False)
+        os.replace(temp_path, index_path)
+
+    def close(self):
+        """
+        Закрывает текущий шард и сохраняет индекс.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.save_index()
+
+    def clear(self):
+        """
+        Удаляет все шарды и индекс.
+        """
+        self.close()
+        for name in self.shards + [INDEX_FILE]:
+            file_path = os.path.join(self.path, name)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        self.shards = []
+        self.index = {}
+        self._shard_count = 0
+
+    def import_json(self, file_path):
+        """
+        Импортирует письма из одного JSON-файла {"emails": [...]}.
+        """
+        with open(file_path, "r", encoding="utf-8") as f:
+            self.extend(json.load(f).get("emails", []))
+        self.close()
+
+    def export_json(self, file_path):
+        """
+        Экспортирует письма в один JSON-файл {"emails": [...]}, не загружая их все в память.
+        """
+        with open(file_path, "w", encoding="utf-8") as f:
+            f.write('{\n    "emails": [')
+            for position, email in enumerate(self.iter_emails()):
+                f.write(",\n        " if position else "\n        ")
+                f.write(json.dumps(email, ensure_ascii=False))
+            f.write("\n    ]\n}\n")
+
+
+def load_results(path):
+    """
+    Загружает результаты из JSON-файла или из каталога JsonlResultStore.
+    """
+    if os.path.isdir(path):
+        return {"emails": list(JsonlResultStore(path).iter_emails())}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
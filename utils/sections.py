@@ -0,0 +1,219 @@
+import hashlib
+import re
+
+from utils.incremental import data_digest
+from utils.selector_plans import extractor_for
+from utils.stream_extractor import StreamingExtractor
+
+# Секции письма по префиксу id элемента: шапка h-, тело b-, подвал f- (включая f-social-)
+SECTION_PREFIXES = ("h", "b", "f")
+
+# Атрибут id элемента секции (начало тега ищется от него назад: так регулярное выражение
+# начинается с литерала и проверяется быстро)
+_SECTION_ID = re.compile(rb'id\s*=\s*["\']?([hbf])-')
+# Участки, где id не может открыть элемент: комментарии и тела script/style (html.parser читает их как текст)
+_OPAQUE = re.compile(rb"<!--.*?-->|<(script|style)\b[^>]*>.*?</\1\s*>", re.DOTALL | re.IGNORECASE)
+_ATTRIBUTES = rb'(?:\s+[^\s=>"\'/]+(?:\s*=\s*(?:"[^"]*"|\'[^\']*\'|[^\s>"\']+))?)*'
+# Начало открывающего тега до атрибута id и целый предыдущий тег
+_TAG_START = re.compile(rb'<[a-zA-Z][^\s/>]*' + _ATTRIBUTES + rb'\s+')
+_TAG = re.compile(rb'<[a-zA-Z][^\s/>]*' + _ATTRIBUTES + rb'\s*/?>|</[a-zA-Z][^\s>]*\s*>|<![^>]*>')
+
+
+def section_of(selector):
+    """
+    Секция элемента по его селектору ("h", "b", "f") или None.
+    """
+    if selector and len(selector) > 1 and selector[1] == "-" and selector[0] in SECTION_PREFIXES:
+        return selector[0]
+    return None
+
+
+def split_sections(html):
+    """
+    Делит HTML (bytes) на части [(секция, начало, конец)], покрывающие весь документ.
+
+    Секция начинается с первого тега с id её префикса и длится до начала
+    следующей секции, последняя — до конца документа; всё, что до первой
+    секции, — преамбула (секция None). id в комментариях, телах script/style
+    и внутри значений атрибутов границ не дают. Если элементы секций
+    перемешаны (префикс встречается двумя отдельными участками) или не ясно,
+    тег ли перед id (предыдущий тег не разбирается, например из-за ">" в
+    значении атрибута), возвращает None.
+    """
+    opaque = [match.span() for match in _OPAQUE.finditer(html)]
+    runs = []
+    for match in _SECTION_ID.finditer(html):
+        section = match.group(1).decode("ascii")
+        if runs and runs[-1][0] == section:
+            continue
+        tag_start = html.rfind(b"<", 0, match.start())
+        if (tag_start < 0 or not _TAG_START.fullmatch(html, tag_start, match.start())
+                or any(start <= match.start() < stop for start, stop in opaque)):
+            continue
+        # Тег перед найденным должен быть закрыт и разбираться целиком: иначе "<" может
+        # оказаться внутри значения его атрибута
+        previous_start = html.rfind(b"<", 0, tag_start)
+        if previous_start >= 0 and not any(start <= previous_start < stop for start, stop in opaque):
+            previous_end = html.find(b">", previous_start, tag_start)
+            if previous_end < 0 or not _TAG.fullmatch(html, previous_start, previous_end + 1):
+                return None
+        if any(run[0] == section for run in runs):
+            return None
+        runs.append((section, tag_start))
+
+    parts = [(None, 0, runs[0][1] if runs else len(html))]
+    for index, (section, start) in enumerate(runs):
+        parts.append((section, start, runs[index + 1][1] if index + 1 < len(runs) else len(html)))
+    return parts
+
+
+class SectionExtractor(StreamingExtractor):
+    """
+    Потоковое извлечение одной части документа (см. split_sections).
+
+    Теги, открытые до начала части, на стеке отсутствуют. Закрывающий тег без
+    пары в части закрывает всё, что в ней открыто (в целом документе он закрыл
+    бы внешний тег вместе с ними). Если при этом, или в конце части, открыт
+    текстовый элемент, его текст зависит от соседней части, и результат
+    помечается ненадёжным (unsafe).
+    """
+
+    def __init__(self, rules):
+        super().__init__(rules)
+        self.unsafe = False
+
+    def handle_endtag(self, name, check_already_closed=True):
+        if check_already_closed and name in self.already_closed_empty_element:
+            super().handle_endtag(name, check_already_closed)
+            return
+        if any(tag[0] == name for tag in self.open_tags):
+            super().handle_endtag(name, check_already_closed)
+            return
+        if self.open_texts:
+            self.unsafe = True
+        self.end_data()
+        while self.open_tags:
+            self.pop_tag()
+
+    def extract(self, text, last=False):
+        """
+        Возвращает [(индекс правила, номер, запись)] части; None, если результат ненадёжен.
+        """
+        self.feed(text)
+        if self.open_texts and not last:
+            self.unsafe = True
+        self.close()
+        ready = self.drain()
+        return None if self.unsafe else ready
+
+
+class SectionCache:
+    """
+    Проверка писем по секциям (шапка, тело, подвал) с переиспользованием результатов за прогон.
+
+    Документ делится на секции по префиксам id (split_sections), и каждая
+    часть хэшируется (SHA-256 байтов HTML). Часть с уже встречавшимся хэшем
+    не разбирается: берутся записи content, извлечённые из неё раньше.
+    Вердикт сравнения секции хранится по ключу (план, секция, хэш HTML, хэш
+    ожидаемых элементов этой секции) и переиспользуется для всех писем с той
+    же шапкой или подвалом. Ссылки общей секции проверяются один раз и так
+    (конвейер не ставит в очередь уже встречавшиеся URL). Так время прогона
+    растёт с числом уникальных секций, а не писем.
+
+    Части разбираются потоково (StreamingExtractor); письма с CSS-правилами,
+    перемешанными секциями или элементами, пересекающими границу секций,
+    обрабатываются целиком, как раньше (extract возвращает None).
+    Записи хранятся в одном потоке извлечения, вердикты — в одном потоке
+    сравнения, поэтому блокировок не нужно.
+    """
+
+    def __init__(self):
+        self.records = {}
+        self.verdicts = {}
+        self.parsed = 0
+        self.reused = 0
+        self.compared = 0
+        self.verdicts_reused = 0
+        self.fallbacks = 0
+
+    def extract(self, page):
+        """
+        Возвращает (content письма, {секция: ключ её HTML}) или None, если письмо нужно разобрать целиком.
+        """
+        extractor = extractor_for(page.email_name, page.selectors_file)
+        if page.needs_tree(extractor):
+            self.fallbacks += 1
+            return None
+        with open(page.email_path, "rb") as f:
+            # Переводы строк как при чтении в текстовом режиме (load_html, потоковый режим)
+            html = f.read().replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        parts = split_sections(html)
+        if parts is None:
+            self.fallbacks += 1
+            return None
+
+        records = []
+        digests = {}
+        for number, (section, start, stop) in enumerate(parts):
+            digest = hashlib.sha256(html[start:stop]).hexdigest()
+            key = (extractor.fingerprint, section, digest)
+            if key in self.records:
+                part = self.records[key]
+                self.reused += 1
+            else:
+                part = self.records[key] = self._extract_part(extractor.rules, html[start:stop], section,
+                                                              stop == len(html))
+                self.parsed += 1
+            if part is None:
+                self.fallbacks += 1
+                return None
+            if section is not None:
+                digests[section] = key
+            records.extend((index, number, ordinal, record) for index, ordinal, record in part)
+        # Порядок extract_email_data: по правилам, внутри правила — по документу
+        records.sort(key=lambda item: item[:3])
+        return [dict(record) for _, _, _, record in records], digests
+
+    @staticmethod
+    def _extract_part(rules, html, section, last):
+        part = SectionExtractor(rules).extract(html.decode("utf-8"), last)
+        if part is None or any(section_of(record["selector"]) != section for _, _, record in part):
+            return None
+        return part
+
+    def compare(self, comparator, email, expected_content, digests):
+        """
+        Сравнивает content письма с ожидаемым по секциям; вердикт секции с
+        известными хэшами HTML и ожидаемых данных берётся из прошлых писем.
+        Элементы вне секций сравниваются каждый раз.
+        """
+        actual_sections = {}
+        for item in email["content"]:
+            actual_sections.setdefault(section_of(item.get("selector")), []).append(item)
+        expected_sections = {}
+        for item in expected_content:
+            expected_sections.setdefault(section_of(item.get("selector")), []).append(item)
+
+        differences = []
+        for section in (*SECTION_PREFIXES, None):
+            actual = actual_sections.get(section, [])
+            expected = expected_sections.get(section, [])
+            if not actual and not expected:
+                continue
+            if section not in digests:
+                differences.extend(comparator.compare_content(actual, expected, email["name"]))
+                continue
+            key = (digests[section], data_digest(expected))
+            verdict = self.verdicts.get(key)
+            if verdict is None:
+                verdict = self.verdicts[key] = comparator.compare_content(actual, expected)
+                self.compared += 1
+            else:
+                self.verdicts_reused += 1
+            differences.extend(dict(diff, email=email["name"]) for diff in verdict)
+        return differences
+
+    def summary(self):
+        return (f"секций разобрано: {self.parsed}, переиспользовано: {self.reused}; "
+                f"вердиктов секций: {self.compared}, переиспользовано: {self.verdicts_reused}; "
+                f"писем целиком: {self.fallbacks}")
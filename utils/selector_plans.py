@@ -0,0 +1,156 @@
+import hashlib
+import json
+import os
+import re
+import threading
+
+import soupsieve
+
+from utils.extractor import EXTRACTOR_VERSION, DEFAULT_RULES, ExtractionRule, SinglePassExtractor
+
+# Абсолютный путь для данных
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DEFAULT_SELECTORS_FILE = os.path.join(DATA_DIR, "selectors.json")
+DEFAULT_FAMILY = "default"
+
+# Скомпилированные планы по хэшу конфигурации (общие для всех писем процесса;
+# рабочие процессы пула получают их при инициализации или через fork)
+_compiled_plans = {}
+_compiled_lock = threading.Lock()
+# Загруженные файлы конфигурации: путь -> (mtime_ns, SelectorPlans)
+_loaded_plans = {}
+# Ошибки неверной конфигурации: нечитаемый JSON, нет поля, битое регулярное выражение или CSS-селектор
+CONFIG_ERRORS = (OSError, ValueError, KeyError, TypeError, re.error, soupsieve.SelectorSyntaxError)
+
+
+def config_hash(config):
+    """
+    SHA-256 конфигурации правил (ключи отсортированы) вместе с версией извлечения.
+    """
+    payload = json.dumps(config, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(f"{EXTRACTOR_VERSION}|{payload}".encode("utf-8")).hexdigest()
+
+
+def rule_from_config(config):
+    """
+    ExtractionRule из описания {"type", "id", "css", "tag", "attribute"}.
+    """
+    return ExtractionRule(config["type"], config.get("id"), tag=config.get("tag"),
+                          attribute=config.get("attribute"), css=config.get("css"))
+
+
+def rule_to_config(rule):
+    config = {"type": rule.element_type}
+    if rule.pattern is not None:
+        config["id"] = rule.pattern.pattern
+    for key, value in (("css", rule.css), ("tag", rule.tag), ("attribute", rule.attribute)):
+        if value is not None:
+            config[key] = value
+    return config
+
+
+def compile_plan(rules_config):
+    """
+    Скомпилированный план (SinglePassExtractor) для списка правил; один на хэш конфигурации.
+    """
+    key = config_hash(rules_config)
+    with _compiled_lock:
+        extractor = _compiled_plans.get(key)
+        if extractor is None:
+            extractor = _compiled_plans[key] = SinglePassExtractor(rule_from_config(rule) for rule in rules_config)
+            extractor.fingerprint = key
+    return extractor
+
+
+class SelectorPlans:
+    """
+    Планы извлечения из JSON-файла (data/selectors.json):
+
+        {"families": {"default": [{"type": "link", "id": "^...$", "tag": "a", "attribute": "href"}, ...]},
+         "templates": [{"pattern": "^frozen_account", "family": "default"}]}
+
+    Правило задаёт тип элемента, регулярное выражение для id и/или CSS-селектор,
+    тег и атрибут (без атрибута извлекается текст). Письмо относится к первому
+    семейству, чей pattern совпал с его именем, иначе — к "default". Новый тип
+    элемента — это новое правило в JSON: он попадает в свою корзину того же
+    единственного обхода дерева. Без файла используются встроенные DEFAULT_RULES.
+    """
+
+    def __init__(self, config=None):
+        if config is None:
+            config = {"families": {DEFAULT_FAMILY: [rule_to_config(rule) for rule in DEFAULT_RULES]}}
+        self.config = config
+        self.families = config.get("families", {})
+        if DEFAULT_FAMILY not in self.families:
+            raise ValueError(f"В конфигурации селекторов нет семейства '{DEFAULT_FAMILY}'")
+        self.templates = [(re.compile(template["pattern"]), template["family"])
+                          for template in config.get("templates", [])]
+        self.fingerprint = config_hash(config)
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_SELECTORS_FILE):
+        if not os.path.exists(path):
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def family_for(self, email_name):
+        for pattern, family in self.templates:
+            if pattern.search(email_name or ""):
+                return family
+        return DEFAULT_FAMILY
+
+    def extractor_for(self, email_name):
+        """
+        Скомпилированный план извлечения для письма.
+        """
+        return compile_plan(self.families[self.family_for(email_name)])
+
+    def compile_all(self):
+        """
+        Компилирует планы всех семейств, чтобы ошибки конфигурации проявились при загрузке, а не на письме.
+        """
+        for pattern, family in self.templates:
+            if family not in self.families:
+                raise KeyError(f"Шаблон '{pattern.pattern}' ссылается на неизвестное семейство '{family}'")
+        for rules in self.families.values():
+            compile_plan(rules)
+        return self
+
+
+def load_plans(path=DEFAULT_SELECTORS_FILE, keep_previous=False):
+    """
+    Планы из файла; файл перечитывается только после изменения. При keep_previous
+    ошибка конфигурации (CONFIG_ERRORS) по-прежнему выбрасывается, но до следующего
+    изменения файла для него используются прежние планы.
+    """
+    mtime = os.stat(path).st_mtime_ns if os.path.exists(path) else None
+    with _compiled_lock:
+        loaded = _loaded_plans.get(path)
+    if loaded is not None and loaded[0] == mtime:
+        return loaded[1]
+    try:
+        plans = SelectorPlans.from_file(path).compile_all()
+    except CONFIG_ERRORS:
+        if keep_previous and loaded is not None:
+            with _compiled_lock:
+                _loaded_plans[path] = (mtime, loaded[1])
+        raise
+    with _compiled_lock:
+        _loaded_plans[path] = (mtime, plans)
+    return plans
+
+
+def extractor_for(email_name, path=DEFAULT_SELECTORS_FILE):
+    """
+    Скомпилированный план извлечения для письма по его имени.
+    """
+    return load_plans(path).extractor_for(email_name)
+
+
+def plans_fingerprint(path=DEFAULT_SELECTORS_FILE):
+    """
+    Отпечаток всей конфигурации селекторов (для кэшей извлечённых данных).
+    """
+    return load_plans(path).fingerprint
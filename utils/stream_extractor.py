@@ -0,0 +1,218 @@
+from html.parser import HTMLParser
+from bs4.dammit import EntitySubstitution
+
+from utils.extractor import DEFAULT_RULES
+
+# Размер порции при чтении файла (символы)
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Теги без закрывающей пары: BeautifulSoup закрывает их сразу после открытия
+EMPTY_ELEMENT_TAGS = frozenset((
+    "area", "base", "basefont", "bgsound", "br", "col", "command", "embed", "frame", "hr",
+    "image", "img", "input", "isindex", "keygen", "link", "menuitem", "meta", "nextid",
+    "param", "source", "spacer", "track", "wbr",
+))
+
+# Теги, строки внутри которых BeautifulSoup хранит особыми типами (Stylesheet, Script, ...)
+STRING_CONTAINER_TAGS = frozenset(("rt", "rp", "style", "script", "template"))
+
+
+class StreamingExtractor(HTMLParser):
+    """
+    Потоковое извлечение content без построения дерева.
+
+    Повторяет поведение связки BeautifulSoup(html, "html.parser") + SinglePassExtractor:
+    хранится только стек имён открытых тегов и строки тех текстовых элементов,
+    которые открыты прямо сейчас. Готовые записи отдаются сразу, как только
+    элемент закрыт, поэтому результат появляется до конца чтения файла.
+    """
+
+    def __init__(self, rules=DEFAULT_RULES):
+        super().__init__(convert_charrefs=False)
+        self.rules = tuple(rules)
+        if any(rule.compiled_css is not None for rule in self.rules):
+            raise ValueError("CSS-селекторы в правилах не поддерживаются потоковым режимом (нужно дерево)")
+        # Стек открытых тегов: [имя, открытые этим тегом текстовые записи]
+        self.open_tags = []
+        self.container_stack = []
+        self.already_closed_empty_element = []
+        self.current_data = []
+        # Строки открытых текстовых элементов: (контейнер, значение)
+        self.pieces = []
+        self.open_texts = 0
+        self.counters = [0] * len(self.rules)
+        self.ready = []
+
+    def iter_file(self, path, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Читает файл порциями и отдаёт кортежи (индекс правила, порядковый номер, запись).
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                self.feed(chunk)
+                yield from self.drain()
+        self.close()
+        yield from self.drain()
+
+    def drain(self):
+        """
+        Отдаёт накопленные готовые записи.
+        """
+        ready, self.ready = self.ready, []
+        return ready
+
+    def close(self):
+        super().close()
+        self.already_closed_empty_element = []
+        self.end_data()
+        while self.open_tags:
+            self.pop_tag()
+
+    # --- Обработчики событий HTMLParser ---
+
+    def handle_startendtag(self, name, attrs):
+        self.handle_starttag(name, attrs, handle_empty_element=False)
+        self.handle_endtag(name)
+
+    def handle_starttag(self, name, attrs, handle_empty_element=True):
+        self.end_data()
+        opened = None
+        element_id = None
+        attributes = {}
+        for key, value in attrs:
+            attributes[key] = "" if value is None else value
+        element_id = attributes.get("id")
+
+        if element_id is not None:
+            for index, rule in enumerate(self.rules):
+                if not rule.matches(name, element_id):
+                    continue
+                record = {"selector": element_id, "type": rule.element_type, "expected": None}
+                position = (index, self.counters[index])
+                self.counters[index] += 1
+                if rule.attribute is not None:
+                    record["expected"] = attributes.get(rule.attribute)
+                    self.ready.append((position[0], position[1], record))
+                else:
+                    if opened is None:
+                        opened = []
+                    kind = name if name in STRING_CONTAINER_TAGS else None
+                    opened.append((position, record, len(self.pieces), kind))
+                    self.open_texts += 1
+
+        self.open_tags.append([name, opened])
+        if name in STRING_CONTAINER_TAGS:
+            self.container_stack.append(len(self.open_tags) - 1)
+
+        if name in EMPTY_ELEMENT_TAGS and handle_empty_element:
+            self.handle_endtag(name, check_already_closed=False)
+            self.already_closed_empty_element.append(name)
+
+    def handle_endtag(self, name, check_already_closed=True):
+        if check_already_closed and name in self.already_closed_empty_element:
+            self.already_closed_empty_element.remove(name)
+            return
+        self.end_data()
+        # Как BeautifulSoup._popToTag: закрываем до ближайшего тега с этим именем
+        for depth in range(len(self.open_tags) - 1, -1, -1):
+            if self.open_tags[depth][0] == name:
+                while len(self.open_tags) > depth:
+                    self.pop_tag()
+                break
+
+    def handle_data(self, data):
+        if self.open_texts:
+            self.current_data.append(data)
+
+    def handle_charref(self, name):
+        if name.startswith("x"):
+            real_name = int(name.lstrip("x"), 16)
+        elif name.startswith("X"):
+            real_name = int(name.lstrip("X"), 16)
+        else:
+            real_name = int(name)
+
+        data = None
+        if real_name < 256:
+            try:
+                data = bytearray([real_name]).decode("windows-1252")
+            except UnicodeDecodeError:
+                pass
+        if not data:
+            try:
+                data = chr(real_name)
+            except (ValueError, OverflowError):
+                pass
+        self.handle_data(data or "\N{REPLACEMENT CHARACTER}")
+
+    def handle_entityref(self, name):
+        character = EntitySubstitution.HTML_ENTITY_TO_CHARACTER.get(name)
+        self.handle_data(character if character is not None else "&%s" % name)
+
+    def handle_comment(self, data):
+        # Комментарии, объявления и инструкции не входят в get_text(), но разрывают строку
+        self.end_data()
+
+    def handle_decl(self, data):
+        self.end_data()
+
+    def handle_pi(self, data):
+        self.end_data()
+
+    def unknown_decl(self, data):
+        self.end_data()
+        if data.upper().startswith("CDATA[") and self.open_texts:
+            # CData учитывается в get_text() наравне с обычными строками
+            value = data[len("CDATA["):].strip()
+            if value:
+                self.pieces.append((None, value))
+
+    # --- Внутренняя кухня ---
+
+    def end_data(self):
+        """
+        Завершает текущую строку (аналог BeautifulSoup.endData) и кладёт её в pieces.
+        """
+        if not self.current_data:
+            return
+        value = "".join(self.current_data).strip()
+        self.current_data = []
+        if value and self.open_texts:
+            kind = self.open_tags[self.container_stack[-1]][0] if self.container_stack else None
+            self.pieces.append((kind, value))
+
+    def pop_tag(self):
+        """
+        Закрывает последний открытый тег и дописывает текст его текстовых элементов.
+        """
+        name, opened = self.open_tags.pop()
+        if self.container_stack and self.container_stack[-1] == len(self.open_tags):
+            self.container_stack.pop()
+        if not opened:
+            return
+        for (index, order), record, start, kind in opened:
+            record["expected"] = "".join(value for piece_kind, value in self.pieces[start:]
+                                         if piece_kind == kind)
+            self.ready.append((index, order, record))
+        self.open_texts -= len(opened)
+        if not self.open_texts:
+            self.pieces.clear()
+
+
+def iter_content_stream(path, rules=DEFAULT_RULES, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Отдаёт записи content по мере чтения файла (в порядке закрытия элементов).
+    """
+    for _, _, record in StreamingExtractor(rules).iter_file(path, chunk_size):
+        yield record
+
+
+def extract_content_stream(path, rules=DEFAULT_RULES, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Извлекает content потоково; порядок записей тот же, что у extract_content.
+    """
+    ordered = sorted(StreamingExtractor(rules).iter_file(path, chunk_size), key=lambda item: item[:2])
+    return [record for _, _, record in ordered]
@@ -0,0 +1,244 @@
+import argparse
+import json
+import os
+import time
+
+from pages.base_page import EmailProcessor, EMAILS_DIR, DATA_DIR
+from utils.comparator import ContentComparator
+from utils.corpus import find_emails, detect_language, index_expected
+from utils.incremental import data_digest
+from utils.link_cache import LinkCache
+from utils.link_checker import LinkChecker, link_issue
+from utils.selector_plans import CONFIG_ERRORS, DEFAULT_SELECTORS_FILE, load_plans
+
+DEFAULT_INTERVAL = 0.2
+
+
+def snapshot(paths):
+    """
+    Состояние файлов для опроса: {путь: (размер, mtime_ns)}; отсутствующие файлы пропускаются.
+    """
+    state = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        state[path] = (stat.st_size, stat.st_mtime_ns)
+    return state
+
+
+class EmailWatcher:
+    """
+    Режим наблюдения: процесс живёт долго и держит «тёплыми» импорты,
+    скомпилированные планы селекторов, ожидаемые данные и HTTP-сессию с пулом
+    соединений.
+
+    Папка писем, ожидаемый JSON и data/selectors.json опрашиваются каждые
+    interval секунд (stdlib, по размеру и mtime). Изменённое письмо парсится,
+    сравнивается и проверяется заново, причём запрашиваются только ссылки,
+    которых не было в прошлой версии письма. При изменении ожидаемого JSON
+    письма не парсятся: сравниваются сохранённые данные тех писем, чьи
+    ожидаемые данные поменялись. При изменении плана селекторов письма
+    извлекаются заново. Если ожидаемый JSON или план селекторов не читается
+    (битый или недописанный файл, неверное регулярное выражение или
+    CSS-селектор), ошибка выводится, прежние данные остаются в силе, а файл
+    перечитывается на следующем опросе. Если верного плана ещё не было,
+    письма получают статус "error", а наблюдение продолжается.
+    """
+
+    def __init__(self, emails_dir=EMAILS_DIR, expected_file=os.path.join(DATA_DIR, "expected_result.json"),
+                 selectors_file=DEFAULT_SELECTORS_FILE, interval=DEFAULT_INTERVAL, mode="soup",
+                 check_links=True, link_cache=None, report=None):
+        self.emails_dir = emails_dir
+        self.expected_file = expected_file
+        self.selectors_file = selectors_file
+        self.interval = interval
+        self.mode = mode
+        self.report = report or print_result
+        self.comparator = ContentComparator()
+        self.checker = LinkChecker(cache=link_cache) if check_links else None
+        self.expected_index = {}
+        self.expected_digests = {}
+        # Состояние писем: {относительный путь: {"email", "link_results", "result"}}
+        self.emails = {}
+        self.files = {}
+        self.config_files = {}
+        # Последний верный план селекторов (неверный файл до исправления отдаёт его же)
+        self.plans = None
+        # Ошибки чтения конфигурации: {путь: состояние файла}, чтобы не повторять сообщение на каждом опросе
+        self.config_errors = {}
+
+    def close(self):
+        if self.checker is not None:
+            self.checker.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _email_key(self, relative_path):
+        return os.path.splitext(os.path.basename(relative_path))[0], detect_language(relative_path)
+
+    def load_expected(self):
+        """
+        Перечитывает ожидаемый JSON; возвращает письма, чьи ожидаемые данные изменились.
+        """
+        expected_data = {}
+        if os.path.exists(self.expected_file):
+            with open(self.expected_file, "r", encoding="utf-8") as f:
+                expected_data = json.load(f)
+        self.expected_index = index_expected(expected_data)
+        digests = {key: data_digest(email) for key, email in self.expected_index.items()}
+        changed = {key for key in set(digests) | set(self.expected_digests)
+                   if digests.get(key) != self.expected_digests.get(key)}
+        self.expected_digests = digests
+        return changed
+
+    def _load_config(self, path, config, load):
+        """
+        Перечитывает файл конфигурации; возвращает (прочитан ли, результат load).
+        При ошибке в config остаётся прежнее состояние файла, и он перечитывается на следующем опросе.
+        """
+        try:
+            loaded = load()
+        except CONFIG_ERRORS as e:
+            if self.config_errors.get(path) != config.get(path):
+                print(f"❌ Не удалось прочитать {path}: {e}; используются прежние данные")
+                self.config_errors[path] = config.get(path)
+            if path in self.config_files:
+                config[path] = self.config_files[path]
+            else:
+                config.pop(path, None)
+            return False, None
+        self.config_errors.pop(path, None)
+        return True, loaded
+
+    def process(self, relative_path, reparse=True):
+        """
+        Извлечение (если reparse), сравнение и проверка новых ссылок одного письма.
+        """
+        started = time.perf_counter()
+        state = self.emails.setdefault(relative_path, {"email": None, "link_results": {}, "result": None})
+        if reparse or state["email"] is None:
+            try:
+                email_data = EmailProcessor(relative_path, self.mode, self.emails_dir,
+                                            detect_language(relative_path), self.selectors_file).extract()
+            except CONFIG_ERRORS as e:
+                print(f"❌ Не удалось извлечь {relative_path}: {e}")
+                email_data = None
+            state["email"] = email_data["emails"][0] if email_data else None
+
+        email = state["email"]
+        result = {"document": relative_path, "status": "error", "differences": [], "link_issues": [],
+                  "checked_links": 0}
+        if email is not None:
+            expected = self.expected_index.get(self._email_key(relative_path))
+            if expected is None:
+                result["status"] = "no_expected"
+            else:
+                result["differences"] = self.comparator.compare_content(email["content"],
+                                                                        expected.get("content", []), email["name"])
+                result["status"] = "failed" if result["differences"] else "passed"
+            if self.checker is not None:
+                self._check_links(email, state, result)
+        result["elapsed"] = time.perf_counter() - started
+        state["result"] = result
+        self.report(result)
+        return result
+
+    def _check_links(self, email, state, result):
+        """
+        Проверяет только ссылки, которых не было в прошлой версии письма.
+        """
+        urls = [item["expected"] for item in email["content"] if item["type"] == "link" and item.get("expected")]
+        previous = state["link_results"]
+        new_urls = [url for url in dict.fromkeys(urls) if url not in previous]
+        link_results = {url: previous[url] for url in urls if url in previous}
+        link_results.update(zip(new_urls, self.checker.fetch_urls(new_urls)))
+        state["link_results"] = link_results
+        result["checked_links"] = len(new_urls)
+        for item in email["content"]:
+            if item["type"] == "link" and item.get("expected") and not link_results[item["expected"]]["is_valid"]:
+                result["link_issues"].append(link_issue(item, link_results[item["expected"]]))
+
+    def poll(self):
+        """
+        Один проход опроса; возвращает результаты обработанных писем.
+        """
+        results = []
+        config = snapshot([self.expected_file, self.selectors_file])
+        expected_changed = set()
+        if config.get(self.expected_file) != self.config_files.get(self.expected_file):
+            loaded, changed = self._load_config(self.expected_file, config, self.load_expected)
+            if loaded:
+                expected_changed = changed
+        reparse_all = False
+        if config.get(self.selectors_file) != self.config_files.get(self.selectors_file):
+            loaded, plans = self._load_config(self.selectors_file, config,
+                                              lambda: load_plans(self.selectors_file, keep_previous=True))
+            reparse_all = loaded and plans is not self.plans
+            if loaded:
+                self.plans = plans
+        self.config_files = config
+
+        files = snapshot(os.path.join(self.emails_dir, path) for path in find_emails(self.emails_dir))
+        for file_path, signature in files.items():
+            relative_path = os.path.relpath(file_path, self.emails_dir)
+            if reparse_all or self.files.get(file_path) != signature:
+                results.append(self.process(relative_path, reparse=True))
+            elif self._email_key(relative_path) in expected_changed:
+                results.append(self.process(relative_path, reparse=False))
+        for file_path in set(self.files) - set(files):
+            self.emails.pop(os.path.relpath(file_path, self.emails_dir), None)
+        self.files = files
+        return results
+
+    def run(self, once=False):
+        """
+        Первый полный проход, затем опрос до прерывания (Ctrl+C).
+        """
+        self.poll()
+        if once:
+            return
+        try:
+            while True:
+                time.sleep(self.interval)
+                self.poll()
+        except KeyboardInterrupt:
+            print("Наблюдение остановлено.")
+
+
+def print_result(result):
+    elapsed = f"{result['elapsed'] * 1000:.0f} мс"
+    if result["status"] == "passed" and not result["link_issues"]:
+        print(f"✅ {result['document']} ({elapsed}, новых ссылок проверено: {result['checked_links']})")
+    elif result["status"] == "no_expected":
+        print(f"⚠️ {result['document']}: нет ожидаемого результата ({elapsed})")
+    elif result["status"] == "error":
+        print(f"❌ {result['document']}: ошибка обработки ({elapsed})")
+    else:
+        print(f"❌ {result['document']}: различий {len(result['differences'])}, "
+              f"проблемных ссылок {len(result['link_issues'])} ({elapsed})")
+        for diff in result["differences"]:
+            print(f"   🔹 {diff['selector']} ({diff['status']}): {diff['actual']!r} != {diff['expected']!r}")
+        for issue in result["link_issues"]:
+            print(f"   🔗 {issue['selector']}: {issue['url']} ({issue['error']})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Наблюдение за письмами: перепроверка при изменении файлов")
+    parser.add_argument("--emails-dir", default=EMAILS_DIR)
+    parser.add_argument("--expected-file", default=os.path.join(DATA_DIR, "expected_result.json"))
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="период опроса, с")
+    parser.add_argument("--mode", choices=EmailProcessor.MODES, default="soup")
+    parser.add_argument("--no-links", action="store_true", help="не проверять ссылки")
+    parser.add_argument("--selectors-file", default=DEFAULT_SELECTORS_FILE)
+    args = parser.parse_args()
+
+    with EmailWatcher(args.emails_dir, args.expected_file, args.selectors_file, interval=args.interval, mode=args.mode,
+                      check_links=not args.no_links, link_cache=None if args.no_links else LinkCache()) as watcher:
+        print(f"👀 Наблюдение за {args.emails_dir} (Ctrl+C — выход)")
+        watcher.run()